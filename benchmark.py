@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""script_reader.py の性能計測スクリプト
+
+使い方:
+    python benchmark.py normalize [--size-mb 4]
+    python benchmark.py pipeline [--latency 0.02] [--payload-kb 64] [--output results.json]
+    python benchmark.py startup [--runs 5] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 読み込み時のメッセージが結果のJSONに混ざらないよう標準エラーに出す
+with contextlib.redirect_stdout(sys.stderr):
+    import script_reader
+
+# 読み上げテキスト変換の期待出力（入力, 期待される行リスト）
+NORMALIZER_GOLDEN = [
+    ("## 見出し", ["見出し"]),
+    ("### 小見出し\n本文", ["小見出し", "本文"]),
+    ("**太字**と*斜体*", ["太字と斜体"]),
+    ("- 項目1\n* 項目2\n+ 項目3", ["項目1", "項目2", "項目3"]),
+    ("  - 字下げした項目", ["字下げした項目"]),
+    ("1. 最初\n10. 十番目", ["最初", "十番目"]),
+    ("[リンク](https://example.com)を参照", ["リンクを参照"]),
+    ("`code` を実行", ["code を実行"]),
+    ("前\n---\n***\n___\n後", ["前", "後"]),
+    ("本文<!-- 1行のコメント -->です", ["本文です"]),
+    ("前\n<!--\n複数行の\nコメント\n-->\n後", ["前", "後"]),
+    ("- **[太字のリンク](url)**", ["太字のリンク"]),
+    ("`*強調入りコード*`", ["強調入りコード"]),
+    ("\n\n   \n空行は飛ばす\n\t\n", ["空行は飛ばす"]),
+    ("3 * 4 = 12", ["3 * 4 = 12"]),
+    ("#ハッシュタグ", ["ハッシュタグ"]),
+    ("+ 1. - text", ["- text"]),
+    ("#___", []),
+    ("* * ", []),
+    ("* 項目 *強調*", ["項目 強調*"]),
+    ("<!-- メモ -->- 項目", ["- 項目"]),
+]
+
+SAMPLE_SLIDE = """## スライドの見出し
+<!-- 発表者メモ:
+ここは読み上げない -->
+- **重要な点**は[こちら](https://example.com)を参照
+- `script_reader.py` の *使い方* を説明します。
+1. 最初の手順です。
+2. 次の手順です。
+---
+まとめとして、本日の内容を振り返ります。
+"""
+
+def legacy_process_text_for_speech(text):
+    """比較用: 行ごとに re.sub を繰り返していた以前の実装"""
+    lines = []
+    for line in text.split('\n'):
+        if not line.strip():
+            continue
+        clean_line = re.sub(r'^#+\s*', '', line)
+        clean_line = re.sub(r'\*\*(.+?)\*\*', r'\1', clean_line)
+        clean_line = re.sub(r'\*(.+?)\*', r'\1', clean_line)
+        clean_line = re.sub(r'^\s*[-*+]\s+', '', clean_line)
+        clean_line = re.sub(r'^\s*\d+\.\s+', '', clean_line)
+        clean_line = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', clean_line)
+        clean_line = re.sub(r'`(.+?)`', r'\1', clean_line)
+        if re.match(r'^-{3,}$|^\*{3,}$|^_{3,}$', clean_line):
+            continue
+        clean_line = re.sub(r'<!--.*?-->', '', clean_line)
+        if clean_line.strip():
+            lines.append(clean_line.strip())
+    return lines
+
+def check_normalizer_golden():
+    """期待出力と一致するか確認する（不一致の数を返す）"""
+    failures = 0
+    for text, expected in NORMALIZER_GOLDEN:
+        actual = script_reader.process_text_for_speech(text)
+        if actual != expected:
+            failures += 1
+            print(f"NG: {text!r}\n  期待: {expected}\n  結果: {actual}")
+    print(f"期待出力の確認: {len(NORMALIZER_GOLDEN) - failures}/{len(NORMALIZER_GOLDEN)} 件一致")
+    return failures
+
+def measure_throughput(func, slides, total_chars):
+    """全スライドを変換したときの処理速度（文字/秒）を返す"""
+    started = time.perf_counter()
+    for slide in slides:
+        func(slide)
+    elapsed = time.perf_counter() - started
+    return total_chars / elapsed, elapsed
+
+def bench_normalize(args):
+    if check_normalizer_golden():
+        return 1
+
+    repeat = max(1, int(args.size_mb * 1024 * 1024 / len(SAMPLE_SLIDE.encode('utf-8'))))
+    slides = [SAMPLE_SLIDE] * repeat
+    total_chars = len(SAMPLE_SLIDE) * repeat
+    print(f"{repeat}枚のスライド（{total_chars:,}文字）を変換します")
+
+    for name, func in (("以前の実装", legacy_process_text_for_speech),
+                       ("SpeechNormalizer", script_reader.process_text_for_speech)):
+        rate, elapsed = measure_throughput(func, slides, total_chars)
+        print(f"{name}: {rate:,.0f} 文字/秒 ({elapsed:.2f}秒)")
+    return 0
+
+class FakeVoicevoxHandler(BaseHTTPRequestHandler):
+    """VOICEVOXエンジンのAPIのうち script_reader.py が使う部分だけを真似るハンドラー"""
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if self.server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            # 小さなチャンクに分けて送る
+            for i in range(0, len(body), 4096):
+                piece = body[i:i + 4096]
+                self.wfile.write(f"{len(piece):x}\r\n".encode('ascii') + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_no_content(self):
+        """uvicorn と同じく Content-Length なしの 204 を返す（接続は keep-alive のまま）"""
+        self.send_response(204)
+        self.end_headers()
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        if path == "/version":
+            return self._send(b'"0.0.0-fake"')
+        if path == "/speakers":
+            speakers = [{"name": "ベンチマーク", "speaker_uuid": "fake", "styles": [{"name": "ノーマル", "id": 1}]}]
+            return self._send(json.dumps(speakers).encode('utf-8'))
+        if url.path == "/is_initialized_speaker":
+            speaker = int(parse_qs(url.query)["speaker"][0])
+            return self._send(json.dumps(speaker in self.server.initialized).encode('utf-8'))
+        self._send(b'{}', status=404)
+    
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server = self.server
+        time.sleep(server.latency)
+        server.count(url.path.lstrip('/'))
+        if server.take_failure():
+            return self._send(b'{"detail": "fake failure"}', status=503)
+        
+        if url.path == "/initialize_speaker":
+            server.initialized.add(int(parse_qs(url.query)["speaker"][0]))
+            return self._send_no_content()
+        if url.path == "/audio_query":
+            text = parse_qs(url.query)["text"][0]
+            return self._send(json.dumps(fake_audio_query(text)).encode('utf-8'))
+        if url.path == "/synthesis":
+            return self._send(server.wav, "audio/wav")
+        if url.path == "/multi_synthesis":
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as archive:
+                for i in range(len(json.loads(body))):
+                    archive.writestr(f"{i+1:03d}.wav", server.wav)
+            return self._send(buffer.getvalue(), "application/zip")
+        self._send(b'{}', status=404)
+
+class FakeVoicevoxServer(ThreadingHTTPServer):
+    """応答の遅延と音声の大きさを指定できるVOICEVOXの代わりのサーバー"""
+    daemon_threads = True
+    
+    def __init__(self, latency=0.02, payload_kb=64, port=0):
+        """
+        Args:
+            latency (float): POSTリクエストごとに待つ秒数（合成時間の代わり）
+            payload_kb (int): /synthesis が返すWAV1件あたりのおおよそのKB
+            port (int): 待ち受けるポート（0なら空いているポート）
+        """
+        super().__init__(("127.0.0.1", port), FakeVoicevoxHandler)
+        self.latency = latency
+        self.wav = make_silent_wav(payload_kb * 1024)
+        self.initialized = set()  # /initialize_speaker で読み込んだ話者ID
+        self.chunked = False      # Trueなら応答を Transfer-Encoding: chunked で返す
+        self.failures = 0         # この回数だけPOSTに 503 を返す（再試行の確認用）
+        self.connections = 0      # 受け付けた接続の数（keep-aliveの確認用）
+        self.open_sockets = set() # 終了時に閉じる、keep-alive中の接続
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+    
+    def count(self, endpoint):
+        with self.stats_lock:
+            self.stats[endpoint] = self.stats.get(endpoint, 0) + 1
+    
+    def handle_error(self, request, client_address):
+        # 取り消されたリクエストでクライアントが接続を切るのは想定どおりなので出力しない
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+    
+    def take_failure(self):
+        """503 を返す残り回数があれば1つ減らしてTrueを返す"""
+        with self.stats_lock:
+            if self.failures <= 0:
+                return False
+            self.failures -= 1
+            return True
+    
+    def process_request(self, request, client_address):
+        with self.stats_lock:
+            self.connections += 1
+            self.open_sockets.add(request)
+        super().process_request(request, client_address)
+    
+    def shutdown_request(self, request):
+        with self.stats_lock:
+            self.open_sockets.discard(request)
+        super().shutdown_request(request)
+    
+    def take_stats(self):
+        """これまでのリクエスト数を返してリセットする"""
+        with self.stats_lock:
+            stats, self.stats = self.stats, {}
+        return stats
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        # プロセスが終了したエンジンと同じく、keep-alive中の接続も切る
+        with self.stats_lock:
+            sockets, self.open_sockets = self.open_sockets, set()
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+def make_silent_wav(size_bytes, framerate=24000):
+    """おおよそ size_bytes の無音WAV（16bitモノラル）を作る"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(framerate)
+        wav.writeframes(b"\x00\x00" * max(1, size_bytes // 2))
+    return buffer.getvalue()
+
+def fake_audio_query(text):
+    """文字ごとに1モーラの音声合成クエリを作る"""
+    moras = [{"text": c, "consonant": None, "consonant_length": None, "vowel": "a", "vowel_length": 0.12, "pitch": 5.5} 
+             for c in text]
+    return {"accent_phrases": [{"moras": moras, "accent": 1, "pause_mora": None, "is_interrogative": False}],
+            "speedScale": 1.0, "pitchScale": 0.0, "intonationScale": 1.0, "volumeScale": 1.0,
+            "prePhonemeLength": 0.1, "postPhonemeLength": 0.1, "outputSamplingRate": 24000, 
+            "outputStereo": False, "kana": text}
+
+# 計測に使う代表的な台本（スライド数, 1枚あたりの SAMPLE_SLIDE の繰り返し数）
+PIPELINE_SCRIPTS = {
+    "short": (10, 1),    # 短い発表
+    "medium": (60, 2),   # 一般的な講演
+    "long": (120, 4),    # 長い講義（1枚の原稿も長い）
+}
+
+def write_script(path, slide_count, repeat):
+    """SAMPLE_SLIDE をもとに台本ファイルを作る（スライドごとに内容を変える）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(slide_count):
+            body = SAMPLE_SLIDE.replace("スライドの見出し", f"スライド{i+1}の見出し", 1)
+            body = body.replace("本日の内容", f"{i+1}番目の内容")
+            f.write(body + ("\n".join([f"補足{n+1}: 第{i+1}節の説明を続けます。" for n in range(repeat - 1)])) + "\n")
+
+def summarize(values):
+    """平均・中央値・95パーセンタイル・最大値（秒）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 6),
+        "p50": round(ordered[len(ordered) // 2], 6),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "max": round(ordered[-1], 6),
+    }
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+def measure_parse(path):
+    """台本の分割と読み上げテキスト変換にかかる時間を測る"""
+    started = time.perf_counter()
+    slides = script_reader.parse_slides(path)
+    texts = [slides[i] for i in range(len(slides))]
+    parse_sec = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for text in texts:
+        script_reader.process_text_for_speech(text)
+    normalize_sec = time.perf_counter() - started
+    
+    chars = sum(len(text) for text in texts)
+    return slides, {
+        "slides": len(slides),
+        "chars": chars,
+        "parse_sec": round(parse_sec, 6),
+        "normalize_sec": round(normalize_sec, 6),
+        "normalize_chars_per_sec": round(chars / normalize_sec) if normalize_sec else None,
+    }
+
+def measure_streaming(slides, url, max_slides):
+    """文単位の合成（GUIの再生経路）で、最初の音声までの時間とスライド全体の時間を測る"""
+    first_audio = []
+    slide_total = []
+    for idx in range(min(len(slides), max_slides)):
+        chunks = script_reader.split_sentences(slides.record(idx).lines)
+        if not chunks:
+            continue
+        started = time.perf_counter()
+        synthesis = script_reader.ChunkedSynthesis(chunks, 1, 220, url)
+        for i, _ in enumerate(synthesis.iter_audio()):
+            if i == 0:
+                first_audio.append(time.perf_counter() - started)
+        slide_total.append(time.perf_counter() - started)
+    return {"time_to_first_audio_sec": summarize(first_audio), "slide_render_sec": summarize(slide_total)}
+
+def measure_render(path, url, cache_dir, workers):
+    """BatchRenderer で台本全体を書き出す時間と、永続キャッシュのヒット率を測る"""
+    cache = script_reader.AudioCache(os.path.join(cache_dir, "audio"))
+    query_cache = script_reader.get_query_cache()
+    query_hits, query_misses = query_cache.hits, query_cache.misses
+    out_dir = tempfile.mkdtemp(prefix="bench_render_")
+    try:
+        started = time.perf_counter()
+        manifest = script_reader.BatchRenderer(workers=workers, voicevox_url=url, cache=cache).render(path, out_dir)
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {
+        "deck_render_sec": round(elapsed, 6),
+        "failed_slides": sum(1 for slide in manifest["slides"] if slide["error"]),
+        "audio_cache_hit_rate": hit_rate(cache.hits, cache.misses),
+        "query_cache_hit_rate": hit_rate(query_cache.hits - query_hits, query_cache.misses - query_misses),
+    }
+
+def bench_pipeline(args):
+    names = [name for name in args.scripts.split(',') if name]
+    unknown = [name for name in names if name not in PIPELINE_SCRIPTS]
+    if unknown:
+        print(f"不明な台本: {', '.join(unknown)}（{', '.join(PIPELINE_SCRIPTS)} から選択）", file=sys.stderr)
+        return 1
+    
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    results = {
+        "config": {"latency_sec": args.latency, "payload_kb": args.payload_kb, "workers": args.workers, 
+                   "stream_slides": args.stream_slides},
+        "scripts": {},
+    }
+    # script_reader のログは計測の邪魔になるので捨てる（結果のJSONだけを標準出力に出す）
+    real_stdout = sys.stdout
+    try:
+        with FakeVoicevoxServer(args.latency, args.payload_kb) as server, \
+             open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for name in names:
+                slide_count, repeat = PIPELINE_SCRIPTS[name]
+                path = os.path.join(work_dir, f"{name}.md")
+                write_script(path, slide_count, repeat)
+                cache_dir = os.path.join(work_dir, f"{name}_cache")
+                # 台本ごとにクエリキャッシュを空にして、同じ条件で比べる
+                script_reader.query_cache = script_reader.QueryCache(os.path.join(cache_dir, "queries"))
+                
+                slides, result = measure_parse(path)
+                result.update(measure_streaming(slides, server.url, args.stream_slides))
+                server.take_stats()
+                
+                cold = measure_render(path, server.url, cache_dir, args.workers)
+                cold["requests"] = server.take_stats()
+                warm = measure_render(path, server.url, cache_dir, args.workers)
+                warm["requests"] = server.take_stats()
+                result["render_cold"] = cold
+                result["render_warm"] = warm
+                results["scripts"][name] = result
+                
+                print(f"{name}: {result['slides']}枚, 分割 {result['parse_sec']*1000:.1f}ms, "
+                      f"変換 {result['normalize_sec']*1000:.1f}ms, "
+                      f"最初の音声 {result['time_to_first_audio_sec']['p50']*1000:.0f}ms (p50), "
+                      f"全体 {cold['deck_render_sec']:.2f}秒 → キャッシュあり {warm['deck_render_sec']:.2f}秒 "
+                      f"(ヒット率 {warm['audio_cache_hit_rate']:.0%})", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output, file=real_stdout)
+    return 0
+
+# 起動時間を測る子プロセス（引数: 結果の出力先, 台本, VOICEVOXのURL, asyncioを先に読み込むか）
+STARTUP_PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+result_path, script_path, url, eager = sys.argv[1:5]
+if eager == "1":
+    import asyncio
+import script_reader
+result = {"import_sec": time.perf_counter() - started, 
+          "asyncio_loaded_after_import": "asyncio.base_events" in sys.modules}
+try:
+    import tkinter
+    root = tkinter.Tk()
+except Exception as e:
+    root = None
+    result["gui_unavailable"] = f"{type(e).__name__}: {e}"
+if root is not None:
+    script_reader.VOICEVOX_URL = url
+    app = script_reader.SimpleScriptReader(root, script_path, playback="null")
+    root.update()
+    result["first_paint_sec"] = time.perf_counter() - started
+    result["asyncio_loaded_before_paint"] = "asyncio.base_events" in sys.modules
+    deadline = time.perf_counter() + 10
+    while not app.engine_supervisor.is_ready() and time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.005)
+    result["engine_ready_sec"] = time.perf_counter() - started
+    root.update()
+    app.on_closing()
+with open(result_path, "w") as f:
+    json.dump(result, f)
+'''
+
+def run_startup_probe(home, script_path, url, eager=False):
+    """HOME を差し替えた子プロセスで起動時間を測る（設定ファイルとキャッシュは home の下を使う）"""
+    result_path = os.path.join(home, "startup_probe.json")
+    env = dict(os.environ, HOME=home)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # 普段の起動と同じく .pyc を使う
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", STARTUP_PROBE, result_path, script_path, url, "1" if eager else "0"], 
+                   cwd=os.path.dirname(os.path.abspath(__file__)), env=env, 
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    process_sec = time.perf_counter() - started
+    with open(result_path, encoding='utf-8') as f:
+        result = json.load(f)
+    result["process_sec"] = process_sec
+    return result
+
+def summarize_runs(runs):
+    """子プロセスごとの結果を項目ごとにまとめる（時間は summarize、それ以外は最後の値）"""
+    summary = {}
+    for key in runs[-1]:
+        if key.endswith("_sec"):
+            summary[key] = summarize([run[key] for run in runs if key in run])
+        else:
+            summary[key] = runs[-1][key]
+    return summary
+
+def bench_startup(args):
+    work_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    script_path = os.path.join(work_dir, "deck.md")
+    write_script(script_path, *PIPELINE_SCRIPTS["medium"])
+    results = {"config": {"runs": args.runs}}
+    try:
+        with FakeVoicevoxServer(latency=0) as server:
+            # .pyc を作っておく（1回目だけコンパイルの時間が入るのを避ける）
+            run_startup_probe(tempfile.mkdtemp(dir=work_dir), script_path, server.url)
+            
+            # 初回起動: 設定ファイルも話者一覧のキャッシュもない状態
+            cold = [run_startup_probe(tempfile.mkdtemp(dir=work_dir), script_path, server.url) for _ in range(args.runs)]
+            # 2回目以降: 前回の起動で保存した設定を読み込む
+            warm_home = tempfile.mkdtemp(dir=work_dir)
+            run_startup_probe(warm_home, script_path, server.url)
+            warm = [run_startup_probe(warm_home, script_path, server.url) for _ in range(args.runs)]
+            # 比較用: asyncio を起動時に読み込んだ場合
+            eager = [run_startup_probe(warm_home, script_path, server.url, eager=True) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    results["cold_config"] = summarize_runs(cold)
+    results["warm_config"] = summarize_runs(warm)
+    results["eager_asyncio"] = summarize_runs(eager)
+    for name in ("cold_config", "warm_config", "eager_asyncio"):
+        result = results[name]
+        paint = result.get("first_paint_sec")
+        paint_text = f"最初の描画 {paint['p50']*1000:.0f}ms" if paint else "GUIなし"
+        print(f"{name}: 読み込み {result['import_sec']['p50']*1000:.1f}ms, {paint_text}, "
+              f"プロセス全体 {result['process_sec']['p50']*1000:.0f}ms (p50)", file=sys.stderr)
+    
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="script_reader.py の性能計測")
+    subparsers = parser.add_subparsers(dest="command")
+
+    normalize_parser = subparsers.add_parser("normalize", help="読み上げテキスト変換の処理速度")
+    normalize_parser.add_argument("--size-mb", type=float, default=4, help="変換する台本の大きさ（MB、既定: 4）")
+    normalize_parser.set_defaults(func=bench_normalize)
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="偽のVOICEVOXサーバーに対する読み込み・合成・キャッシュの計測（結果はJSON）")
+    pipeline_parser.add_argument("--latency", type=float, default=0.02, help="サーバーの1リクエストあたりの遅延秒（既定: 0.02）")
+    pipeline_parser.add_argument("--payload-kb", type=int, default=64, help="合成1件あたりのWAVのKB（既定: 64）")
+    pipeline_parser.add_argument("--scripts", default=",".join(PIPELINE_SCRIPTS), 
+                                 help=f"計測する台本（カンマ区切り、既定: {','.join(PIPELINE_SCRIPTS)}）")
+    pipeline_parser.add_argument("--workers", type=int, default=4, help="一括書き出しの並列数（既定: 4）")
+    pipeline_parser.add_argument("--stream-slides", type=int, default=10, 
+                                 help="最初の音声までの時間を測るスライド数（既定: 10）")
+    pipeline_parser.add_argument("--output", metavar="FILE.json", help="結果のJSONの出力先（省略時は標準出力）")
+    pipeline_parser.set_defaults(func=bench_pipeline)
+
+    startup_parser = subparsers.add_parser("startup", help="起動時間の計測（設定ファイルの有無、asyncioを先に読み込んだ場合との比較。結果はJSON）")
+    startup_parser.add_argument("--runs", type=int, default=5, help="条件ごとの起動回数（既定: 5）")
+    startup_parser.add_argument("--output", metavar="FILE.json", help="結果のJSONの出力先（省略時は標準出力）")
+    startup_parser.set_defaults(func=bench_startup)
+
+    args = parser.parse_args(argv)
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,3 @@
-import tkinter as tk
-from tkinter import scrolledtext, Button, Label, Frame, filedialog, Scale, OptionMenu, StringVar, Checkbutton, IntVar
 import os.path
 import subprocess
 import threading
@@ -8,25 +6,69 @@ import time
 import re
 import json
 import sys
+import argparse
+import wave
+import io
+import zipfile
 import atexit
 import platform
 import datetime
+import hashlib
+import shutil
+import copy
+import importlib.util
+import contextvars
+import urllib.parse
+import heapq
+import itertools
+import select
+import struct
+from collections import OrderedDict, namedtuple
 
-# 音声合成用ライブラリ
+def lazy_import(name):
+    """モジュールを最初に属性を参照したときに読み込むようにして import する
+    
+    起動直後の画面表示に不要なモジュールの読み込みを後回しにするために使う。
+    
+    Args:
+        name (str): モジュール名
+        
+    Returns:
+        module: 読み込みを遅延したモジュール（既に読み込み済みならそのモジュール）
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# asyncio は読み込みに時間がかかるので、VOICEVOXとの通信を始めるまで読み込まない
+asyncio = lazy_import("asyncio")
+
+# GUI用ライブラリ（ヘッドレス環境のバッチ書き出しでは不要）
 try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
+    import tkinter as tk
+    from tkinter import scrolledtext, Button, Label, Frame, filedialog, Scale, OptionMenu, StringVar, Checkbutton, IntVar
+    TK_AVAILABLE = True
 except ImportError:
-    GTTS_AVAILABLE = False
+    TK_AVAILABLE = False
+
+# 音声合成用ライブラリ（起動を速くするため、有無だけ確認して実際の読み込みは初回使用時に行う）
+GTTS_AVAILABLE = importlib.util.find_spec("gtts") is not None
+if not GTTS_AVAILABLE:
     print("Info: gTTSライブラリが見つかりません。標準の音声合成を使用します。")
 
-# VOICEVOX用のrequestsライブラリ
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-    print("Info: requestsライブラリが見つかりません。VOICEVOXは利用できません。")
+# 速度変更時の音声の伸縮に使う（なければ速度を変えるたびにエンジンで合成し直す）
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+def gTTS(*args, **kwargs):
+    """gtts.gTTS を初回呼び出し時に読み込んで生成する"""
+    from gtts import gTTS as gtts_class
+    return gtts_class(*args, **kwargs)
 
 # 台本ファイルへのデフォルトパス
 DEFAULT_SCRIPT_PATH = "/Users/hirokitakamura/Documents/Obsidian Vault/200_projects/AI福岡勉強会/Claude_MCP_LT_script.md"
@@ -34,36 +76,178 @@ DEFAULT_SCRIPT_PATH = "/Users/hirokitakamura/Documents/Obsidian Vault/200_projec
 # VOICEVOXの設定
 VOICEVOX_URL = "http://localhost:50021"  # VOICEVOXエンジンのURL
 
+# VOICEVOX APIのエンドポイント別タイムアウト（接続, 読み込み）秒
+VOICEVOX_TIMEOUTS = {
+    "version": (1, 1),
+    "speakers": (1, 10),
+    "is_initialized_speaker": (1, 5),
+    "initialize_speaker": (2, 180),  # 話者モデルの読み込みは数十秒かかることがある
+    "audio_query": (2, 30),
+    "synthesis": (2, 120),
+    "multi_synthesis": (2, 600),
+}
+VOICEVOX_DEFAULT_TIMEOUT = (2, 60)
+VOICEVOX_MAX_CONCURRENCY = 4  # エンジンへの同時リクエスト数の上限
+VOICEVOX_MAX_RETRIES = 2      # 接続エラーや5xx応答時の再試行回数
+
+# 音声キャッシュの設定
+AUDIO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "script_reader", "audio")
+AUDIO_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512MBを超えたら古いものから削除
+QUERY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "script_reader", "queries")
+QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+QUERY_CACHE_MEMORY_ENTRIES = 2048  # メモリ上に保持する音声合成クエリの件数
+MEMORY_AUDIO_CACHE_MAX_BYTES = 128 * 1024 * 1024  # メモリ上に保持する合成済み音声の上限（超えたら永続キャッシュへ）
+SPEAKER_CATALOG_DIR = os.path.join(os.path.expanduser("~"), ".cache", "script_reader", "speakers")
+
+# 設定ファイル（見つけたVOICEVOXのパスや前回の読み上げ設定を保存し、次回起動時の検索を省く）
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".config", "script_reader", "config.json")
+
+# 合成済み音声の伸縮（WSOLA）の設定
+TIME_STRETCH_FRAME_SEC = 0.02       # 重ね合わせる1フレームの長さ（半分ずつ重ねる）
+TIME_STRETCH_TOLERANCE_SEC = 0.005  # 前のフレームと最も自然につながる位置を探す前後の幅
+
+# 速度以外の抑揚パラメータの既定値（VOICEVOXの音声合成クエリと同じキー名）
+DEFAULT_PROSODY = {
+    "pitchScale": 0.0,
+    "intonationScale": 1.0,
+    "volumeScale": 1.0,
+}
+
 # ログ関連のユーティリティ
+# ログレベル（この値未満のログは出力しない）
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARN": 30, "ERROR": 40}
+LOG_LEVEL_ICONS = {"INFO": "ℹ️", "WARN": "⚠️", "ERROR": "❌", "DEBUG": "🔍", "SUCCESS": "✅"}
+log_threshold = LOG_LEVELS["INFO"]
+
+def set_log_level(level):
+    """出力するログの最低レベルを設定する（DEBUG, INFO, WARN, ERROR）"""
+    global log_threshold
+    log_threshold = LOG_LEVELS[level.upper()]
+
 def log_message(message, level="INFO", prefix=None):
     """アプリケーションログを一貫した形式で出力する
     
+    設定したレベル未満のログは整形せずにすぐ戻る。
+    
     Args:
         message (str): ログメッセージ
         level (str): ログレベル (INFO, WARN, ERROR, DEBUG)
         prefix (str): メッセージの前に付ける追加情報
     """
-    timestamp = datetime.datetime.now().strftime('%H:%M:%S.%f')[:-3]
+    level = level.upper()
+    if LOG_LEVELS.get(level, LOG_LEVELS["INFO"]) < log_threshold:
+        return
     
-    # ログレベルに応じたプレフィックス
-    level_prefix = {
-        "INFO": "ℹ️",
-        "WARN": "⚠️",
-        "ERROR": "❌",
-        "DEBUG": "🔍",
-        "SUCCESS": "✅"
-    }.get(level.upper(), "")
+    now = time.time()
+    timestamp = time.strftime('%H:%M:%S', time.localtime(now)) + f".{int(now % 1 * 1000):03d}"
     
     # プレフィックスがあれば追加
     prefix_str = f"[{prefix}] " if prefix else ""
     
     # 整形されたログメッセージを出力
-    print(f"{timestamp} {level_prefix} {prefix_str}{message}")
+    print(f"{timestamp} {LOG_LEVEL_ICONS.get(level, '')} {prefix_str}{message}")
+
+# 処理区間の計測でスライド番号を引き継ぐためのコンテキスト変数（非同期処理ではタスクごとに保持される）
+trace_slide = contextvars.ContextVar("trace_slide", default=None)
+
+class TraceSpan:
+    """Tracer.span が返す計測区間（with 文の終了時に記録する）"""
+    __slots__ = ("tracer", "name", "args", "start")
+    
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.start, time.perf_counter(), **self.args)
+        return False
+
+class NullSpan:
+    """計測が無効なときの何もしない区間"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Tracer:
+    """処理段階ごとの所要時間を記録し、JSON Lines または Chrome のトレース形式で書き出す
+    
+    無効なときは span() が共有の NullSpan を返すだけなので、計測箇所を残したままでも負荷はほぼない。
+    記録する区間: parse, normalize, audio_query, synthesis, write, playback_start
+    """
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.events = []  # (名前, 開始, 終了, スレッドID, 引数)
+        self.thread_names = {}
+        self.lock = threading.Lock()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def span(self, name, **args):
+        """with 文で囲んだ区間を記録する（slide を省略すると trace_slide の値を使う）"""
+        if not self.enabled:
+            return NULL_SPAN
+        return TraceSpan(self, name, args)
+    
+    def record(self, name, start, end, slide=None, **args):
+        """開始・終了時刻（time.perf_counter の値）を指定して区間を記録する"""
+        if not self.enabled:
+            return
+        if slide is None:
+            slide = trace_slide.get()
+        if slide is not None:
+            args["slide"] = slide
+        thread = threading.current_thread()
+        with self.lock:
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.events.append((name, start, end, thread.ident, args))
+    
+    def save(self, path):
+        """記録した区間を書き出す（拡張子が .jsonl なら JSON Lines、それ以外は Chrome のトレース形式）"""
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        if path.endswith(".jsonl"):
+            with open(path, 'w', encoding='utf-8') as f:
+                for name, start, end, tid, args in events:
+                    line = {"name": name, "start_sec": round(start - self.origin, 6), 
+                            "duration_sec": round(end - start, 6), "thread": thread_names.get(tid)}
+                    line.update(args)
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        else:
+            # chrome://tracing や Perfetto で開ける形式（時刻はマイクロ秒）
+            pid = os.getpid()
+            trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} 
+                            for tid, name in thread_names.items()]
+            trace_events.extend({"name": name, "cat": "script_reader", "ph": "X", "pid": pid, "tid": tid,
+                                 "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+                                 "args": args} 
+                                for name, start, end, tid, args in events)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        log_message(f"{len(events)}件の計測区間を書き出しました: {path}", level="INFO", prefix="計測")
+
+# 共有の計測器（--trace を指定したときだけ有効）
+tracer = Tracer()
 
 # macOSの場合のVOICEVOXデフォルトパス
 DEFAULT_VOICEVOX_PATH = "/Applications/VOICEVOX.app"
 
-# VOICEVOXの話者リスト
+# VOICEVOXの話者リスト（エンジンから一覧を取得したことがない場合の既定値。通常は SpeakerCatalog を使う）
 VOICEVOX_SPEAKERS = {
     "四国めたん": 2,
     "四国めたん（あまあま）": 0,
@@ -116,177 +300,3337 @@ VOICEVOX_SPEAKERS = {
 
 # VOICEVOXエンジンプロセス
 voicevox_process = None
+# 複数のワーカーから同時に起動しないためのロック
+voicevox_start_lock = threading.Lock()
 
 def validate_voicevox_path(path):
     """指定されたVOICEVOXパスが有効かどうかを確認する
     
-    Args:
-        path (str): 検証するVOICEVOXパス
+    Args:
+        path (str): 検証するVOICEVOXパス
+        
+    Returns:
+        bool: パスが有効な場合はTrue、そうでない場合はFalse
+    """
+    if not path or not os.path.exists(path):
+        return False
+        
+    # macOSの場合
+    if platform.system() == 'Darwin':
+        # VOICEVOXアプリバンドルの存在確認
+        if path.endswith('.app') and os.path.isdir(path):
+            # エンジン実行ファイルの存在確認
+            engine_path = os.path.join(path, 'Contents', 'Resources', 'vv-engine', 'run')
+            return os.path.exists(engine_path) and os.access(engine_path, os.X_OK)
+        return False
+    
+    # Windowsの場合（将来的に対応）
+    elif platform.system() == 'Windows':
+        # VOICEVOX実行ファイルの存在確認
+        exe_path = os.path.join(path, 'VOICEVOX.exe')
+        return os.path.exists(exe_path) and os.access(exe_path, os.X_OK)
+    
+    return False
+
+def find_voicevox_path(user_path=None):
+    """VOICEVOXのインストールパスを検出する
+    
+    Args:
+        user_path (str, optional): ユーザーが指定したVOICEVOXパス
+        
+    Returns:
+        str or None: 有効なVOICEVOXパス、見つからない場合はNone
+    """
+    # ユーザー指定のパスがあり、それが有効な場合はそれを使用
+    if user_path and validate_voicevox_path(user_path):
+        log_message(f"ユーザー指定のVOICEVOXパスを使用: {user_path}", level="INFO", prefix="VOICEVOX")
+        return user_path
+        
+    # macOSの場合
+    if platform.system() == 'Darwin':
+        # デフォルトのインストールパスをチェック
+        if os.path.exists(DEFAULT_VOICEVOX_PATH) and validate_voicevox_path(DEFAULT_VOICEVOX_PATH):
+            log_message(f"デフォルトのVOICEVOXパスを使用: {DEFAULT_VOICEVOX_PATH}", level="INFO", prefix="VOICEVOX")
+            return DEFAULT_VOICEVOX_PATH
+        
+        # Applicationsフォルダを検索
+        try:
+            result = subprocess.run(['find', '/Applications', '-name', 'VOICEVOX.app', '-maxdepth', '1'], 
+                                  capture_output=True, text=True, check=False)
+            if result.stdout:
+                found_path = result.stdout.strip()
+                if validate_voicevox_path(found_path):
+                    log_message(f"検索で見つかったVOICEVOXパスを使用: {found_path}", level="INFO", prefix="VOICEVOX")
+                    return found_path
+        except Exception as e:
+            log_message(f"VOICEVOXパスの検索中にエラー: {e}", level="ERROR", prefix="VOICEVOX")
+    
+    # Windowsの場合（将来的に対応）
+    elif platform.system() == 'Windows':
+        # Windowsでの一般的なインストールパスをチェック
+        paths = [
+            os.path.join(os.environ.get('ProgramFiles', 'C:\\Program Files'), 'VOICEVOX'),
+            os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'VOICEVOX')
+        ]
+        for path in paths:
+            if validate_voicevox_path(path):
+                log_message(f"Windows標準パスでVOICEVOXを発見: {path}", level="INFO", prefix="VOICEVOX")
+                return path
+    
+    log_message("有効なVOICEVOXパスが見つかりませんでした", level="WARN", prefix="VOICEVOX")
+    return None
+
+def load_config(path=CONFIG_PATH):
+    """設定ファイルを読み込む
+    
+    Args:
+        path (str): 設定ファイルのパス
+        
+    Returns:
+        dict: 保存されている設定（ファイルがない・読めない場合は空の辞書）
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log_message(f"設定ファイルを読み込めません（既定の設定を使います）: {e}", level="WARN", prefix="設定")
+        return {}
+
+def save_config(config, path=CONFIG_PATH):
+    """設定ファイルを原子的に書き出す
+    
+    Args:
+        config (dict): 保存する設定
+        path (str): 設定ファイルのパス
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log_message(f"設定ファイルを保存できません: {e}", level="WARN", prefix="設定")
+
+class VoicevoxError(Exception):
+    """VOICEVOXエンジンとの通信エラー"""
+
+class VoicevoxConnectionError(VoicevoxError):
+    """VOICEVOXエンジンに接続できない（起動していない・応答しない）"""
+
+# 合成ジョブの取り消しイベント（非同期処理ではタスクごとに保持され、リクエストの直前に確認する）
+synthesis_cancel_event = contextvars.ContextVar("synthesis_cancel_event", default=None)
+
+class VoicevoxResponse:
+    """VOICEVOXエンジンからの応答（status_code / content / json() だけを持つ最小限のもの）"""
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+    
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+    
+    def raise_for_status(self):
+        """4xx/5xx 応答なら VoicevoxError を送出する"""
+        if self.status_code >= 400:
+            raise VoicevoxError(f"{self.status_code} エラー: {self.url} {self.content[:200].decode('utf-8', 'replace')}")
+
+class AsyncVoicevoxClient:
+    """asyncio のストリームで直接HTTP/1.1を話すVOICEVOXエンジンのクライアント
+    
+    keep-alive接続をプールして使い回し、同時リクエスト数をセマフォで制限する。
+    エンドポイントごとのタイムアウトと、接続エラーや5xx応答時の再試行もここで扱う。
+    コルーチンはすべて VoicevoxEventLoop のスレッドで実行する。
+    
+    aiohttp などを使わないのは、pip でのインストールなしに macOS 標準の Python でそのまま
+    起動できるようにするため（VOICEVOX以外の依存はすべて任意）。相手は localhost の
+    VOICEVOXエンジン（uvicorn）だけなので、扱うのはその応答に必要な範囲に限っている。
+    プールした接続が切れていた・応答が途中で切れた・長さが合わない場合は、その接続を捨てて
+    新しい接続でやり直す（tests/test_voicevox_http.py で確認している）。
+    """
+    def __init__(self, url=VOICEVOX_URL, max_concurrency=VOICEVOX_MAX_CONCURRENCY, 
+                 retries=VOICEVOX_MAX_RETRIES, timeouts=None):
+        """
+        Args:
+            url (str): VOICEVOXエンジンのURL
+            max_concurrency (int): 同時リクエスト数の上限
+            retries (int): 再試行回数
+            timeouts (dict, optional): エンドポイント名 -> (接続, 読み込み) タイムアウト
+        """
+        parsed = urllib.parse.urlsplit(url)
+        self.url = url.rstrip('/')
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 80
+        self.base_path = parsed.path.rstrip('/')
+        self.timeouts = dict(VOICEVOX_TIMEOUTS, **(timeouts or {}))
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.semaphore = None  # イベントループ上で最初に使うときに作成
+        self.idle = []         # 使い回せる (reader, writer) の接続
+    
+    async def request(self, method, endpoint, params=None, body=None, retries=None, timeout=None, bounded=True):
+        """リクエストを送って応答を返す
+        
+        Args:
+            method (str): GET または POST
+            endpoint (str): 先頭の/なしのエンドポイント（例: "synthesis"）
+            params (dict, optional): クエリパラメータ
+            body (bytes, optional): リクエストボディ（JSON）
+            retries (int, optional): 再試行回数（省略時はクライアントの設定）
+            timeout (tuple, optional): (接続, 読み込み) タイムアウト
+            bounded (bool): Falseなら同時リクエスト数の制限を受けない（死活確認用）
+            
+        Returns:
+            VoicevoxResponse: 応答（5xxは再試行しても直らなかった場合だけ返す）
+            
+        Raises:
+            VoicevoxConnectionError: 再試行しても接続できなかった場合
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        connect_timeout, read_timeout = timeout or self.timeouts.get(endpoint, VOICEVOX_DEFAULT_TIMEOUT)
+        retries = self.retries if retries is None else retries
+        path = f"{self.base_path}/{endpoint}"
+        if params:
+            path += "?" + urllib.parse.urlencode(params)
+        
+        if not bounded:
+            return await self._request_with_retries(method, path, body, retries, connect_timeout, read_timeout)
+        async with self.semaphore:
+            # 空きを待つ間にジョブが取り消されていれば送らない
+            cancel_event = synthesis_cancel_event.get()
+            if cancel_event is not None and cancel_event.is_set():
+                raise SynthesisCancelled()
+            return await self._request_with_retries(method, path, body, retries, connect_timeout, read_timeout)
+    
+    async def _request_with_retries(self, method, path, body, retries, connect_timeout, read_timeout):
+        error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(0.2 * 2 ** (attempt - 1))
+            try:
+                response = await self._send(method, path, body, connect_timeout, read_timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                error = e
+                continue
+            if response.status_code < 500 or attempt == retries:
+                return response
+            error = f"{response.status_code} 応答"
+        raise VoicevoxConnectionError(f"VOICEVOXエンジンに接続できません: {self.url} ({error})")
+    
+    async def _send(self, method, path, body, connect_timeout, read_timeout):
+        """1回分のリクエストを送る（切れていたkeep-alive接続は新しい接続でやり直す）"""
+        reused = bool(self.idle)
+        if reused:
+            reader, writer = self.idle.pop()
+        else:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), connect_timeout)
+        
+        body = body or b""
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                f"Content-Length: {len(body)}\r\n")
+        if body:
+            head += "Content-Type: application/json\r\n"
+        try:
+            writer.write(head.encode('ascii') + b"\r\n" + body)
+            await writer.drain()
+            status_code, headers, content = await asyncio.wait_for(self._read_response(reader, method), read_timeout)
+        except asyncio.CancelledError:
+            # 取り消された接続は途中の状態なので使い回さない
+            writer.close()
+            raise
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            writer.close()
+            if reused:
+                return await self._send(method, path, body, connect_timeout, read_timeout)
+            raise
+        except asyncio.TimeoutError:
+            writer.close()
+            raise
+        
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self.idle.append((reader, writer))
+        return VoicevoxResponse(f"{self.url}{path}", status_code, headers, content)
+    
+    @staticmethod
+    async def _read_response(reader, method="GET"):
+        """ステータス行・ヘッダー・ボディを読む（Content-Length と chunked に対応）
+        
+        1xx・204・304 と HEAD への応答はボディを持たない。長さの指定がない応答は、
+        サーバーが接続を閉じる場合（Connection: close または HTTP/1.0）だけ EOF まで読む。
+        """
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("エンジンが接続を閉じました")
+            version, status, _ = (status_line.split(b' ', 2) + [b""])[:3]
+            if not version.startswith(b"HTTP/"):
+                # 前の応答の Content-Length より後ろに余分なデータがあった場合など
+                raise ValueError(f"HTTPの応答ではありません: {status_line[:40]!r}")
+            status_code = int(status)
+            
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            # 100 Continue などの途中経過の応答は読み飛ばす
+            if not 100 <= status_code < 200 or status_code == 101:
+                break
+        
+        connection = headers.get("connection", "").lower()
+        if version == b"HTTP/1.0" and connection != "keep-alive":
+            headers["connection"] = connection = "close"
+        
+        if method == "HEAD" or 100 <= status_code < 200 or status_code in (204, 304):
+            content = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    # トレーラーを読み捨てる
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await reader.readexactly(int(headers["content-length"]))
+        elif connection == "close":
+            content = await reader.read()
+        else:
+            # 長さの分からないkeep-alive応答は空として扱い、続きが混ざらないよう接続は使い回さない
+            content = b""
+            headers["connection"] = "close"
+        return status_code, headers, content
+    
+    async def is_running(self):
+        """エンジンが応答するかどうかを再試行なしで確認する（同時リクエスト数の制限を受けない）"""
+        try:
+            response = await self.request("GET", "version", retries=0, bounded=False)
+            return response.status_code == 200
+        except VoicevoxError:
+            return False
+    
+    async def version(self):
+        response = await self.request("GET", "version")
+        response.raise_for_status()
+        return response.json()
+    
+    async def speakers(self):
+        response = await self.request("GET", "speakers")
+        response.raise_for_status()
+        return response.json()
+    
+    async def is_initialized_speaker(self, speaker):
+        response = await self.request("GET", "is_initialized_speaker", params={'speaker': speaker})
+        response.raise_for_status()
+        return bool(response.json())
+    
+    async def initialize_speaker(self, speaker):
+        """話者のモデルを読み込む（読み込み済みなら何もしない）"""
+        response = await self.request("POST", "initialize_speaker", params={'speaker': speaker, 'skip_reinit': 'true'})
+        response.raise_for_status()
+    
+    async def audio_query(self, text, speaker):
+        response = await self.request("POST", "audio_query", params={'text': text, 'speaker': speaker})
+        response.raise_for_status()
+        return response.json()
+    
+    async def synthesis(self, query, speaker):
+        response = await self.request("POST", "synthesis", params={'speaker': speaker}, 
+                                      body=json.dumps(query).encode('utf-8'))
+        response.raise_for_status()
+        return response.content
+    
+    async def multi_synthesis(self, queries, speaker):
+        """複数のクエリをまとめて合成する（zipはメモリ上で展開し、クエリと同じ順序で返す）"""
+        response = await self.request("POST", "multi_synthesis", params={'speaker': speaker}, 
+                                      body=json.dumps(queries).encode('utf-8'))
+        response.raise_for_status()
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            # エンジンは 001.wav, 002.wav ... の名前で順番に格納する
+            names = sorted(name for name in archive.namelist() if name.endswith('.wav'))
+            return [archive.read(name) for name in names]
+    
+    async def close(self):
+        """プールしている接続を閉じる"""
+        idle, self.idle = self.idle, []
+        for _, writer in idle:
+            writer.close()
+
+class VoicevoxEventLoop:
+    """VOICEVOXとの通信をまとめて実行するイベントループのスレッド
+    
+    先読み・バッチ書き出し・文単位の合成のリクエストはすべてこのスレッドで並行に処理され、
+    同時リクエスト数は AsyncVoicevoxClient のセマフォで制限される。
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="voicevox-loop", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def submit(self, coro):
+        """コルーチンをループに投入する
+        
+        Returns:
+            concurrent.futures.Future: 結果を受け取るFuture（cancel() で実行中のリクエストも取り消せる）
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro):
+        """コルーチンを実行して結果を待つ（ループのスレッド以外から呼ぶ）"""
+        if threading.current_thread() is self.thread:
+            coro.close()
+            raise RuntimeError("イベントループのスレッドからは同期APIを呼べません")
+        return self.submit(coro).result()
+    
+    def close(self, timeout=1.0):
+        """プールしている接続を閉じてループを止める"""
+        async def close_clients():
+            for client in list(async_voicevox_clients.values()):
+                await client.close()
+        try:
+            self.submit(close_clients()).result(timeout)
+        except Exception as e:
+            log_message(f"VOICEVOXとの接続を閉じられませんでした: {e}", level="DEBUG", prefix="VOICEVOX")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+voicevox_loop = None
+voicevox_loop_lock = threading.Lock()
+
+def get_voicevox_loop():
+    """VOICEVOX通信用のイベントループを返す（初回呼び出し時にスレッドを起動）"""
+    global voicevox_loop
+    with voicevox_loop_lock:
+        if voicevox_loop is None:
+            voicevox_loop = VoicevoxEventLoop()
+            # 終了処理中に残った接続がインタプリタの後始末と競合しないよう、先に閉じておく
+            atexit.register(close_voicevox_loop)
+        return voicevox_loop
+
+def close_voicevox_loop():
+    """VOICEVOX通信用のイベントループを止める（以後に使う場合は新しく起動する）"""
+    global voicevox_loop
+    with voicevox_loop_lock:
+        loop, voicevox_loop = voicevox_loop, None
+    if loop is not None:
+        loop.close()
+
+def run_voicevox_async(coro):
+    """コルーチンをVOICEVOX通信用のイベントループで実行して結果を返す（同期APIの実装用）"""
+    return get_voicevox_loop().run(coro)
+
+# エンジンURLごとの共有クライアント
+async_voicevox_clients = {}
+voicevox_clients = {}
+voicevox_clients_lock = threading.RLock()
+
+def get_async_voicevox_client(url=VOICEVOX_URL):
+    """URLごとに共有のAsyncVoicevoxClientを返す"""
+    with voicevox_clients_lock:
+        client = async_voicevox_clients.get(url)
+        if client is None:
+            client = async_voicevox_clients[url] = AsyncVoicevoxClient(url)
+        return client
+
+class VoicevoxClient:
+    """AsyncVoicevoxClient を同期的に使うためのラッパー（GUIや監視スレッドから呼ぶ）"""
+    def __init__(self, url=VOICEVOX_URL):
+        self.url = url.rstrip('/')
+        self.async_client = get_async_voicevox_client(url)
+    
+    def get(self, endpoint, **kwargs):
+        """GETリクエストを送る（endpointは先頭の/なし、例: "speakers"）"""
+        return self._request("GET", endpoint, **kwargs)
+    
+    def post(self, endpoint, **kwargs):
+        """POSTリクエストを送る（endpointは先頭の/なし、例: "synthesis"）"""
+        return self._request("POST", endpoint, **kwargs)
+    
+    def is_running(self):
+        """エンジンが応答するかどうかを再試行なしで確認する"""
+        return run_voicevox_async(self.async_client.is_running())
+    
+    def close(self):
+        """プールしている接続を閉じる"""
+        run_voicevox_async(self.async_client.close())
+    
+    def _request(self, method, endpoint, params=None, data=None, timeout=None):
+        body = data.encode('utf-8') if isinstance(data, str) else data
+        return run_voicevox_async(self.async_client.request(method, endpoint, params, body, timeout=timeout))
+
+def get_voicevox_client(url=VOICEVOX_URL):
+    """URLごとに共有のVoicevoxClient（同期API）を返す"""
+    with voicevox_clients_lock:
+        client = voicevox_clients.get(url)
+        if client is None:
+            client = voicevox_clients[url] = VoicevoxClient(url)
+        return client
+
+def is_voicevox_engine_running(url=VOICEVOX_URL):
+    """VOICEVOXエンジンが起動しているか確認する（EnginePool ならいずれかが応答するか）"""
+    if isinstance(url, EnginePool):
+        return url.is_running()
+    
+    return get_voicevox_client(url).is_running()
+
+# エンジンURLごとのバージョン情報（キャッシュキーに使用）
+voicevox_versions = {}
+
+async def get_voicevox_version_async(url=VOICEVOX_URL, refresh=False):
+    """VOICEVOXエンジンのバージョンを取得する（取得できた値はURLごとに記憶）
+    
+    Args:
+        url (str or EnginePool): エンジンのURL
+        refresh (bool): 記憶している値があってもエンジンに問い合わせ直す
+        
+    Returns:
+        str or None: バージョン文字列、取得できない場合はNone
+    """
+    if isinstance(url, EnginePool):
+        # プール内のエンジンは同じバージョンを使う前提
+        url = url.primary_url
+    if url in voicevox_versions and not refresh:
+        return voicevox_versions[url]
+    
+    try:
+        voicevox_versions[url] = await get_async_voicevox_client(url).version()
+        return voicevox_versions[url]
+    except VoicevoxError:
+        return None
+
+def get_voicevox_version(url=VOICEVOX_URL):
+    """get_voicevox_version_async の同期版"""
+    if not isinstance(url, EnginePool) and url in voicevox_versions:
+        return voicevox_versions[url]
+    return run_voicevox_async(get_voicevox_version_async(url))
+
+def cached_voicevox_version(url=VOICEVOX_URL):
+    """取得済みのエンジンバージョンを返す（通信しないのでメインスレッドから呼べる。未取得ならNone）"""
+    if isinstance(url, EnginePool):
+        url = url.primary_url
+    return voicevox_versions.get(url)
+
+def refresh_voicevox_version(url=VOICEVOX_URL):
+    """通信用のイベントループでバージョンを取得し直す（結果は待たない）
+    
+    取得し終えるまでは記憶している値をそのまま使い、取得できた時点で上書きする。
+    取得中に捨ててしまうと、その間に作ったキャッシュキーだけバージョンが抜けてしまうため。
+    
+    Returns:
+        concurrent.futures.Future: 取得したバージョン（取得できなければNone）を返すFuture
+    """
+    return get_voicevox_loop().submit(get_voicevox_version_async(url, refresh=True))
+
+def speech_rate_to_speed_scale(speech_rate):
+    """読み上げ速度（WPM）をVOICEVOXのspeedScaleに変換する"""
+    # 標準速度（220WPM）との比率を計算し、0.5～3.0の範囲に制限
+    return max(0.5, min(3.0, speech_rate / 220.0))
+
+def launch_voicevox_engine(user_specified_path=None, port=50021, cpu_num_threads=None, track=True):
+    """VOICEVOXエンジンのプロセスを起動する（起動完了は待たない）
+    
+    Args:
+        user_specified_path (str, optional): ユーザーが指定したVOICEVOXパス
+        port (int): エンジンが待ち受けるポート
+        cpu_num_threads (int, optional): エンジンが推論に使うCPUスレッド数（--cpu_num_threads）
+        track (bool): Trueなら終了時に止めるエンジンとして記録する（EnginePool は自分で管理する）
+        
+    Returns:
+        subprocess.Popen or None: 起動したプロセス、起動できない場合はNone
+    """
+    global voicevox_process
+    
+    # パスを検索（ユーザー指定のパスがある場合はそれを優先）
+    voicevox_path = find_voicevox_path(user_specified_path)
+    if not voicevox_path:
+        log_message("VOICEVOXのインストールパスが見つかりません", level="ERROR", prefix="VOICEVOX")
+        return None
+    
+    try:
+        # macOS
+        if platform.system() == 'Darwin':
+            # VOICEVOX.app内のengineを起動
+            engine_path = os.path.join(voicevox_path, 'Contents', 'Resources', 'vv-engine', 'run')
+            if not os.path.exists(engine_path):
+                log_message(f"VOICEVOXエンジン実行ファイルが見つかりません: {engine_path}", level="ERROR", prefix="VOICEVOX")
+                return None
+            
+            log_message(f"VOICEVOXエンジンを起動しています: {engine_path}", level="INFO", prefix="VOICEVOX")
+            # 出力は読まないので捨てる（PIPEのままだとバッファが詰まってエンジンが止まる）
+            command = [engine_path, '--host=localhost', f'--port={port}']
+            if cpu_num_threads:
+                command.append(f'--cpu_num_threads={cpu_num_threads}')
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not track:
+                return process
+            if voicevox_process is None:
+                # プロセスが終了しないよう、atexitで登録
+                atexit.register(stop_voicevox_engine)
+            voicevox_process = process
+            return process
+        
+        # Windows（将来的に対応）
+        elif platform.system() == 'Windows':
+            # Windowsでの起動方法（将来実装）
+            log_message("Windows環境でのVOICEVOX自動起動は現在サポートされていません", level="WARN", prefix="VOICEVOX")
+            return None
+        
+        else:
+            log_message(f"サポートされていないOS: {platform.system()}", level="ERROR", prefix="VOICEVOX")
+            return None
+        
+    except Exception as e:
+        log_message(f"VOICEVOXエンジン起動エラー: {e}", level="ERROR", prefix="VOICEVOX")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def wait_for_voicevox_engine(url=VOICEVOX_URL, timeout=30.0, process=None, stop_event=None, 
+                             initial_delay=0.1, max_delay=2.0):
+    """/version が応答するまで間隔を倍々に広げながら待つ
+    
+    Args:
+        url (str): VOICEVOXエンジンのURL
+        timeout (float): 最大待ち時間（秒）
+        process (subprocess.Popen, optional): 起動したプロセス（途中で終了したら待つのをやめる）
+        stop_event (threading.Event, optional): セットされたら待つのをやめる
+        initial_delay (float): 最初の確認間隔（秒）
+        max_delay (float): 確認間隔の上限（秒）
+        
+    Returns:
+        bool: 応答があればTrue
+    """
+    deadline = time.time() + timeout
+    delay = initial_delay
+    while True:
+        if is_voicevox_engine_running(url):
+            return True
+        if process is not None and process.poll() is not None:
+            log_message(f"VOICEVOXエンジンが終了しました (終了コード: {process.returncode})", level="ERROR", prefix="VOICEVOX")
+            return False
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        if stop_event is not None:
+            if stop_event.wait(min(delay, remaining)):
+                return False
+        else:
+            time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+def start_voicevox_engine(user_specified_path=None):
+    """VOICEVOXエンジンを起動し、応答するまで待つ
+    
+    Args:
+        user_specified_path (str, optional): ユーザーが指定したVOICEVOXパス
+        
+    Returns:
+        bool: 起動に成功した場合はTrue、失敗した場合はFalse
+    """
+    with voicevox_start_lock:
+        if is_voicevox_engine_running():
+            log_message("VOICEVOXエンジンはすでに実行中です", level="INFO", prefix="VOICEVOX")
+            return True
+        
+        process = launch_voicevox_engine(user_specified_path)
+        if not process:
+            return False
+        
+        if wait_for_voicevox_engine(VOICEVOX_URL, process=process):
+            log_message("VOICEVOXエンジンが起動しました", level="SUCCESS", prefix="VOICEVOX")
+            return True
+        log_message("VOICEVOXエンジンの起動がタイムアウトしました", level="ERROR", prefix="VOICEVOX")
+        return False
+
+def stop_voicevox_engine():
+    """VOICEVOXエンジンを停止する"""
+    global voicevox_process
+    if voicevox_process:
+        try:
+            print("VOICEVOXエンジンを停止します")
+            voicevox_process.terminate()
+            voicevox_process.wait(timeout=5)
+            voicevox_process = None
+        except Exception as e:
+            print(f"VOICEVOXエンジン停止エラー: {e}")
+            try:
+                voicevox_process.kill()
+            except:
+                pass
+
+class EngineSupervisor:
+    """VOICEVOXエンジンの起動と死活監視をバックグラウンドで行う
+    
+    状態は stopped → starting → ready / failed と遷移し、ready の間に子プロセスが
+    終了したり応答がなくなったりすると restarting を経て再起動する。
+    状態が変わるたびに登録したリスナーを監視スレッドから呼び出す。
+    """
+    STOPPED = "stopped"
+    STARTING = "starting"
+    READY = "ready"
+    FAILED = "failed"
+    RESTARTING = "restarting"
+    
+    def __init__(self, url=VOICEVOX_URL, launcher=None, startup_timeout=30.0, check_interval=5.0, max_restarts=3):
+        """
+        Args:
+            url (str): 監視するエンジンのURL
+            launcher (callable, optional): 引数なしでエンジンを起動し Popen（起動できなければNone）を返す関数
+            startup_timeout (float): 起動を待つ最大時間（秒）
+            check_interval (float): ready 中の死活確認の間隔（秒）
+            max_restarts (int): 自動再起動の上限回数
+        """
+        self.url = url
+        self.launcher = launcher
+        self.startup_timeout = startup_timeout
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.state = self.STOPPED
+        self.process = None
+        self.restarts = 0
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def add_listener(self, listener):
+        """状態変化の通知先を登録する（listener(state, message) が監視スレッドから呼ばれる）"""
+        self.listeners.append(listener)
+    
+    def start(self, launcher=None):
+        """監視スレッドを開始する（すでに動いていれば何もしない）
+        
+        Args:
+            launcher (callable, optional): 起動関数を差し替える場合に指定
+        """
+        with self.lock:
+            if launcher is not None:
+                self.launcher = launcher
+            if self.thread and self.thread.is_alive():
+                return
+            self.stop_event.clear()
+            self.restarts = 0
+            # 待機中の呼び出し元が前回の結果を見ないよう、スレッド開始前に状態を進める
+            self._set_state(self.STARTING, "VOICEVOXエンジンを起動中...")
+            self.thread = threading.Thread(target=self._run, name="voicevox-supervisor", daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        """監視を止める（起動したプロセスの停止は stop_voicevox_engine で行う）"""
+        self.stop_event.set()
+        self._set_state(self.STOPPED, "監視を停止しました")
+    
+    def wait_until_ready(self, timeout=None):
+        """起動処理の結果が出るまで待つ
+        
+        Returns:
+            bool: ready になればTrue（failed / stopped やタイムアウトの場合はFalse）
+        """
+        settled = (self.READY, self.FAILED, self.STOPPED)
+        with self.condition:
+            self.condition.wait_for(lambda: self.state in settled, timeout)
+            return self.state == self.READY
+    
+    def is_ready(self):
+        return self.state == self.READY
+    
+    def _set_state(self, state, message=""):
+        with self.condition:
+            if state == self.state:
+                return
+            self.state = state
+            self.condition.notify_all()
+        log_message(f"エンジン状態: {state} {message}", level="DEBUG", prefix="VOICEVOX")
+        for listener in list(self.listeners):
+            try:
+                listener(state, message)
+            except Exception as e:
+                log_message(f"状態通知エラー: {e}", level="ERROR", prefix="VOICEVOX")
+    
+    def _run(self):
+        """監視スレッド本体"""
+        if not self._bring_up():
+            self._set_state(self.FAILED, "VOICEVOXエンジンの起動に失敗しました")
+            return
+        self._set_state(self.READY, "VOICEVOXエンジンの準備ができました")
+        
+        while not self.stop_event.wait(self.check_interval):
+            process_died = self.process is not None and self.process.poll() is not None
+            if not process_died and is_voicevox_engine_running(self.url):
+                continue
+            
+            if self.restarts >= self.max_restarts:
+                self._set_state(self.FAILED, "VOICEVOXエンジンが停止しました（再起動の上限に達しました）")
+                return
+            self.restarts += 1
+            self._set_state(self.RESTARTING, f"VOICEVOXエンジンが停止したため再起動しています... ({self.restarts}/{self.max_restarts})")
+            self.process = None
+            if not self._bring_up():
+                self._set_state(self.FAILED, "VOICEVOXエンジンの再起動に失敗しました")
+                return
+            self._set_state(self.READY, "VOICEVOXエンジンを再起動しました")
+    
+    def _bring_up(self):
+        """エンジンが応答しなければ起動し、応答するまで待つ"""
+        if is_voicevox_engine_running(self.url):
+            return True
+        if self.launcher is None:
+            return wait_for_voicevox_engine(self.url, self.startup_timeout, stop_event=self.stop_event)
+        
+        self.process = self.launcher()
+        if self.process is None:
+            return False
+        return wait_for_voicevox_engine(self.url, self.startup_timeout, self.process, self.stop_event)
+
+class EnginePool:
+    """複数のVOICEVOXエンジンに合成リクエストを振り分ける
+    
+    エンジンごとに実行中のリクエスト数を数え、最も空いている正常なエンジンに割り当てる。
+    接続できなかったエンジンは retry_after 秒のあいだ割り当て対象から外し、
+    そのリクエストは別のエンジンでやり直す。
+    """
+    def __init__(self, urls, per_engine_concurrency=2, retry_after=5.0):
+        """
+        Args:
+            urls (list): エンジンのURLのリスト
+            per_engine_concurrency (int): 1エンジンあたりの同時リクエスト数
+            retry_after (float): 接続に失敗したエンジンを再び使うまでの秒数
+        """
+        self.urls = [url.rstrip('/') for url in urls]
+        self.per_engine_concurrency = per_engine_concurrency
+        self.retry_after = retry_after
+        self.in_flight = {url: 0 for url in self.urls}
+        self.unhealthy_until = {url: 0.0 for url in self.urls}
+        self.lock = threading.Lock()
+        self.released = None  # 空きができたことを知らせる asyncio.Event（イベントループ上で最初に使うときに作成）
+        self.processes = []  # このプールが起動したエンジンのプロセス
+        self.rotation = itertools.count()
+    
+    @classmethod
+    def launch(cls, count, base_port=50021, cpu_num_threads=None, user_specified_path=None, startup_timeout=60.0):
+        """count 個のエンジンを base_port から順に起動し（起動済みならそれを使う）、プールを作る
+        
+        Args:
+            count (int): エンジン数
+            base_port (int): 最初のエンジンのポート
+            cpu_num_threads (int, optional): 1エンジンあたりのCPUスレッド数（省略時はコア数をエンジン数で割る）
+            user_specified_path (str, optional): ユーザーが指定したVOICEVOXパス
+            startup_timeout (float): 起動を待つ最大秒数
+            
+        Returns:
+            EnginePool: 応答したエンジンだけを含むプール（1つもなければNone）
+        """
+        if cpu_num_threads is None:
+            cpu_num_threads = max(1, (os.cpu_count() or 1) // count)
+        pool = cls([f"http://127.0.0.1:{base_port + i}" for i in range(count)])
+        atexit.register(pool.stop)
+        
+        launched = []
+        for url in pool.urls:
+            if is_voicevox_engine_running(url):
+                log_message(f"起動済みのエンジンを使います: {url}", level="INFO", prefix="エンジンプール")
+                continue
+            port = int(url.rsplit(':', 1)[1])
+            process = launch_voicevox_engine(user_specified_path, port, cpu_num_threads, track=False)
+            if process is not None:
+                pool.processes.append(process)
+                launched.append((url, process))
+        
+        # 起動待ちは並行して行う
+        results = {}
+        threads = [threading.Thread(target=lambda u=url, p=process: results.__setitem__(u, wait_for_voicevox_engine(u, startup_timeout, p)))
+                   for url, process in launched]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        ready = [url for url in pool.urls if results.get(url, True) and is_voicevox_engine_running(url)]
+        if not ready:
+            pool.stop()
+            return None
+        pool.urls = ready
+        log_message(f"{len(ready)}個のエンジンで合成します（CPUスレッド数: {cpu_num_threads}）", 
+                  level="SUCCESS", prefix="エンジンプール")
+        return pool
+    
+    @property
+    def primary_url(self):
+        """バージョン確認などに使う代表のURL（正常なエンジンを優先）"""
+        now = time.time()
+        return next((url for url in self.urls if self.unhealthy_until[url] <= now), self.urls[0])
+    
+    @property
+    def concurrency(self):
+        """プール全体の同時リクエスト数"""
+        return len(self.urls) * self.per_engine_concurrency
+    
+    def is_running(self):
+        """いずれかのエンジンが応答するかどうか"""
+        return any(is_voicevox_engine_running(url) for url in self.urls)
+    
+    async def acquire(self):
+        """最も空いている正常なエンジンのURLを返す（空きがなければ待つ。イベントループ上で呼ぶ）
+        
+        待っている間に取り消された場合は何も割り当てない。
+        
+        Raises:
+            ConnectionError: 応答するエンジンが1つもない場合
+        """
+        if self.released is None:
+            self.released = asyncio.Event()
+        while True:
+            url = self._try_acquire()
+            if url is not None:
+                return url
+            if not self._healthy_urls():
+                # 全滅している場合は待たずに確認し直す（確認中はロックを持たない）
+                running = await asyncio.gather(*(get_async_voicevox_client(url).is_running() for url in self.urls))
+                healthy = [url for url, ok in zip(self.urls, running) if ok]
+                if not healthy:
+                    raise ConnectionError("応答するVOICEVOXエンジンがありません")
+                with self.lock:
+                    for url in healthy:
+                        self.unhealthy_until[url] = 0.0
+                continue
+            # 割り当てに失敗してから待ち始めるまでの間に release は割り込まない（同じイベントループ上で動く）
+            self.released.clear()
+            try:
+                await asyncio.wait_for(self.released.wait(), self.retry_after)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _healthy_urls(self):
+        now = time.time()
+        return [url for url in self.urls if self.unhealthy_until[url] <= now]
+    
+    def _try_acquire(self):
+        """待たずに割り当てられるエンジンがあればそのURLを返す（なければNone）"""
+        with self.lock:
+            available = [url for url in self._healthy_urls() if self.in_flight[url] < self.per_engine_concurrency]
+            if not available:
+                return None
+            # 実行中の数が同じなら順番に回す
+            offset = next(self.rotation)
+            url = min(available, key=lambda u: (self.in_flight[u], (self.urls.index(u) - offset) % len(self.urls)))
+            self.in_flight[url] += 1
+            return url
+    
+    def release(self, url, failed=False):
+        """acquire で受け取ったURLを返す（failed=Trueならしばらく割り当てない。イベントループ上で呼ぶ）"""
+        with self.lock:
+            self.in_flight[url] -= 1
+            if failed:
+                self.unhealthy_until[url] = time.time() + self.retry_after
+        if failed:
+            log_message(f"エンジンに接続できないため一時的に外します: {url}", level="WARN", prefix="エンジンプール")
+        if self.released is not None:
+            self.released.set()
+    
+    async def run_async(self, func, *args, **kwargs):
+        """空いているエンジンで await func(*args, url=エンジンURL, **kwargs) を実行する
+        
+        空きはイベントループ上で待つので、待っている間に取り消されてもエンジンの枠は減らない。
+        接続エラーになった場合は別のエンジンでやり直す。
+        """
+        last_error = None
+        for _ in range(len(self.urls)):
+            url = await self.acquire()
+            try:
+                result = await func(*args, url=url, **kwargs)
+            except VoicevoxConnectionError as e:
+                self.release(url, failed=True)
+                last_error = e
+                continue
+            except BaseException:
+                self.release(url)
+                raise
+            self.release(url)
+            return result
+        raise last_error
+    
+    def stop(self):
+        """このプールが起動したエンジンを停止する"""
+        processes, self.processes = self.processes, []
+        for process in processes:
+            try:
+                process.terminate()
+                process.wait(timeout=5)
+            except Exception as e:
+                log_message(f"エンジン停止エラー: {e}", level="WARN", prefix="エンジンプール")
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+
+class SpeakerWarmer:
+    """話者のモデルの読み込みをバックグラウンドで済ませておく
+    
+    エンジンの起動完了時・話者の変更時・よく使う話者の指定時に warm() を呼ぶと、
+    /is_initialized_speaker で確認してから /initialize_speaker をイベントループ上で実行する。
+    同じ (エンジン, 話者) の読み込みは重複して依頼しない。
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}   # キー: (URL, 話者ID), 値: concurrent.futures.Future
+        self.warmed = set()  # 読み込みを確認した (URL, 話者ID)
+    
+    def warm(self, speakers, url=VOICEVOX_URL):
+        """話者のモデルの読み込みを依頼する（すぐに戻る）
+        
+        Args:
+            speakers (iterable): 話者IDのリスト（先頭から順に読み込む）
+            url (str or EnginePool): VOICEVOXエンジンのURL
+        """
+        loop = get_voicevox_loop()
+        submitted = []
+        with self.lock:
+            for speaker in speakers:
+                key = (url, speaker)
+                if key in self.warmed or key in self.pending:
+                    continue
+                future = loop.submit(self._warm(speaker, url))
+                self.pending[key] = future
+                submitted.append((key, future))
+        # 完了済みのFutureでは add_done_callback がその場で _on_done を呼ぶので、ロックを放してから登録する
+        for key, future in submitted:
+            future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+    
+    def forget(self, url=VOICEVOX_URL):
+        """エンジンが再起動した場合など、読み込み済みの記録を消す"""
+        with self.lock:
+            self.warmed = {key for key in self.warmed if key[0] != url}
+    
+    async def _warm(self, speaker, url):
+        if not await get_async_voicevox_client(url.primary_url if isinstance(url, EnginePool) else url).is_running():
+            return False
+        started = time.time()
+        if await initialize_speaker_async(speaker, url):
+            log_message(f"話者 {speaker} のモデルを読み込みました ({time.time() - started:.1f}秒)", 
+                      level="INFO", prefix="話者準備")
+        return True
+    
+    def _on_done(self, key, future):
+        with self.lock:
+            self.pending.pop(key, None)
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None and future.result():
+                self.warmed.add(key)
+        if error is not None:
+            log_message(f"話者 {key[1]} のモデルを読み込めませんでした: {error}", level="WARN", prefix="話者準備")
+
+class SpeakerCatalog:
+    """VOICEVOXの話者・スタイル一覧（/speakers）をエンジンのバージョンごとにディスクへ保存して使う
+    
+    起動時は前回保存した一覧をすぐに読み込み、エンジンの準備ができたら refresh_async で
+    取得し直す。表示名は「話者名（スタイル名）」、ノーマルのスタイルは話者名だけにする。
+    """
+    def __init__(self, cache_dir=SPEAKER_CATALOG_DIR):
+        self.cache_dir = cache_dir
+        self.version = None
+        self.styles = OrderedDict()  # キー: 表示名, 値: スタイルID（= 合成時の speaker）
+    
+    @staticmethod
+    def flatten(speakers):
+        """/speakers の応答を 表示名 -> スタイルID の辞書にする"""
+        styles = OrderedDict()
+        for speaker in speakers:
+            for style in speaker.get("styles", []):
+                name = speaker["name"] if style["name"] == "ノーマル" else f"{speaker['name']}（{style['name']}）"
+                styles[name] = style["id"]
+        return styles
+    
+    def _path(self, version):
+        return os.path.join(self.cache_dir, "speakers_" + re.sub(r'[^\w.-]', '_', version) + ".json")
+    
+    def load_latest(self):
+        """最後に保存した一覧を読み込む（ネットワークには接続しない）
+        
+        Returns:
+            bool: 読み込めた場合はTrue
+        """
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) 
+                     if name.startswith("speakers_") and name.endswith(".json")]
+        except OSError:
+            return False
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.version = data["version"]
+                self.styles = self.flatten(data["speakers"])
+                return True
+            except Exception as e:
+                log_message(f"話者一覧を読み込めませんでした: {path} ({e})", level="WARN", prefix="話者一覧")
+        return False
+    
+    def _save(self, version, speakers):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(version)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": version, "fetched": time.time(), "speakers": speakers}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    async def refresh_async(self, url=VOICEVOX_URL):
+        """エンジンから一覧を取得してディスクに保存する
+        
+        Returns:
+            bool: 一覧の内容が変わった場合はTrue
+        """
+        if isinstance(url, EnginePool):
+            url = url.primary_url
+        version = await get_voicevox_version_async(url) or "unknown"
+        speakers = await get_async_voicevox_client(url).speakers()
+        styles = self.flatten(speakers)
+        await asyncio.get_running_loop().run_in_executor(None, self._save, version, speakers)
+        changed = styles != self.styles
+        self.version = version
+        self.styles = styles
+        log_message(f"話者一覧を更新しました: {len(styles)}スタイル (エンジン {version})", 
+                  level="INFO" if changed else "DEBUG", prefix="話者一覧")
+        return changed
+
+# スクリプト処理と音声生成（GUIとバッチ書き出しで共用）
+SLIDE_CACHE_ENTRIES = 16  # SlideIndex がメモリに保持するスライド数
+SLIDE_RECORD_CACHE_ENTRIES = 256  # SlideIndex がメモリに保持する SlideRecord の数
+SPEECH_CHARS_PER_SECOND = 7.0  # speedScale=1.0 で1秒あたりに読み上げる文字数の目安
+
+# 1枚分の前処理結果（変更不可）
+#   raw: スライドの生テキスト, lines: 読み上げる行のタプル, speech_text: 行を空白で結合した読み上げテキスト,
+#   char_count: 読み上げ文字数, estimated_duration: speedScale=1.0 での推定読み上げ秒数,
+#   content_hash: speech_text のSHA-256（音声キャッシュのキーと変更検出に使う）
+SlideRecord = namedtuple("SlideRecord", "raw lines speech_text char_count estimated_duration content_hash")
+
+def build_slide_record(raw):
+    """スライドの生テキストから SlideRecord を作成する"""
+    lines = tuple(process_text_for_speech(raw))
+    speech_text = " ".join(lines)
+    return SlideRecord(raw, lines, speech_text, len(speech_text), len(speech_text) / SPEECH_CHARS_PER_SECOND,
+                       hashlib.sha256(speech_text.encode('utf-8')).hexdigest())
+
+def estimate_speech_duration(record, speech_rate):
+    """読み上げ速度を考慮した推定読み上げ秒数を返す"""
+    return record.estimated_duration / speech_rate_to_speed_scale(speech_rate)
+
+class SlideIndex:
+    """台本ファイル内の各スライドの位置だけを記録し、本文は必要になったときに読み込む
+    
+    ファイルを1行ずつ走査して ## 見出し行のバイト位置を記録するので、巨大な台本でも
+    すぐに開け、メモリ使用量は読み込んだスライド分だけで済む。
+    スライドのテキストは従来の parse_slides と同じ（見出しより前の部分も1枚目として扱う）。
+    リストと同じように len() / インデックス / 反復で使える。
+    
+    record() で読み上げ用に前処理した SlideRecord を返す。SlideRecord は最近使った分だけ
+    保持し、全スライドの content_hash と推定読み上げ秒数は precompute() で別に記録する。
+    """
+    CR_LINE_RE = re.compile(rb'(?<=\r)(?!\n)')  # LFが続かないCRの直後（CRだけの改行）
+    
+    def __init__(self, file_path, cache_entries=SLIDE_CACHE_ENTRIES):
+        self.file_path = file_path
+        self.cache_entries = cache_entries
+        self.cache = OrderedDict()  # キー: スライド番号, 値: テキスト（古い順）
+        self.records = OrderedDict()  # キー: スライド番号, 値: SlideRecord（古い順）
+        self.lock = threading.Lock()
+        self.offsets = []  # 各スライドの (開始位置, 終了位置, 見出し前の部分か)
+        self.texts = None  # ファイルを使わない場合のテキストのリスト
+        if file_path is not None:
+            with tracer.span("parse", file=os.path.basename(file_path)):
+                self._build()
+        self.content_hashes = [None] * len(self)
+        self.estimated_durations = [None] * len(self)
+    
+    @classmethod
+    def from_texts(cls, texts):
+        """ファイルを使わずにテキストのリストから作成する（メッセージ表示用）"""
+        index = cls.__new__(cls)
+        index.file_path = None
+        index.texts = list(texts)
+        index.offsets = []
+        index.raw_hashes = []
+        index.cache_entries = SLIDE_CACHE_ENTRIES
+        index.cache = OrderedDict()
+        index.records = OrderedDict()
+        index.lock = threading.Lock()
+        index.content_hashes = [None] * len(index.texts)
+        index.estimated_durations = [None] * len(index.texts)
+        return index
+    
+    def _build(self):
+        """ファイルを走査してスライドの区切り位置を記録する"""
+        stat = os.stat(self.file_path)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        
+        starts = []
+        digests = []  # 区切りごとの生バイト列のハッシュ（再読み込み時の差分検出用）
+        hasher = hashlib.sha1()
+        offset = 0
+        with open(self.file_path, 'rb') as f:
+            for raw_line in f:
+                # CRだけの改行も従来どおり行の区切りとして扱う（CRLFはそのまま1行）
+                for line in self.CR_LINE_RE.split(raw_line) if b'\r' in raw_line else (raw_line,):
+                    if line.startswith(b'## '):
+                        if offset > 0:
+                            digests.append(hasher.digest())
+                        hasher = hashlib.sha1()
+                        starts.append(offset)
+                    hasher.update(line)
+                    offset += len(line)
+        digests.append(hasher.digest())
+        
+        # 最初の見出しより前に内容がある（または見出しがない）場合はそれも1枚目にする
+        if not starts or starts[0] > 0:
+            self.offsets.append((0, starts[0] if starts else offset, True))
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else offset
+            self.offsets.append((start, end, False))
+        
+        # 最後のスライドかどうかでテキストの末尾が変わるので、それも含めて比較する
+        self.raw_hashes = [(digest, preamble, i == len(self.offsets) - 1)
+                           for i, (digest, (_, _, preamble)) in enumerate(zip(digests, self.offsets))]
+    
+    def refreshed(self):
+        """ファイルを読み直した新しい索引を返す
+        
+        生テキストが変わっていないスライドは前処理結果を引き継ぐので、
+        前処理し直すのは変更された部分だけで済む。
+        """
+        index = SlideIndex(self.file_path, self.cache_entries)
+        previous = {}
+        with self.lock:
+            for idx, raw_hash in enumerate(self.raw_hashes):
+                if self.content_hashes[idx] is not None:
+                    previous[raw_hash] = idx
+            for idx, raw_hash in enumerate(index.raw_hashes):
+                old_idx = previous.get(raw_hash)
+                if old_idx is None:
+                    continue
+                index.content_hashes[idx] = self.content_hashes[old_idx]
+                index.estimated_durations[idx] = self.estimated_durations[old_idx]
+                record = self.records.get(old_idx)
+                if record is not None:
+                    index.records[idx] = record
+        return index
+    
+    def previous_hashes(self, base):
+        """読み直す前の索引 base の各スライドの content_hash を返す
+        
+        base で前処理が終わっていなかったスライドは、生テキストが変わっていなければ
+        この索引で求めた値で補う（前処理前のスライドを「変更あり」と数えないため）。
+        base にしかないスライドで前処理されていなかったものはNoneのまま。
+        
+        Args:
+            base (SlideIndex): refreshed() を呼んだ元の索引
+            
+        Returns:
+            list: base のスライドごとの content_hash
+        """
+        with self.lock:
+            by_raw_hash = {raw_hash: content_hash for raw_hash, content_hash in zip(self.raw_hashes, self.content_hashes)
+                           if content_hash is not None}
+        with base.lock:
+            return [content_hash if content_hash is not None else by_raw_hash.get(raw_hash)
+                    for raw_hash, content_hash in zip(base.raw_hashes, base.content_hashes)]
+    
+    def __len__(self):
+        return len(self.texts) if self.texts is not None else len(self.offsets)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("スライド番号が範囲外です")
+        if self.texts is not None:
+            return self.texts[idx]
+        
+        with self.lock:
+            text = self.cache.get(idx)
+            if text is not None:
+                self.cache.move_to_end(idx)
+                return text
+        
+        text = self._read(idx)
+        with self.lock:
+            self.cache[idx] = text
+            while len(self.cache) > self.cache_entries:
+                self.cache.popitem(last=False)
+        return text
+    
+    def _read(self, idx):
+        """指定したスライドの本文をファイルから読み込む"""
+        start, end, preamble = self.offsets[idx]
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        text = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        # 次のスライドの直前の改行は区切りなので含めない
+        if idx < len(self.offsets) - 1 and text.endswith('\n'):
+            text = text[:-1]
+        return '\n' + text if preamble else text
+    
+    def record(self, idx):
+        """スライドの SlideRecord を返す（作成済みなら使い回す）"""
+        with self.lock:
+            record = self.records.get(idx)
+            if record is not None:
+                self.records.move_to_end(idx)
+                return record
+        
+        with tracer.span("normalize", slide=idx):
+            record = build_slide_record(self[idx])
+        with self.lock:
+            self.records[idx] = record
+            while len(self.records) > SLIDE_RECORD_CACHE_ENTRIES:
+                self.records.popitem(last=False)
+            self.content_hashes[idx] = record.content_hash
+            self.estimated_durations[idx] = record.estimated_duration
+        return record
+    
+    def precompute(self, stop_event=None):
+        """全スライドを前処理して content_hash と推定読み上げ秒数を記録する（バックグラウンドで実行）
+        
+        Returns:
+            bool: 最後まで処理した場合はTrue
+        """
+        started = time.time()
+        for idx in range(len(self)):
+            if stop_event is not None and stop_event.is_set():
+                return False
+            if self.content_hashes[idx] is None:
+                self.record(idx)
+        total = sum(self.estimated_durations)
+        log_message(f"{len(self)}枚のスライドを前処理しました（推定 {total / 60:.1f}分, {time.time() - started:.2f}秒）", 
+                  level="INFO", prefix="台本")
+        return True
+
+def parse_slides(file_path):
+    """マークダウンファイルからスライドを読み込む
+    
+    Returns:
+        SlideIndex: スライドの索引（本文は参照時に読み込む）。読み込めない場合はメッセージだけの索引
+    """
+    if not os.path.exists(file_path):
+        return SlideIndex.from_texts(["ファイルが見つかりません: " + file_path])
+        
+    try:
+        return SlideIndex(file_path)
+    except Exception as e:
+        print(f"ファイル読み込みエラー: {e}")
+        return SlideIndex.from_texts([f"ファイルの読み込みに失敗しました\n{str(e)}"])
+
+class FileWatcher:
+    """台本ファイルの変更を監視し、変更されたらコールバックを呼ぶ
+    
+    Linuxでは inotify（ctypes経由）でディレクトリを監視し、それ以外の環境や
+    inotify を使えない場合は一定間隔で更新日時とサイズを確認する。
+    エディタが一時ファイルを書いてから置き換える保存方法にも対応するため、
+    ファイルそのものではなく親ディレクトリを監視する。
+    """
+    # inotify のイベント種別
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, file_path, on_change, poll_interval=1.0, debounce=0.2):
+        """
+        Args:
+            file_path (str): 監視するファイル
+            on_change (callable): 変更時に引数なしで呼ばれる（監視スレッドで実行）
+            poll_interval (float): ポーリング時の確認間隔（秒）
+            debounce (float): 連続した書き込みをまとめるための待ち時間（秒）
+        """
+        self.file_path = os.path.abspath(file_path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_signature = self._signature()
+    
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def _signature(self):
+        """ファイルの (更新日時, サイズ) を返す（存在しなければNone）"""
+        try:
+            stat = os.stat(self.file_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _check(self):
+        """前回から変わっていればコールバックを呼ぶ"""
+        signature = self._signature()
+        if signature is None or signature == self.last_signature:
+            return
+        self.last_signature = signature
+        try:
+            self.on_change()
+        except Exception as e:
+            log_message(f"変更の反映に失敗しました: {e}", level="ERROR", prefix="ファイル監視")
+            import traceback
+            traceback.print_exc()
+    
+    def _run(self):
+        fd = self._open_inotify()
+        if fd is None:
+            log_message(f"ポーリングでファイルを監視します: {self.file_path}", level="DEBUG", prefix="ファイル監視")
+            while not self.stop_event.wait(self.poll_interval):
+                self._check()
+            return
+        
+        log_message(f"inotifyでファイルを監視します: {self.file_path}", level="DEBUG", prefix="ファイル監視")
+        name = os.path.basename(self.file_path).encode()
+        try:
+            while not self.stop_event.is_set():
+                if not self._wait_for_event(fd, name, 0.5):
+                    continue
+                # 保存が終わるまで少し待ってから、その間のイベントもまとめて読み捨てる
+                if self.stop_event.wait(self.debounce):
+                    break
+                self._wait_for_event(fd, name, 0)
+                self._check()
+        finally:
+            os.close(fd)
+    
+    def _open_inotify(self):
+        """inotify を初期化して親ディレクトリを監視する（使えなければNone）"""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            if libc.inotify_add_watch(fd, os.path.dirname(self.file_path).encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError) as e:
+            log_message(f"inotifyを利用できません: {e}", level="DEBUG", prefix="ファイル監視")
+            return None
+    
+    def _wait_for_event(self, fd, name, timeout):
+        """監視対象のファイルに関するイベントがあればTrueを返す"""
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            return False
+        matched = False
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b'\0') == name:
+                    matched = True
+                offset += length
+        return matched
+
+def slide_heading(text):
+    """スライドの見出し（## 行）を返す（見出しがなければ空文字）"""
+    first_line = text.lstrip('\n').split('\n', 1)[0]
+    return first_line[3:].strip() if first_line.startswith('## ') else ""
+
+class SpeechNormalizer:
+    """マークダウンを読み上げ用のテキストに変換する
+    
+    1回の走査ですべてを処理するのではなく、コンパイル済みの正規表現を順番に
+    スライド全体へ適用する（行ごとに分割して何度も re.sub を呼ばない）。
+    適用順は以前の行単位の実装と同じ（見出し → 強調 → リスト → リンク → コード →
+    水平線 → コメント）で、前の置換結果に次の置換がかかる点も含めて出力をそろえている。
+    順序に影響しない組み合わせ（見出しと直後の水平線、箇条書きと直後の番号）だけを
+    1つのパターンにまとめている。
+    
+    以前と出力が異なるのは、複数行にまたがるHTMLコメントを除去する点と、
+    *** の水平線を強調記号として処理する前に除去する点（以前は「*」と読み上げていた）だけ。
+    行をまたがないよう、空白には \\s ではなく [^\\S\\n] を使う。
+    """
+    # 複数行にまたがるコメント（1行のコメントは最後に INLINE_COMMENT_RE で除去）
+    COMMENT_RE = re.compile(r'<!--[\s\S]*?-->')
+    # 水平線だけの行（見出し記号つきも含む）/ 行頭の見出し記号
+    HEADING_RE = re.compile(r'^(?:#+[^\S\n]*)?(?:-{3,}|\*{3,}|_{3,})$|^#+[^\S\n]*', re.MULTILINE)
+    BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+    ITALIC_RE = re.compile(r'\*(.+?)\*')
+    # 箇条書きの記号（直後の番号も含む）/ 番号
+    LIST_RE = re.compile(r'^[^\S\n]*(?:[-*+][^\S\n]+(?:\d+\.[^\S\n]+)?|\d+\.[^\S\n]+)', re.MULTILINE)
+    LINK_RE = re.compile(r'\[(.+?)\]\(.+?\)')
+    CODE_RE = re.compile(r'`(.+?)`')
+    # 強調・リスト・コードを外した結果が水平線になった行
+    RULE_RE = re.compile(r'^(?:-{3,}|\*{3,}|_{3,})$', re.MULTILINE)
+    INLINE_COMMENT_RE = re.compile(r'<!--.*?-->')
+    
+    @staticmethod
+    def _drop_multiline_comment(match):
+        comment = match.group()
+        return '' if '\n' in comment else comment
+    
+    def normalize(self, text):
+        """読み上げ用にテキストを処理する
+        
+        Args:
+            text (str): スライドのマークダウン
+            
+        Returns:
+            list: 読み上げる行のリスト（空行は含まない）
+        """
+        text = self.COMMENT_RE.sub(self._drop_multiline_comment, text)
+        text = self.HEADING_RE.sub('', text)
+        text = self.BOLD_RE.sub(r'\1', text)
+        text = self.ITALIC_RE.sub(r'\1', text)
+        text = self.LIST_RE.sub('', text)
+        text = self.LINK_RE.sub(r'\1', text)
+        text = self.CODE_RE.sub(r'\1', text)
+        text = self.RULE_RE.sub('', text)
+        text = self.INLINE_COMMENT_RE.sub('', text)
+        return [line.strip() for line in text.split('\n') if line and not line.isspace()]
+
+speech_normalizer = SpeechNormalizer()
+
+def process_text_for_speech(text):
+    """読み上げ用にテキストを処理する"""
+    return speech_normalizer.normalize(text)
+
+# 文の区切り（句点・感嘆符・疑問符の直後）
+SENTENCE_END_RE = re.compile(r'(?<=[。！？!?])')
+WORD_CHAR_RE = re.compile(r'\w')
+
+def split_sentences(lines):
+    """読み上げ用の行リストを文単位のチャンクに分割する（行の区切りも文の区切りとみなす）
+    
+    Args:
+        lines (list): process_text_for_speech の結果
+        
+    Returns:
+        list: 文ごとのテキスト（記号だけの断片は直前の文に連結）
+    """
+    chunks = []
+    for line in lines:
+        for sentence in SENTENCE_END_RE.split(line):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if chunks and not WORD_CHAR_RE.search(sentence):
+                chunks[-1] += sentence
+            else:
+                chunks.append(sentence)
+    return chunks
+
+async def fetch_voicevox_query_async(text, speaker, url=VOICEVOX_URL):
+    """/audio_query の結果を返す（クエリキャッシュにあればエンジンに問い合わせない）"""
+    if isinstance(url, EnginePool):
+        return await url.run_async(fetch_voicevox_query_async, text, speaker)
+    cache = get_query_cache()
+    key = QueryCache.make_key(text, speaker, await get_voicevox_version_async(url))
+    query = cache.get(key)
+    if query is not None:
+        return query
+    
+    # 音声合成クエリ作成
+    log_message(f"VOICEVOX音声合成クエリを作成中 (文字数: {len(text)})", level="DEBUG", prefix="VOICEVOX")
+    with tracer.span("audio_query", chars=len(text)):
+        query = await get_async_voicevox_client(url).audio_query(text, speaker)
+    cache.put(key, query)
+    return query
+
+def audio_query_duration(query, speed_scale=None):
+    """音声合成クエリから、合成される音声の長さ（秒）を求める
+    
+    モーラごとの子音・母音の長さ、アクセント句の後の無音、前後の無音の合計を speedScale で割る
+    （VOICEVOXは速度を変えるとこれらをすべて同じ比率で縮める）。
+    
+    Args:
+        query (dict): /audio_query の結果
+        speed_scale (float, optional): 読み上げ速度の倍率（省略時はクエリの speedScale）
+        
+    Returns:
+        float: 音声の長さ（秒）
+    """
+    if speed_scale is None:
+        speed_scale = query.get("speedScale", 1.0)
+    pause_length = query.get("pauseLength")
+    pause_scale = query.get("pauseLengthScale", 1.0)
+    
+    total = query.get("prePhonemeLength", 0.0) + query.get("postPhonemeLength", 0.0)
+    for phrase in query.get("accent_phrases", []):
+        for mora in phrase.get("moras", []):
+            total += (mora.get("consonant_length") or 0.0) + (mora.get("vowel_length") or 0.0)
+        pause = phrase.get("pause_mora")
+        if pause:
+            if pause_length is None:
+                pause_length_sec = (pause.get("consonant_length") or 0.0) + (pause.get("vowel_length") or 0.0)
+            else:
+                pause_length_sec = pause_length
+            total += pause_length_sec * pause_scale
+    return total / speed_scale
+
+def format_duration(seconds):
+    """秒数を「分:秒」（1時間以上なら「時:分:秒」）の表示にする"""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+async def create_voicevox_query_async(text, speaker, speech_rate, url=VOICEVOX_URL, prosody=None):
+    """VOICEVOXの音声合成クエリを用意し、読み上げ速度と抑揚を設定して返す（失敗時は例外を送出）
+    
+    Args:
+        text (str): 読み上げるテキスト
+        speaker (int): 話者ID
+        speech_rate (int): 読み上げ速度（WPM）
+        url (str): VOICEVOXエンジンのURL
+        prosody (dict, optional): pitchScale などクエリに上書きする抑揚パラメータ
+    """
+    query = await fetch_voicevox_query_async(text, speaker, url)
+    
+    # 速度を設定（speech_rateから適切な比率に変換）
+    query['speedScale'] = speech_rate_to_speed_scale(speech_rate)
+    query.update(prosody or {})
+    return query
+
+async def synthesize_voicevox_async(text, speaker, speech_rate, url=VOICEVOX_URL, prosody=None):
+    """VOICEVOXでテキストを合成してWAVのバイト列を返す（失敗時は例外を送出）
+    
+    Args:
+        text (str): 読み上げるテキスト
+        speaker (int): 話者ID
+        speech_rate (int): 読み上げ速度（WPM）
+        url (str or EnginePool): VOICEVOXエンジンのURL（EnginePool なら空いているエンジンで合成）
+        prosody (dict, optional): pitchScale などクエリに上書きする抑揚パラメータ
+        
+    Returns:
+        bytes: WAVデータ
+    """
+    if isinstance(url, EnginePool):
+        # クエリ作成と合成は同じエンジンで行う
+        return await url.run_async(synthesize_voicevox_async, text, speaker, speech_rate, prosody=prosody)
+    query = await create_voicevox_query_async(text, speaker, speech_rate, url, prosody)
+    log_message(f"VOICEVOX合成パラメータ: speedScale={query['speedScale']:.2f}, speaker={speaker}", 
+              level="DEBUG", prefix="VOICEVOX")
+    
+    # 音声合成実行
+    with tracer.span("synthesis", chars=len(text)):
+        return await get_async_voicevox_client(url).synthesis(query, speaker)
+
+async def multi_synthesize_voicevox_async(queries, speaker, url=VOICEVOX_URL):
+    """複数の音声合成クエリを /multi_synthesis で1回のリクエストにまとめて合成する
+    
+    Args:
+        queries (list): 音声合成クエリのリスト
+        speaker (int): 話者ID
+        url (str or EnginePool): VOICEVOXエンジンのURL（EnginePool なら空いているエンジンで合成）
+        
+    Returns:
+        list: クエリと同じ順序のWAVデータ
+    """
+    if not queries:
+        return []
+    if isinstance(url, EnginePool):
+        return await url.run_async(multi_synthesize_voicevox_async, queries, speaker)
+    
+    log_message(f"VOICEVOXで{len(queries)}件をまとめて合成します", level="DEBUG", prefix="VOICEVOX")
+    with tracer.span("synthesis", queries=len(queries)):
+        wavs = await get_async_voicevox_client(url).multi_synthesis(queries, speaker)
+    if len(wavs) != len(queries):
+        raise ValueError(f"まとめて合成した音声の数が一致しません ({len(wavs)}/{len(queries)})")
+    return wavs
+
+async def initialize_speaker_async(speaker, url=VOICEVOX_URL):
+    """話者のモデルを読み込んでおく（EnginePool ならすべてのエンジンで）
+    
+    VOICEVOXは話者のモデルを最初の合成時に読み込むため、事前に読み込んでおくと
+    その話者の最初のスライドも他と同じ速さで合成できる。
+    
+    Returns:
+        bool: 新たに読み込んだ場合はTrue（読み込み済みならFalse）
+    """
+    if isinstance(url, EnginePool):
+        results = await asyncio.gather(*(initialize_speaker_async(speaker, engine_url) for engine_url in url.urls))
+        return any(results)
+    client = get_async_voicevox_client(url)
+    if await client.is_initialized_speaker(speaker):
+        return False
+    with tracer.span("initialize_speaker", speaker=speaker):
+        await client.initialize_speaker(speaker)
+    return True
+
+# 同期版（GUIやワーカースレッドから呼ぶ。イベントループのスレッドからは呼ばないこと）
+def fetch_voicevox_query(text, speaker, url=VOICEVOX_URL):
+    """fetch_voicevox_query_async の同期版"""
+    return run_voicevox_async(fetch_voicevox_query_async(text, speaker, url))
+
+def create_voicevox_query(text, speaker, speech_rate, url=VOICEVOX_URL, prosody=None):
+    """create_voicevox_query_async の同期版"""
+    return run_voicevox_async(create_voicevox_query_async(text, speaker, speech_rate, url, prosody))
+
+def synthesize_voicevox(text, speaker, speech_rate, url=VOICEVOX_URL, prosody=None):
+    """synthesize_voicevox_async の同期版"""
+    return run_voicevox_async(synthesize_voicevox_async(text, speaker, speech_rate, url, prosody))
+
+def multi_synthesize_voicevox(queries, speaker, url=VOICEVOX_URL):
+    """multi_synthesize_voicevox_async の同期版"""
+    return run_voicevox_async(multi_synthesize_voicevox_async(queries, speaker, url))
+
+def write_concatenated_wav(wav_chunks, dest_path):
+    """複数のWAVデータを無音を挟まずに1つのWAVファイルへ連結する
+    
+    Args:
+        wav_chunks (iterable): WAVのバイト列（すべて同じ形式であること）
+        dest_path (str): 出力先のパス
+    """
+    params = None
+    with wave.open(dest_path, 'wb') as out:
+        for data in wav_chunks:
+            with wave.open(io.BytesIO(data), 'rb') as src:
+                if params is None:
+                    params = src.getparams()[:3]
+                    out.setnchannels(params[0])
+                    out.setsampwidth(params[1])
+                    out.setframerate(params[2])
+                elif src.getparams()[:3] != params:
+                    raise ValueError("連結するWAVの形式が一致しません")
+                out.writeframes(src.readframes(src.getnframes()))
+
+async def with_trace_slide(slide_idx, coro):
+    """計測区間にスライド番号を付けて coro を実行する（イベントループ上のタスクごとに設定される）"""
+    trace_slide.set(slide_idx)
+    return await coro
+
+class SynthesisCancelled(Exception):
+    """合成が取り消されたことを示す例外"""
+
+async def synthesize_voicevox_unless_cancelled(cancel_event, text, speaker, speech_rate, url, prosody):
+    """取り消されていなければ synthesize_voicevox_async を実行する
+    
+    同時リクエスト数の制限で待っている間に取り消された場合も、リクエストを送る前に止まる。
+    """
+    if cancel_event.is_set():
+        raise SynthesisCancelled()
+    synthesis_cancel_event.set(cancel_event)
+    return await synthesize_voicevox_async(text, speaker, speech_rate, url, prosody)
+
+class ChunkedSynthesis:
+    """スライドを文単位のチャンクに分けて並列に合成し、先頭から順に取り出す
+    
+    すべてのチャンクを作成時にイベントループへ投入するため、先頭のチャンクが
+    できた時点で再生を始めつつ、後続のチャンクの合成を並行して進められる。
+    取り消すと実行中のHTTPリクエストも中断する。
+    """
+    def __init__(self, chunks, speaker, speech_rate, url=VOICEVOX_URL, prosody=None, cancel_event=None, 
+                 slide_idx=None):
+        """
+        Args:
+            chunks (list): split_sentences で分割した文のリスト
+            speaker (int): 話者ID
+            speech_rate (int): 読み上げ速度（WPM）
+            url (str): VOICEVOXエンジンのURL
+            prosody (dict, optional): pitchScale などクエリに上書きする抑揚パラメータ
+            cancel_event (threading.Event, optional): セットされると残りの文の合成を取り消す
+            slide_idx (int, optional): 計測区間に記録するスライド番号
+        """
+        loop = get_voicevox_loop()
+        self.chunks = chunks
+        self.cancel_event = cancel_event or threading.Event()
+        self.futures = [loop.submit(with_trace_slide(slide_idx, synthesize_voicevox_unless_cancelled(
+                            self.cancel_event, chunk, speaker, speech_rate, url, prosody))) 
+                        for chunk in chunks]
+    
+    def iter_audio(self, poll_interval=0.05):
+        """チャンクのWAVデータを先頭から順に返す（未完了のものは完了を待つ）
+        
+        待っている間も cancel_event を確認し、取り消された場合や途中で例外が起きた場合
+        （呼び出し側が途中でやめた場合を含む）は残りのチャンクの合成を取り消す。
+        
+        Raises:
+            SynthesisCancelled: 途中で取り消された場合
+        """
+        import concurrent.futures  # asyncio と一緒に読み込み済み
+        try:
+            for future in self.futures:
+                while True:
+                    if self.cancel_event.is_set():
+                        raise SynthesisCancelled()
+                    try:
+                        audio = future.result(poll_interval)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        continue
+                    except concurrent.futures.CancelledError:
+                        raise SynthesisCancelled()
+                yield audio
+        except BaseException:
+            self.cancel()
+            raise
+    
+    def cancel(self):
+        """残りのチャンクの合成を取り消す"""
+        self.cancel_event.set()
+        for future in self.futures:
+            future.cancel()
+    
+    def write_combined(self, dest_path=None):
+        """全チャンクを連結したWAVファイルを書き出す
+        
+        Args:
+            dest_path (str, optional): 出力先（省略時は一時ファイル）
+            
+        Returns:
+            str: 書き出したファイルのパス
+        """
+        if dest_path is None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
+                dest_path = fp.name
+        try:
+            write_concatenated_wav(self.iter_audio(), dest_path)
+        except Exception:
+            self.cancel()
+            if os.path.exists(dest_path):
+                os.unlink(dest_path)
+            raise
+        return dest_path
+
+def synthesize_voicevox_chunked(lines, speaker, speech_rate, url=VOICEVOX_URL, prosody=None, cancel_event=None, 
+                                slide_idx=None):
+    """読み上げ用の行を文単位で並列に合成し、文ごとのWAVデータを返す
+    
+    Args:
+        lines (list): process_text_for_speech の結果
+        speaker (int): 話者ID
+        speech_rate (int): 読み上げ速度（WPM）
+        url (str): VOICEVOXエンジンのURL
+        prosody (dict, optional): pitchScale などクエリに上書きする抑揚パラメータ
+        cancel_event (threading.Event, optional): セットされると残りの文の合成を取り消す
+        slide_idx (int, optional): 計測区間に記録するスライド番号
+        
+    Returns:
+        list or None: 文ごとのWAVデータ（応答のバイト列をコピーしない memoryview）、失敗・取り消しの場合はNone
+    """
+    chunks = split_sentences(lines)
+    if not chunks:
+        return None
+    
+    try:
+        log_message(f"{len(chunks)}文に分割して並列に合成します", level="DEBUG", prefix="VOICEVOX")
+        synthesis = ChunkedSynthesis(chunks, speaker, speech_rate, url, prosody, cancel_event, slide_idx)
+        return [memoryview(audio) for audio in synthesis.iter_audio()]
+    except SynthesisCancelled:
+        log_message("合成が取り消されました", level="DEBUG", prefix="VOICEVOX")
+        return None
+    except Exception as e:
+        log_message(f"VOICEVOX音声合成エラー: {e}", level="ERROR", prefix="VOICEVOX")
+        import traceback
+        traceback.print_exc()
+        return None
+
+class AudioCache:
+    """合成済み音声をセッションをまたいで保持するコンテンツアドレス型キャッシュ
+    
+    キーは (読み上げテキスト, エンジン, 話者ID, speedScale, エンジンバージョン) のハッシュ。
+    インデックスファイルに最終アクセス順を記録し、合計サイズが上限を超えたら
+    最も長く使われていないファイルから削除する。インデックスは登録のたびには
+    書き出さず、INDEX_SAVE_EVERY 件ごとか INDEX_SAVE_INTERVAL 秒ごと、または save() で
+    まとめて書き出す（書き出す前に終了した分は、次回の読み込み時にファイルから登録し直す）。
+    """
+    INDEX_FILE = "index.json"
+    INDEX_SAVE_EVERY = 32       # この件数を登録するごとにインデックスを書き出す
+    INDEX_SAVE_INTERVAL = 5.0   # 前回の書き出しからこの秒数が過ぎていれば登録時に書き出す
+    
+    def __init__(self, cache_dir=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES, name="音声キャッシュ"):
+        """
+        Args:
+            cache_dir (str): キャッシュを置くディレクトリ
+            max_bytes (int): 合計サイズの上限
+            name (str): ログに表示するキャッシュの名前
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.name = name
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # キー: ハッシュ, 値: {"file", "size", "last_access"}（古い順）
+        self.total_bytes = 0
+        self.dirty = False
+        self.unsaved = 0  # 前回インデックスを書き出してから登録した件数
+        self.last_saved = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+    
+    @staticmethod
+    def make_key(text, engine, speaker=None, speed_scale=None, engine_version=None, prosody=None):
+        """キャッシュキーを作成する
+        
+        (text, engine, speaker, engine_version) は音声合成クエリを一意に決める部分、
+        speed_scale と prosody はクエリに上書きする抑揚パラメータにあたる。
+        
+        Args:
+            text (str): 読み上げ用に整形済みのテキスト（スライド単位なら SlideRecord.content_hash）
+            engine (str): 音声エンジン名 (voicevox, gtts, say)
+            speaker (int, optional): 話者ID
+            speed_scale (float, optional): 読み上げ速度の倍率
+            engine_version (str, optional): エンジンのバージョン
+            prosody (dict, optional): 速度以外の抑揚パラメータ（pitchScale など）
+            
+        Returns:
+            str: SHA-256の16進文字列
+        """
+        if speed_scale is not None:
+            speed_scale = round(speed_scale, 4)
+        if prosody is not None:
+            prosody = sorted((name, round(value, 4)) for name, value in prosody.items())
+        payload = json.dumps([text, engine, speaker, speed_scale, engine_version, prosody], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """キャッシュ済みファイルのパスを返す（なければNone）"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                path = os.path.join(self.cache_dir, entry["file"])
+                if os.path.exists(path):
+                    entry["last_access"] = time.time()
+                    self.entries.move_to_end(key)
+                    self.dirty = True
+                    self.hits += 1
+                    return path
+                # ファイルが外部で消された場合はエントリを破棄
+                self.entries.pop(key)
+                self.total_bytes -= entry["size"]
+                self.dirty = True
+            self.misses += 1
+            return None
+    
+    def put(self, key, src_path):
+        """生成済みの一時ファイルをキャッシュに移動して登録する
+        
+        Args:
+            key (str): make_key で作成したキー
+            src_path (str): 生成済みの音声ファイル（移動される）
+            
+        Returns:
+            str: キャッシュ内のファイルパス
+        """
+        suffix = os.path.splitext(src_path)[1]
+        file_name = key + suffix
+        dest_path = os.path.join(self.cache_dir, file_name)
+        shutil.move(src_path, dest_path)
+        self._register(key, file_name, os.path.getsize(dest_path))
+        return dest_path
+    
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+    
+    def put_bytes(self, key, data, suffix):
+        """メモリ上のデータをキャッシュに書き込んで登録する
+        
+        Args:
+            key (str): make_key などで作成したキー
+            data (bytes): 保存するデータ
+            suffix (str): ファイルの拡張子（例: ".json"）
+            
+        Returns:
+            str: キャッシュ内のファイルパス
+        """
+        file_name = key + suffix
+        dest_path = os.path.join(self.cache_dir, file_name)
+        tmp_path = dest_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, dest_path)
+        self._register(key, file_name, len(data))
+        return dest_path
+    
+    def _register(self, key, file_name, size):
+        """キャッシュに置いたファイルをインデックスに登録する"""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= old["size"]
+            self.entries[key] = {"file": file_name, "size": size, "last_access": time.time()}
+            self.total_bytes += size
+            self._evict_locked(keep=key)
+            self.dirty = True
+            self.unsaved += 1
+            if self.unsaved >= self.INDEX_SAVE_EVERY or time.monotonic() - self.last_saved >= self.INDEX_SAVE_INTERVAL:
+                self._save_index_locked()
+    
+    def save(self):
+        """アクセス記録に変更があればインデックスを書き出す"""
+        with self.lock:
+            if self.dirty:
+                self._save_index_locked()
+    
+    def clear(self):
+        """キャッシュをすべて削除する"""
+        with self.lock:
+            for entry in self.entries.values():
+                self._remove_file(entry["file"])
+            self.entries.clear()
+            self.total_bytes = 0
+            self._save_index_locked()
+    
+    def _evict_locked(self, keep=None):
+        """上限サイズに収まるまで古いエントリを削除する（ロック取得済みで呼ぶ）"""
+        for key in list(self.entries.keys()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self.entries.pop(key)
+            self.total_bytes -= entry["size"]
+            self.dirty = True
+            self._remove_file(entry["file"])
+            log_message(f"キャッシュ上限のため削除: {entry['file']}", level="DEBUG", prefix="キャッシュ")
+    
+    def _remove_file(self, file_name):
+        try:
+            os.unlink(os.path.join(self.cache_dir, file_name))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_message(f"キャッシュ削除エラー: {e}", level="ERROR", prefix="キャッシュ")
+    
+    def _load_index(self):
+        """インデックスファイルを読み込む
+        
+        存在しないファイルのエントリは捨て、インデックスを書き出す前に終了して
+        登録されていないファイルは更新日時を最終アクセスとして登録し直す。
+        """
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        entries = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get("entries", {})
+            except Exception as e:
+                log_message(f"キャッシュインデックスの読み込みに失敗しました: {e}", level="WARN", prefix="キャッシュ")
+        
+        indexed = {entry["file"] for entry in entries.values()}
+        for item in os.scandir(self.cache_dir):
+            key, suffix = os.path.splitext(item.name)
+            if item.name in indexed or item.name == self.INDEX_FILE or suffix == ".tmp" or not item.is_file():
+                continue
+            stat = item.stat()
+            entries[key] = {"file": item.name, "size": stat.st_size, "last_access": stat.st_mtime}
+            self.dirty = True
+        
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_access", 0)):
+            if os.path.exists(os.path.join(self.cache_dir, entry["file"])):
+                self.entries[key] = entry
+                self.total_bytes += entry["size"]
+        self._evict_locked()
+        if not entries:
+            return
+        log_message(f"{self.name}を読み込みました: {len(self.entries)}件 ({self.total_bytes / 1024 / 1024:.1f}MB)", 
+                  level="INFO", prefix="キャッシュ")
+    
+    def _save_index_locked(self):
+        """インデックスファイルを原子的に書き出す（ロック取得済みで呼ぶ）"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "entries": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+            self.dirty = False
+            self.unsaved = 0
+            self.last_saved = time.monotonic()
+        except Exception as e:
+            log_message(f"キャッシュインデックスの保存に失敗しました: {e}", level="ERROR", prefix="キャッシュ")
+
+class QueryCache:
+    """/audio_query の結果をテキストと話者ごとに保持する2段目のキャッシュ
+    
+    音声合成クエリは速度や抑揚の変更に関係なく同じなので、速度だけを変えて
+    再合成するときは言語解析の往復を省略できる。メモリ上の辞書を前段に置き、
+    ディスク上には AudioCache と同じ仕組みでJSONファイルとして保存する。
+    """
+    def __init__(self, cache_dir=QUERY_CACHE_DIR, max_bytes=QUERY_CACHE_MAX_BYTES, 
+                 memory_entries=QUERY_CACHE_MEMORY_ENTRIES):
+        self.store = AudioCache(cache_dir, max_bytes, name="クエリキャッシュ")
+        self.memory = OrderedDict()
+        self.memory_entries = memory_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text, speaker, engine_version):
+        """(テキスト, 話者ID, エンジンバージョン) からキーを作成する"""
+        payload = json.dumps(["audio_query", text, speaker, engine_version], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """キャッシュ済みのクエリを返す（呼び出し側で書き換えられるようコピーを返す）"""
+        with self.lock:
+            query = self.memory.get(key)
+            if query is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(query)
+        
+        path = self.store.get(key)
+        if not path:
+            self.misses += 1
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                query = json.load(f)
+        except Exception as e:
+            log_message(f"クエリキャッシュの読み込みに失敗しました: {e}", level="WARN", prefix="キャッシュ")
+            self.misses += 1
+            return None
+        self._remember(key, query)
+        self.hits += 1
+        return copy.deepcopy(query)
+    
+    def put(self, key, query):
+        """クエリをメモリとディスクに保存する"""
+        self._remember(key, copy.deepcopy(query))
+        self.store.put_bytes(key, json.dumps(query, ensure_ascii=False).encode('utf-8'), ".json")
+    
+    def save(self):
+        self.store.save()
+    
+    def _remember(self, key, query):
+        with self.lock:
+            self.memory[key] = query
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+# 音声合成クエリの共有キャッシュ
+query_cache = None
+query_cache_lock = threading.Lock()
+
+def get_query_cache():
+    """共有のQueryCacheを返す（初回呼び出し時に作成）"""
+    global query_cache
+    with query_cache_lock:
+        if query_cache is None:
+            query_cache = QueryCache()
+        return query_cache
+
+def audio_source_exists(source):
+    """音声ソース（ファイルパス、またはメモリ上のWAVデータのタプル）が再生できるか"""
+    if isinstance(source, str):
+        return os.path.exists(source)
+    return bool(source)
+
+def audio_source_size(source):
+    """音声ソースの大きさ（バイト）"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    return sum(chunk.nbytes for chunk in source)
+
+def time_stretch(samples, rate, frame, tolerance):
+    """音の高さを変えずに再生速度だけを変える（WSOLA）
+    
+    出力のフレームごとに入力の本来の位置の前後 tolerance サンプルを探し、直前のフレームの続きと
+    波形が最もよく重なる位置を選んで、窓をかけて半分ずつ重ね合わせる。
+    位置の探索だけは前のフレームに依存するので1フレームずつ行い、それ以外はまとめて計算する。
+    
+    Args:
+        samples (numpy.ndarray): モノラルの波形（float32）
+        rate (float): 速度の倍率（2.0なら半分の長さになる）
+        frame (int): フレームのサンプル数（偶数）
+        tolerance (int): 位置を探す前後のサンプル数
+        
+    Returns:
+        numpy.ndarray: 伸縮後の波形（float32、長さは len(samples) / rate を四捨五入したもの）
+    """
+    import numpy as np
+    hop = frame // 2
+    analysis_hop = hop * rate
+    out_length = int(round(len(samples) / rate))
+    frame_count = -(-out_length // hop) + 2
+    
+    # 前後を無音で埋めて、探索範囲がはみ出さないようにする
+    offset = tolerance + frame
+    padded = np.zeros(offset + len(samples) + int(analysis_hop * frame_count) + frame + 2 * tolerance, dtype=np.float32)
+    padded[offset:offset + len(samples)] = samples
+    
+    # 最初のフレームの後半が入力の先頭に来るよう、半フレーム前から始める
+    search_starts = offset - hop + np.round(np.arange(frame_count) * analysis_hop).astype(np.int64) - tolerance
+    positions = np.empty(frame_count, dtype=np.int64)
+    positions[0] = offset - hop
+    search_length = 2 * tolerance + hop
+    for k in range(1, frame_count):
+        natural = positions[k - 1] + hop
+        start = search_starts[k]
+        corr = np.correlate(padded[start:start + search_length], padded[natural:natural + hop], mode='valid')
+        positions[k] = start + corr.argmax()
+    
+    # 半分ずつ重ねると和が1になる窓で重ね合わせる
+    window = np.hanning(frame + 1)[:frame].astype(np.float32)
+    frames = padded[positions[:, None] + np.arange(frame)] * window
+    output = frames[:, :hop].copy()
+    output[1:] += frames[:-1, hop:]
+    return output.ravel()[hop:hop + out_length]
+
+def time_stretch_wav(wav_data, rate):
+    """WAVデータの再生速度を音の高さを変えずに変える
+    
+    Args:
+        wav_data (bytes or memoryview): 16bitモノラルのWAVデータ
+        rate (float): 速度の倍率
+        
+    Returns:
+        bytes or None: 伸縮後のWAVデータ（対応していない形式ならNone）
+    """
+    import numpy as np
+    with wave.open(io.BytesIO(wav_data), 'rb') as wav:
+        params = wav.getparams()
+        frames = wav.readframes(params.nframes)
+    if params.sampwidth != 2 or params.nchannels != 1:
+        return None
+    
+    samples = np.frombuffer(frames, dtype='<i2').astype(np.float32)
+    frame = 2 * max(1, int(params.framerate * TIME_STRETCH_FRAME_SEC) // 2)
+    stretched = time_stretch(samples, rate, frame, int(params.framerate * TIME_STRETCH_TOLERANCE_SEC))
+    
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(params.framerate)
+        wav.writeframes(np.clip(np.round(stretched), -32768, 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+def stretch_audio_source(source, rate):
+    """音声ソースの文ごとのWAVデータをそれぞれ伸縮する
+    
+    Args:
+        source (str or tuple): WAVファイルのパス、またはメモリ上のWAVデータのタプル
+        rate (float): 速度の倍率
+        
+    Returns:
+        list or None: 伸縮後の文ごとのWAVデータ（WAV以外が含まれる場合はNone）
+        
+    Raises:
+        ImportError: NumPyがない場合
+    """
+    if isinstance(source, str):
+        if not source.lower().endswith('.wav'):
+            return None
+        with open(source, 'rb') as f:
+            source = (f.read(),)
+    chunks = []
+    for chunk in source:
+        stretched = time_stretch_wav(chunk, rate)
+        if stretched is None:
+            return None
+        chunks.append(stretched)
+    return chunks
+
+class MemoryAudioCache:
+    """合成済み音声を一時ファイルを経由せずにメモリ上に保持するキャッシュ
+    
+    文ごとのWAVデータを応答のバイト列の memoryview のまま保持し、そのまま再生バックエンドに渡す。
+    合計サイズが上限を超えた場合だけ、最も長く使われていないものから連結して永続キャッシュへ
+    書き出す（spill）。上限が0ならメモリには置かず、常に永続キャッシュへ書き出す。
+    """
+    def __init__(self, spill, max_bytes=MEMORY_AUDIO_CACHE_MAX_BYTES):
+        """
+        Args:
+            spill (AudioCache): あふれた音声の書き出し先、かつメモリにない音声の参照先
+            max_bytes (int): メモリ上に保持する合計サイズの上限
+        """
+        self.spill = spill
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # キー: AudioCache のキー, 値: WAVデータ（memoryview）のタプル（古い順）
+        self.total_bytes = 0
+        self.spilled = 0
+    
+    def get(self, key):
+        """音声ソースを返す（メモリにあればWAVデータのタプル、永続キャッシュにあればパス、なければNone）"""
+        with self.lock:
+            chunks = self.entries.get(key)
+            if chunks is not None:
+                self.entries.move_to_end(key)
+                return chunks
+        return self.spill.get(key)
+    
+    def put(self, key, chunks):
+        """文ごとのWAVデータを登録する
+        
+        Args:
+            key (str): AudioCache.make_key で作成したキー
+            chunks (list): 文ごとのWAVデータ（bytes または memoryview）
+            
+        Returns:
+            tuple or str: 以後の再生に使う音声ソース（上限0なら永続キャッシュ内のパス）
+        """
+        chunks = tuple(memoryview(chunk) for chunk in chunks)
+        size = sum(chunk.nbytes for chunk in chunks)
+        if size > self.max_bytes:
+            return self._write(key, chunks)
+        
+        evicted = []
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= sum(chunk.nbytes for chunk in old)
+            self.entries[key] = chunks
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                evicted_key, evicted_chunks = self.entries.popitem(last=False)
+                self.total_bytes -= sum(chunk.nbytes for chunk in evicted_chunks)
+                evicted.append((evicted_key, evicted_chunks))
+        
+        # 書き出しはロックの外で行う
+        for evicted_key, evicted_chunks in evicted:
+            self._write(evicted_key, evicted_chunks)
+            self.spilled += 1
+        if evicted:
+            log_message(f"メモリ上限を超えたため{len(evicted)}件を永続キャッシュへ書き出しました", 
+                      level="DEBUG", prefix="キャッシュ")
+        return chunks
+    
+    def flush(self):
+        """メモリ上の音声をすべて永続キャッシュへ書き出す（終了時に次回のために残す）"""
+        with self.lock:
+            entries = list(self.entries.items())
+        for key, chunks in entries:
+            try:
+                self._write(key, chunks)
+            except Exception as e:
+                log_message(f"音声の書き出しに失敗しました: {e}", level="WARN", prefix="キャッシュ")
+    
+    def _write(self, key, chunks):
+        """WAVデータを連結して永続キャッシュへ登録し、そのパスを返す"""
+        if key in self.spill:
+            path = self.spill.get(key)
+            if path:
+                return path
+        with tracer.span("write", spill=True):
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
+                temp_file = fp.name
+            try:
+                write_concatenated_wav(chunks, temp_file)
+            except Exception:
+                os.unlink(temp_file)
+                raise
+            return self.spill.put(key, temp_file)
+
+class PrefetchJob:
+    """合成ジョブ1件分の状態（submit の戻り値としてジョブのハンドルにもなる）"""
+    def __init__(self, slide_idx, generation, key, priority, args):
+        self.slide_idx = slide_idx
+        self.generation = generation
+        self.key = key            # 同じ内容・設定のジョブを見分けるキー
+        self.priority = priority
+        self.args = args          # (record, settings, on_done)
+        self.state = "queued"     # queued, running, done
+        self.cancelled = threading.Event()
+    
+    def cancel(self):
+        """ジョブを取り消す（実行中のものは文の区切りで止まり、結果は破棄される）"""
+        self.cancelled.set()
+
+class AudioPrefetcher:
+    """スライド音声を優先度順にバックグラウンドで合成するスケジューラ
+    
+    優先度は 表示中のスライド > 先読み > 台本全体のバックグラウンド合成 の順。
+    同じスライドに同じ内容・設定のジョブがあれば新しく登録せずに使い回し
+    （優先度が上がる場合は引き上げる）、内容や設定が違えば古いジョブを取り消す。
+    待ち行列はヒープで管理し、取り消されたジョブは取り出したときに読み捨てる。
+    
+    ジョブの登録・取消・結果の受け取りはすべてTkのメインスレッドで行い、
+    ワーカースレッドは合成処理だけを担当する。合成結果は root.after 経由で
+    メインスレッドのコールバックに渡される。
+    """
+    PRIORITY_CURRENT = 0
+    PRIORITY_LOOKAHEAD = 1
+    PRIORITY_BACKGROUND = 2
+    
+    def __init__(self, root, render_func, max_workers=2):
+        """
+        Args:
+            root (tk.Tk): 結果をメインスレッドに戻すためのルートウィンドウ
+            render_func (callable): (slide_idx, record, settings, cancel_event) -> (path, error)
+            max_workers (int): 同時に合成するワーカー数
+        """
+        self.root = root
+        self.render_func = render_func
+        self.jobs = {}        # キー: スライドインデックス, 値: PrefetchJob
+        self.generation = 0   # 設定変更やファイル切り替えのたびに進める世代番号
+        self.closed = False
+        self.queue = []       # (優先度, 登録順, PrefetchJob) のヒープ
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.workers = [threading.Thread(target=self._worker, name=f"audio-prefetch-{i}", daemon=True)
+                        for i in range(max_workers)]
+        for worker in self.workers:
+            worker.start()
+    
+    @staticmethod
+    def make_key(record, settings):
+        """ジョブの重複を判定するキー（読み上げ内容と合成設定）"""
+        return json.dumps([record.content_hash, settings], sort_keys=True, ensure_ascii=False)
+    
+    def submit(self, slide_idx, record, settings, on_done, priority=PRIORITY_LOOKAHEAD):
+        """スライドの合成ジョブを登録する（同じスライド・同じ内容の有効なジョブがあれば再利用）
+        
+        Args:
+            slide_idx (int): スライドインデックス
+            record (SlideRecord): スライドの前処理結果
+            settings (dict): 合成設定のスナップショット
+            on_done (callable): (slide_idx, path, error) を受け取るコールバック（メインスレッドで実行）
+            priority (int): PRIORITY_CURRENT / PRIORITY_LOOKAHEAD / PRIORITY_BACKGROUND
+            
+        Returns:
+            PrefetchJob: 登録された（または再利用した）ジョブ
+        """
+        key = self.make_key(record, settings)
+        job = self.jobs.get(slide_idx)
+        if job and job.generation == self.generation and not job.cancelled.is_set() and job.key == key:
+            if priority < job.priority:
+                self._enqueue(job, priority)
+            return job
+        if job:
+            self.cancel(slide_idx)
+        
+        job = PrefetchJob(slide_idx, self.generation, key, priority, (record, settings, on_done))
+        self.jobs[slide_idx] = job
+        self._enqueue(job, priority)
+        return job
+    
+    def _enqueue(self, job, priority):
+        """ジョブを待ち行列に入れる（優先度を上げる場合は入れ直し、古い項目は読み捨てる）"""
+        with self.condition:
+            job.priority = priority
+            if job.state == "queued":
+                heapq.heappush(self.queue, (priority, next(self.sequence), job))
+                self.condition.notify()
+    
+    def is_pending(self, slide_idx):
+        """スライドの合成ジョブが進行中かどうか"""
+        return slide_idx in self.jobs
+    
+    def cancel(self, slide_idx):
+        """スライドのジョブを取り消す（実行中のものは結果を破棄する）"""
+        job = self.jobs.pop(slide_idx, None)
+        if job:
+            job.cancel()
+    
+    def cancel_except(self, keep_indices):
+        """指定したスライド以外の先読みジョブを取り消す（バックグラウンド合成のジョブは残す）"""
+        for idx, job in list(self.jobs.items()):
+            if idx not in keep_indices and job.priority != self.PRIORITY_BACKGROUND:
+                self.cancel(idx)
+    
+    def invalidate(self):
+        """世代を進めてすべてのジョブを無効にする（設定変更・ファイル切り替え時）"""
+        self.generation += 1
+        for idx in list(self.jobs.keys()):
+            self.cancel(idx)
+    
+    def shutdown(self):
+        """ワーカーを停止する"""
+        self.closed = True
+        self.invalidate()
+        with self.condition:
+            self.queue = []
+            self.condition.notify_all()
+    
+    def _next_job(self):
+        """優先度が最も高い有効なジョブを取り出す（なければ待つ。停止時はNone）"""
+        with self.condition:
+            while not self.closed:
+                while self.queue:
+                    priority, _, job = heapq.heappop(self.queue)
+                    # 取り消し済みのジョブや、優先度を上げる前の古い項目は読み捨てる
+                    if job.cancelled.is_set() or job.state != "queued" or priority != job.priority:
+                        continue
+                    job.state = "running"
+                    return job
+                self.condition.wait()
+            return None
+    
+    def _worker(self):
+        """ワーカースレッド本体"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._run(job)
+    
+    def _run(self, job):
+        """ワーカースレッドで合成を実行し、結果をメインスレッドに戻す"""
+        record, settings, on_done = job.args
+        try:
+            path, error = self.render_func(job.slide_idx, record, settings, job.cancelled)
+        except Exception as e:
+            log_message(f"先読み合成エラー: {e}", level="ERROR", prefix=f"スライド{job.slide_idx+1}")
+            import traceback
+            traceback.print_exc()
+            path, error = None, f"エラー: {str(e)}"
+        job.state = "done"
+        
+        try:
+            self.root.after(0, self._deliver, job, path, error, on_done)
+        except Exception:
+            # ウィンドウが既に破棄されている場合は何もしない（音声は永続キャッシュに残る）
+            pass
+    
+    def _deliver(self, job, path, error, on_done):
+        """メインスレッドで結果を受け取り、有効なジョブのものだけを通知する"""
+        if self.jobs.get(job.slide_idx) is job:
+            del self.jobs[job.slide_idx]
+        
+        if self.closed or job.cancelled.is_set() or job.generation != self.generation:
+            log_message("取り消し済みジョブの結果を破棄します", level="DEBUG", prefix=f"スライド{job.slide_idx+1}")
+            return
+        
+        on_done(job.slide_idx, path, error)
+
+# 音声再生バックエンド
+PLAYBACK_BACKENDS = ("auto", "sounddevice", "afplay", "null")
+
+class RingBuffer:
+    """再生用のPCMデータを受け渡す固定長のリングバッファ
+    
+    書き込み側は空きができるまで待ち、読み込み側は finish() 後に残りを読み切ると
+    空のバイト列を受け取る。abort() すると両側とも即座に戻る。
+    """
+    def __init__(self, capacity):
+        self.buffer = bytearray(capacity)
+        self.capacity = capacity
+        self.read_pos = 0
+        self.size = 0
+        self.finished = False  # 書き込み側がすべて書き終えた
+        self.aborted = False   # 再生が停止された
+        self.condition = threading.Condition()
+    
+    def write(self, data):
+        """データを書き込む（満杯なら空くまで待つ）
+        
+        Returns:
+            bool: 停止された場合はFalse
+        """
+        view = memoryview(data)
+        while len(view):
+            with self.condition:
+                while self.size == self.capacity and not self.aborted:
+                    self.condition.wait()
+                if self.aborted:
+                    return False
+                n = min(len(view), self.capacity - self.size)
+                write_pos = (self.read_pos + self.size) % self.capacity
+                first = min(n, self.capacity - write_pos)
+                self.buffer[write_pos:write_pos + first] = view[:first]
+                self.buffer[:n - first] = view[first:n]
+                self.size += n
+                self.condition.notify_all()
+            view = view[n:]
+        return True
+    
+    def read(self, max_bytes, block=True):
+        """最大 max_bytes バイトを読み出す
+        
+        Args:
+            max_bytes (int): 読み出す最大バイト数
+            block (bool): Trueならデータが来るまで待つ（オーディオコールバックではFalse）
+            
+        Returns:
+            bytes: 読み出したデータ（終端・停止時は空）
+        """
+        with self.condition:
+            while block and self.size == 0 and not self.finished and not self.aborted:
+                self.condition.wait()
+            if self.aborted:
+                return b""
+            n = min(max_bytes, self.size)
+            first = min(n, self.capacity - self.read_pos)
+            data = bytes(self.buffer[self.read_pos:self.read_pos + first]) + bytes(self.buffer[:n - first])
+            self.read_pos = (self.read_pos + n) % self.capacity
+            self.size -= n
+            self.condition.notify_all()
+            return data
+    
+    def is_drained(self):
+        """書き込みが終わり、すべて読み出されたかどうか"""
+        with self.condition:
+            return self.aborted or (self.finished and self.size == 0)
+    
+    def finish(self):
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+    
+    def abort(self):
+        with self.condition:
+            self.aborted = True
+            self.condition.notify_all()
+
+def open_wav_source(source):
+    """ファイルパスまたはバイト列のWAVを開く"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return wave.open(io.BytesIO(source), 'rb')
+    return wave.open(source, 'rb')
+
+class PlaybackBackend:
+    """音声再生バックエンドの共通インターフェース
+    
+    play() は再生を開始してすぐに戻り、再生が終わると on_done(completed, error) を
+    再生側のスレッドから呼び出す。completed は最後まで再生できたかどうか。
+    """
+    name = "base"
+    
+    def play(self, sources, on_done=None):
+        """音声を順番に再生する
+        
+        Args:
+            sources (iterable): WAVファイルのパスまたはWAVのバイト列（ジェネレーターも可）
+            on_done (callable, optional): 再生終了時に (completed, error) で呼ばれる
+        """
+        raise NotImplementedError
+    
+    def stop(self):
+        """再生を停止する"""
+        raise NotImplementedError
+    
+    def play_and_wait(self, sources):
+        """再生が終わるまで待つ（再生スレッド以外から呼ぶ）
+        
+        Returns:
+            bool: 最後まで再生できた場合はTrue
+        """
+        done = threading.Event()
+        result = {}
+        
+        def on_done(completed, error):
+            result["completed"] = completed
+            done.set()
+        
+        self.play(sources, on_done)
+        done.wait()
+        return result["completed"]
+
+class SubprocessPlayer(PlaybackBackend):
+    """外部コマンド（macOSの afplay など）で1ファイルずつ再生するバックエンド"""
+    name = "afplay"
+    
+    def __init__(self, command=("afplay",)):
+        self.command = list(command)
+        self.process = None
+        self.generation = 0
+        self.lock = threading.Lock()
+    
+    def play(self, sources, on_done=None):
+        self.stop()
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+        thread = threading.Thread(target=self._run, args=(sources, on_done, generation), daemon=True)
+        thread.start()
+    
+    def stop(self):
+        with self.lock:
+            self.generation += 1
+            process = self.process
+            self.process = None
+        if process and process.poll() is None:
+            process.terminate()
+    
+    def _run(self, sources, on_done, generation):
+        completed = True
+        error = None
+        try:
+            for source in sources:
+                if generation != self.generation:
+                    completed = False
+                    break
+                temp_file = None
+                path = source
+                if not isinstance(source, str):
+                    # バイト列はコマンドに渡せないので一時ファイルに書き出す
+                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
+                        temp_file = path = fp.name
+                        fp.write(source)
+                try:
+                    with self.lock:
+                        if generation != self.generation:
+                            completed = False
+                            break
+                        self.process = process = subprocess.Popen(self.command + [path])
+                    # ポーリングせずに終了を待つ
+                    process.wait()
+                finally:
+                    if temp_file:
+                        os.unlink(temp_file)
+            if generation != self.generation:
+                completed = False
+        except Exception as e:
+            log_message(f"再生エラー: {e}", level="ERROR", prefix="音声再生")
+            completed, error = False, str(e)
+        if on_done:
+            on_done(completed, error)
+
+class NullSink:
+    """フレームを読み捨てる出力先（ヘッドレス環境・テスト用）
+    
+    realtime=True の場合は実際の再生と同じ時間をかけて読み出す。
+    """
+    def __init__(self, realtime=False, block_frames=4096):
+        self.realtime = realtime
+        self.block_frames = block_frames
+    
+    def start(self, params, ring, on_finished):
+        """出力を開始する
+        
+        Args:
+            params (tuple): (チャンネル数, サンプル幅, サンプリングレート)
+            ring (RingBuffer): PCMデータの入ったリングバッファ
+            on_finished (callable): 出力が終わったら (completed) で呼ぶ
+        """
+        thread = threading.Thread(target=self._drain, args=(params, ring, on_finished), daemon=True)
+        thread.start()
+    
+    def stop(self):
+        pass
+    
+    def _drain(self, params, ring, on_finished):
+        frame_bytes = params[0] * params[1]
+        bytes_per_sec = frame_bytes * params[2]
+        self.open(params)
+        try:
+            while True:
+                data = ring.read(self.block_frames * frame_bytes)
+                if not data:
+                    break
+                self.write(data)
+                if self.realtime:
+                    time.sleep(len(data) / float(bytes_per_sec))
+        finally:
+            self.close()
+        on_finished(not ring.aborted)
+    
+    def open(self, params):
+        pass
+    
+    def write(self, data):
+        pass
+    
+    def close(self):
+        pass
+
+class FileSink(NullSink):
+    """再生するはずだったフレームをWAVファイルに書き出す出力先"""
+    def __init__(self, path, block_frames=4096):
+        super().__init__(realtime=False, block_frames=block_frames)
+        self.path = path
+        self.wav = None
+    
+    def open(self, params):
+        self.wav = wave.open(self.path, 'wb')
+        self.wav.setnchannels(params[0])
+        self.wav.setsampwidth(params[1])
+        self.wav.setframerate(params[2])
+    
+    def write(self, data):
+        self.wav.writeframes(data)
+    
+    def close(self):
+        if self.wav:
+            self.wav.close()
+            self.wav = None
+
+class SoundDeviceSink:
+    """sounddevice（PortAudio）でオーディオデバイスに直接出力する出力先"""
+    DTYPES = {1: 'uint8', 2: 'int16', 3: 'int24', 4: 'int32'}
+    
+    def __init__(self):
+        import sounddevice
+        self.sd = sounddevice
+        self.stream = None
+    
+    def start(self, params, ring, on_finished):
+        channels, sampwidth, framerate = params
+        sd = self.sd
+        
+        def callback(outdata, frames, time_info, status):
+            data = ring.read(len(outdata), block=False)
+            outdata[:len(data)] = data
+            if len(data) < len(outdata):
+                # 合成が追いつかない間は無音で埋める
+                outdata[len(data):] = b'\x00' * (len(outdata) - len(data))
+                if ring.is_drained():
+                    raise sd.CallbackStop()
+        
+        self.stream = sd.RawOutputStream(samplerate=framerate, channels=channels, dtype=self.DTYPES[sampwidth],
+                                         callback=callback, finished_callback=lambda: on_finished(not ring.aborted))
+        self.stream.start()
+    
+    def stop(self):
+        stream = self.stream
+        self.stream = None
+        if stream:
+            stream.abort()
+            stream.close()
+
+class StreamingPlayer(PlaybackBackend):
+    """WAVのフレームをリングバッファ経由で出力先に流すプロセス内プレイヤー
+    
+    複数のソースを1本のストリームとして途切れなく再生するので、文ごとに合成した
+    音声を合成が終わった順に渡しても間が空かない。
+    """
+    def __init__(self, sink, buffer_seconds=2.0, block_frames=4096):
+        """
+        Args:
+            sink: NullSink / FileSink / SoundDeviceSink などの出力先
+            buffer_seconds (float): リングバッファの長さ（秒）
+            block_frames (int): 一度に書き込むフレーム数
+        """
+        self.sink = sink
+        self.name = type(sink).__name__
+        self.buffer_seconds = buffer_seconds
+        self.block_frames = block_frames
+        self.ring = None
+        self.generation = 0
+        self.lock = threading.Lock()
+    
+    def play(self, sources, on_done=None):
+        self.stop()
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+        thread = threading.Thread(target=self._feed, args=(sources, on_done, generation), daemon=True)
+        thread.start()
+    
+    def stop(self):
+        with self.lock:
+            # 出力開始前の再生も止まるように世代を進める
+            self.generation += 1
+            ring = self.ring
+            self.ring = None
+        if ring:
+            ring.abort()
+            self.sink.stop()
+    
+    def _feed(self, sources, on_done, generation):
+        """ソースを順に開いてフレームをリングバッファに書き込む（供給スレッドで実行）"""
+        finished = threading.Event()
+        state = {"error": None}
+        ring = None
+        params = None
+        
+        def on_finished(completed):
+            if on_done:
+                on_done(completed and not state["error"], state["error"])
+            finished.set()
+        
+        try:
+            for source in sources:
+                with open_wav_source(source) as wav:
+                    source_params = wav.getparams()[:3]
+                    if ring is None:
+                        params = source_params
+                        capacity = int(params[0] * params[1] * params[2] * self.buffer_seconds)
+                        with self.lock:
+                            if generation != self.generation:
+                                break
+                            ring = self.ring = RingBuffer(capacity)
+                            self.sink.start(params, ring, on_finished)
+                    elif source_params != params:
+                        raise ValueError("連結して再生するWAVの形式が一致しません")
+                    
+                    while True:
+                        frames = wav.readframes(self.block_frames)
+                        if not frames:
+                            break
+                        if not ring.write(frames):
+                            return
+                if ring.aborted:
+                    return
+        except Exception as e:
+            log_message(f"再生エラー: {e}", level="ERROR", prefix="音声再生")
+            state["error"] = str(e)
+            if ring:
+                ring.abort()
+        
+        if ring is None:
+            # 再生するものがなかった、または出力開始前に停止された
+            if on_done:
+                on_done(generation == self.generation and not state["error"], state["error"])
+            return
+        ring.finish()
+
+def create_playback_backend(name="auto"):
+    """名前から再生バックエンドを作成する
+    
+    Args:
+        name (str): auto, sounddevice, afplay, null, または file:<出力パス>
+        
+    Returns:
+        PlaybackBackend: 再生バックエンド
+    """
+    if name.startswith("file:"):
+        return StreamingPlayer(FileSink(name[len("file:"):]))
+    
+    if name in ("auto", "sounddevice"):
+        try:
+            return StreamingPlayer(SoundDeviceSink())
+        except (ImportError, OSError) as e:
+            if name == "sounddevice":
+                log_message(f"sounddeviceを利用できません: {e}", level="WARN", prefix="音声再生")
+    
+    if name in ("auto", "afplay") and shutil.which("afplay"):
+        return SubprocessPlayer(["afplay"])
+    
+    if name != "null":
+        log_message("利用できる再生デバイスがないため、音声を出力せずに再生します", level="WARN", prefix="音声再生")
+    return StreamingPlayer(NullSink(realtime=True))
+
+class BatchRenderer:
+    """Tkを使わずに台本全体の音声をまとめて書き出す
+    
+    スライドごとの合成をVOICEVOX通信用のイベントループで並行に実行し、スライドごとのWAVと
+    manifest.json を出力ディレクトリに書き出す。合成結果は永続キャッシュにも登録する。
+    """
+    def __init__(self, speaker=1, speech_rate=220, workers=4, voicevox_url=VOICEVOX_URL, cache=None, batch_size=1,
+                 prosody=None):
+        """
+        Args:
+            speaker (int): VOICEVOX話者ID
+            speech_rate (int): 読み上げ速度（WPM）
+            workers (int): 同時に合成するスライド数（batch_size > 1 の場合はグループ数）
+            voicevox_url (str or EnginePool): VOICEVOXエンジンのURL（EnginePool なら複数エンジンに振り分ける）
+            cache (AudioCache, optional): 永続キャッシュ（Noneならキャッシュを使わない）
+            batch_size (int): 2以上なら、この枚数ごとに全文を /multi_synthesis で一括合成する
+            prosody (dict, optional): pitchScale などクエリに上書きする抑揚パラメータ
+        """
+        self.speaker = speaker
+        self.speech_rate = speech_rate
+        self.workers = max(1, workers)
+        self.voicevox_url = voicevox_url
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.prosody = dict(DEFAULT_PROSODY, **(prosody or {}))
+    
+    def render(self, script_path, out_dir):
+        """台本を読み込み、全スライドの音声を書き出す
+        
+        Args:
+            script_path (str): マークダウン台本のパス
+            out_dir (str): 出力先ディレクトリ
+            
+        Returns:
+            dict: manifest.json に書き出した内容
+        """
+        slides = parse_slides(script_path)
+        os.makedirs(out_dir, exist_ok=True)
+        engine_version = get_voicevox_version(self.voicevox_url)
+        speed_scale = speech_rate_to_speed_scale(self.speech_rate)
+        
+        log_message(f"{len(slides)}枚のスライドを{self.workers}並列で書き出します", level="INFO", prefix="バッチ")
+        started = time.time()
+        
+        results = run_voicevox_async(self._render_all(slides, out_dir, speed_scale, engine_version))
+        
+        manifest = {
+            "script": os.path.abspath(script_path),
+            "engine": "voicevox",
+            "engine_version": engine_version,
+            "speaker": self.speaker,
+            "speech_rate": self.speech_rate,
+            "speed_scale": speed_scale,
+            "prosody": self.prosody,
+            "batch_size": self.batch_size,
+            "created": datetime.datetime.now().isoformat(timespec='seconds'),
+            "elapsed_sec": round(time.time() - started, 3),
+            "slides": results,
+        }
+        with open(os.path.join(out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        failed = sum(1 for r in results if r["error"])
+        log_message(f"書き出し完了: {len(results) - failed}/{len(results)}枚 ({manifest['elapsed_sec']:.1f}秒)", 
+                  level="SUCCESS" if not failed else "WARN", prefix="バッチ")
+        if self.cache:
+            self.cache.save()
+        get_query_cache().save()
+        return manifest
+    
+    async def _render_all(self, slides, out_dir, speed_scale, engine_version):
+        """全スライドをイベントループ上で並行に合成する（同時に扱うスライド数は workers まで）"""
+        # 最初のスライドが話者モデルの読み込みを待たないよう、先に読み込んでおく
+        try:
+            await initialize_speaker_async(self.speaker, self.voicevox_url)
+        except VoicevoxError as e:
+            log_message(f"話者モデルの事前読み込みに失敗しました: {e}", level="WARN", prefix="バッチ")
+        
+        limit = asyncio.Semaphore(self.workers)
+        
+        async def render_slide(idx):
+            async with limit:
+                return await self._render_slide(idx, slides.record(idx), out_dir, speed_scale, engine_version)
+        
+        async def render_group(group):
+            async with limit:
+                return await self._render_group(group, slides, out_dir, speed_scale, engine_version)
+        
+        if self.batch_size > 1:
+            groups = [range(i, min(i + self.batch_size, len(slides))) for i in range(0, len(slides), self.batch_size)]
+            grouped = await asyncio.gather(*(render_group(group) for group in groups))
+            return [result for results in grouped for result in results]
+        return list(await asyncio.gather(*(render_slide(idx) for idx in range(len(slides)))))
+    
+    def _prepare_slide(self, slide_idx, record, speed_scale, engine_version):
+        """スライドの SlideRecord から manifest用の結果とキャッシュキーを作る"""
+        result = {
+            "index": slide_idx,
+            "heading": slide_heading(record.raw),
+            "file": None,
+            "chars": record.char_count,
+            "duration_sec": 0.0,
+            "cached": False,
+            "error": None,
+        }
+        cache_key = AudioCache.make_key(record.content_hash, "voicevox", self.speaker, speed_scale, engine_version, 
+                                        self.prosody)
+        return record.lines, result, cache_key
+    
+    def _lookup_cache(self, result, cache_key):
+        """永続キャッシュにあればそのパスを返す"""
+        if not self.cache:
+            return None
+        source = self.cache.get(cache_key)
+        result["cached"] = source is not None
+        return source
+    
+    def _write_output(self, result, source, cache_key, out_dir, from_cache=False):
+        """生成した音声をキャッシュに登録し、出力ディレクトリに書き出す"""
+        with tracer.span("write", slide=result["index"], cached=from_cache):
+            self._copy_output(result, source, cache_key, out_dir, from_cache)
+        log_message(f"書き出しました: {result['file']} ({result['duration_sec']:.1f}秒)", 
+                  level="SUCCESS", prefix=f"スライド{result['index']+1}")
+    
+    def _copy_output(self, result, source, cache_key, out_dir, from_cache):
+        if self.cache and not from_cache:
+            source = self.cache.put(cache_key, source)
+        
+        file_name = f"slide_{result['index']+1:03d}.wav"
+        dest_path = os.path.join(out_dir, file_name)
+        if self.cache:
+            shutil.copyfile(source, dest_path)
+        else:
+            shutil.move(source, dest_path)
+        
+        with wave.open(dest_path, 'rb') as wav:
+            result["duration_sec"] = round(wav.getnframes() / float(wav.getframerate()), 3)
+        result["file"] = file_name
+    
+    def _write_wavs(self, result, wavs, cache_key, out_dir):
+        """文ごとのWAVデータを連結して書き出す"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
+            temp_file = fp.name
+        try:
+            write_concatenated_wav(wavs, temp_file)
+        except Exception:
+            os.unlink(temp_file)
+            raise
+        self._write_output(result, temp_file, cache_key, out_dir)
+    
+    async def _render_slide(self, slide_idx, record, out_dir, speed_scale, engine_version):
+        """1枚分の音声を文単位で並行に生成して出力ディレクトリに書き出す（イベントループで実行）"""
+        slide_prefix = f"スライド{slide_idx+1}"
+        lines, result, cache_key = self._prepare_slide(slide_idx, record, speed_scale, engine_version)
+        trace_slide.set(slide_idx)
         
-    Returns:
-        bool: パスが有効な場合はTrue、そうでない場合はFalse
-    """
-    if not path or not os.path.exists(path):
-        return False
+        if not result["chars"]:
+            log_message("テキストが空のためスキップします", level="WARN", prefix=slide_prefix)
+            return result
         
-    # macOSの場合
-    if platform.system() == 'Darwin':
-        # VOICEVOXアプリバンドルの存在確認
-        if path.endswith('.app') and os.path.isdir(path):
-            # エンジン実行ファイルの存在確認
-            engine_path = os.path.join(path, 'Contents', 'Resources', 'vv-engine', 'run')
-            return os.path.exists(engine_path) and os.access(engine_path, os.X_OK)
-        return False
-    
-    # Windowsの場合（将来的に対応）
-    elif platform.system() == 'Windows':
-        # VOICEVOX実行ファイルの存在確認
-        exe_path = os.path.join(path, 'VOICEVOX.exe')
-        return os.path.exists(exe_path) and os.access(exe_path, os.X_OK)
+        # ファイルの読み書きはループを止めないよう別スレッドで行う
+        loop = asyncio.get_running_loop()
+        try:
+            source = self._lookup_cache(result, cache_key)
+            if source:
+                await loop.run_in_executor(None, self._write_output, result, source, cache_key, out_dir, True)
+                return result
+            
+            wavs = await asyncio.gather(*(synthesize_voicevox_async(chunk, self.speaker, self.speech_rate, 
+                                                                    self.voicevox_url, self.prosody) 
+                                          for chunk in split_sentences(lines)))
+            await loop.run_in_executor(None, self._write_wavs, result, wavs, cache_key, out_dir)
+        except Exception as e:
+            log_message(f"書き出しエラー: {e}", level="ERROR", prefix=slide_prefix)
+            result["error"] = str(e)
+        return result
     
-    return False
+    async def _render_group(self, indices, slides, out_dir, speed_scale, engine_version):
+        """複数スライドの全文を /multi_synthesis 1回で合成して書き出す（イベントループで実行）"""
+        loop = asyncio.get_running_loop()
+        results = []
+        pending = []  # (result, cache_key, 文のリスト)
+        
+        for idx in indices:
+            lines, result, cache_key = self._prepare_slide(idx, slides.record(idx), speed_scale, engine_version)
+            results.append(result)
+            if not result["chars"]:
+                log_message("テキストが空のためスキップします", level="WARN", prefix=f"スライド{idx+1}")
+                continue
+            try:
+                source = self._lookup_cache(result, cache_key)
+                if source:
+                    await loop.run_in_executor(None, self._write_output, result, source, cache_key, out_dir, True)
+                else:
+                    pending.append((result, cache_key, split_sentences(lines)))
+            except Exception as e:
+                log_message(f"書き出しエラー: {e}", level="ERROR", prefix=f"スライド{idx+1}")
+                result["error"] = str(e)
+        
+        if not pending:
+            return results
+        
+        group_prefix = f"スライド{indices[0]+1}-{indices[-1]+1}"
+        try:
+            # 文ごとのクエリは並行に作成し、合成は1回のリクエストにまとめる
+            sentences = [(result["index"], sentence) for result, _, chunks in pending for sentence in chunks]
+            queries = await asyncio.gather(*(with_trace_slide(idx, create_voicevox_query_async(
+                                                 sentence, self.speaker, self.speech_rate, self.voicevox_url, self.prosody)) 
+                                             for idx, sentence in sentences))
+            wavs = await multi_synthesize_voicevox_async(list(queries), self.speaker, self.voicevox_url)
+        except Exception as e:
+            log_message(f"一括合成エラー: {e}", level="ERROR", prefix=group_prefix)
+            for result, _, _ in pending:
+                result["error"] = str(e)
+            return results
+        
+        # スライドごとに文の音声を連結して書き出す
+        offset = 0
+        for result, cache_key, chunks in pending:
+            slide_wavs = wavs[offset:offset + len(chunks)]
+            offset += len(chunks)
+            try:
+                await loop.run_in_executor(None, self._write_wavs, result, slide_wavs, cache_key, out_dir)
+            except Exception as e:
+                log_message(f"書き出しエラー: {e}", level="ERROR", prefix=f"スライド{result['index']+1}")
+                result["error"] = str(e)
+        return results
 
-def find_voicevox_path(user_path=None):
-    """VOICEVOXのインストールパスを検出する
+def format_cue_time(seconds):
+    """秒をCUEシートの MM:SS:FF（1秒=75フレーム）形式にする"""
+    frames = int(round(seconds * 75))
+    return f"{frames // (75 * 60):02d}:{frames // 75 % 60:02d}:{frames % 75:02d}"
+
+class DeckAnalyzer:
+    """音声を合成せずに、音声合成クエリから台本全体の読み上げ時間を求める
     
-    Args:
-        user_path (str, optional): ユーザーが指定したVOICEVOXパス
-        
-    Returns:
-        str or None: 有効なVOICEVOXパス、見つからない場合はNone
+    全スライドの文ごとのクエリをVOICEVOX通信用のイベントループで並行に取得する。取得したクエリは
+    クエリキャッシュに入るので、そのまま合成にも使われる。結果は speedScale=1.0 での秒数で持ち、
+    任意の読み上げ速度の時間は durations_at で割り算するだけで求まる。
     """
-    # ユーザー指定のパスがあり、それが有効な場合はそれを使用
-    if user_path and validate_voicevox_path(user_path):
-        log_message(f"ユーザー指定のVOICEVOXパスを使用: {user_path}", level="INFO", prefix="VOICEVOX")
-        return user_path
+    def __init__(self, speaker=1, workers=8, voicevox_url=VOICEVOX_URL):
+        """
+        Args:
+            speaker (int): VOICEVOX話者ID
+            workers (int): 同時にクエリを取得するスライド数
+            voicevox_url (str or EnginePool): VOICEVOXエンジンのURL
+        """
+        self.speaker = speaker
+        self.workers = max(1, workers)
+        self.voicevox_url = voicevox_url
+    
+    def analyze(self, slides):
+        """全スライドの読み上げ時間を求める
         
-    # macOSの場合
-    if platform.system() == 'Darwin':
-        # デフォルトのインストールパスをチェック
-        if os.path.exists(DEFAULT_VOICEVOX_PATH) and validate_voicevox_path(DEFAULT_VOICEVOX_PATH):
-            log_message(f"デフォルトのVOICEVOXパスを使用: {DEFAULT_VOICEVOX_PATH}", level="INFO", prefix="VOICEVOX")
-            return DEFAULT_VOICEVOX_PATH
+        Args:
+            slides (SlideIndex): 台本
+            
+        Returns:
+            list: スライドごとの結果（index, heading, content_hash, sentences, base_sec, error）
+        """
+        started = time.time()
+        results = run_voicevox_async(self.analyze_async(slides))
+        failed = sum(1 for r in results if r["error"])
+        log_message(f"{len(results)}枚の読み上げ時間を求めました ({time.time() - started:.1f}秒, 失敗 {failed}枚)", 
+                  level="SUCCESS" if not failed else "WARN", prefix="所要時間")
+        get_query_cache().save()
+        return results
+    
+    async def analyze_async(self, slides):
+        """全スライドのクエリを並行に取得して読み上げ時間を求める（イベントループで実行）"""
+        limit = asyncio.Semaphore(self.workers)
         
-        # Applicationsフォルダを検索
+        async def analyze_slide(idx):
+            async with limit:
+                return await self._analyze_slide(idx, slides.record(idx))
+        
+        return list(await asyncio.gather(*(analyze_slide(idx) for idx in range(len(slides)))))
+    
+    async def _analyze_slide(self, slide_idx, record):
+        """1枚分の文ごとのクエリを取得して speedScale=1.0 での秒数を合計する"""
+        sentences = split_sentences(record.lines)
+        result = {
+            "index": slide_idx,
+            "heading": slide_heading(record.raw),
+            "content_hash": record.content_hash,
+            "sentences": len(sentences),
+            "base_sec": 0.0,
+            "error": None,
+        }
+        trace_slide.set(slide_idx)
         try:
-            result = subprocess.run(['find', '/Applications', '-name', 'VOICEVOX.app', '-maxdepth', '1'], 
-                                  capture_output=True, text=True, check=False)
-            if result.stdout:
-                found_path = result.stdout.strip()
-                if validate_voicevox_path(found_path):
-                    log_message(f"検索で見つかったVOICEVOXパスを使用: {found_path}", level="INFO", prefix="VOICEVOX")
-                    return found_path
+            queries = await asyncio.gather(*(fetch_voicevox_query_async(sentence, self.speaker, self.voicevox_url) 
+                                             for sentence in sentences))
+            result["base_sec"] = sum(audio_query_duration(query, 1.0) for query in queries)
         except Exception as e:
-            log_message(f"VOICEVOXパスの検索中にエラー: {e}", level="ERROR", prefix="VOICEVOX")
-    
-    # Windowsの場合（将来的に対応）
-    elif platform.system() == 'Windows':
-        # Windowsでの一般的なインストールパスをチェック
-        paths = [
-            os.path.join(os.environ.get('ProgramFiles', 'C:\\Program Files'), 'VOICEVOX'),
-            os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'VOICEVOX')
-        ]
-        for path in paths:
-            if validate_voicevox_path(path):
-                log_message(f"Windows標準パスでVOICEVOXを発見: {path}", level="INFO", prefix="VOICEVOX")
-                return path
+            log_message(f"クエリを取得できません: {e}", level="ERROR", prefix=f"スライド{slide_idx+1}")
+            result["error"] = str(e)
+        return result
     
-    log_message("有効なVOICEVOXパスが見つかりませんでした", level="WARN", prefix="VOICEVOX")
-    return None
+    @staticmethod
+    def durations_at(results, speech_rate):
+        """analyze の結果から、指定した読み上げ速度でのスライドごとの秒数を求める"""
+        speed_scale = speech_rate_to_speed_scale(speech_rate)
+        return [result["base_sec"] / speed_scale for result in results]
 
-def is_voicevox_engine_running():
-    """VOICEVOXエンジンが起動しているか確認する"""
-    if not REQUESTS_AVAILABLE:
-        return False
-    
-    try:
-        response = requests.get(f"{VOICEVOX_URL}/version", timeout=1)
-        return response.status_code == 200
-    except Exception:
-        return False
+def print_deck_analysis(results, speech_rate):
+    """スライドごとと全体の読み上げ時間を表にして出力する"""
+    durations = DeckAnalyzer.durations_at(results, speech_rate)
+    elapsed = 0.0
+    print(f"{'No.':>4}  {'時間':>5}  {'開始':>5}  見出し")  # 全角の見出しは2桁分で数える
+    for result, duration in zip(results, durations):
+        mark = " (取得失敗)" if result["error"] else ""
+        print(f"{result['index'] + 1:>4}  {format_duration(duration):>7}  {format_duration(elapsed):>7}  "
+              f"{result['heading']}{mark}")
+        elapsed += duration
+    print(f"合計 {format_duration(elapsed)}（{len(results)}枚, {speech_rate} WPM, "
+          f"speedScale {speech_rate_to_speed_scale(speech_rate):.2f}）")
 
-def start_voicevox_engine(user_specified_path=None):
-    """VOICEVOXエンジンを起動する
+def export_presentation(manifest, out_dir, dest_path, gap_sec=1.0, block_frames=65536):
+    """スライドごとのWAVを1本の音声にまとめ、チャプター情報をJSONとCUEに書き出す
+    
+    各スライドのファイルから block_frames ずつ読んでそのまま書き込むので、
+    台本全体をメモリに読み込まない。
     
     Args:
-        user_specified_path (str, optional): ユーザーが指定したVOICEVOXパス
+        manifest (dict): BatchRenderer.render の結果
+        out_dir (str): スライドごとのWAVがあるディレクトリ
+        dest_path (str): 出力するWAVファイルのパス
+        gap_sec (float): スライド間に入れる無音の長さ（秒）
+        block_frames (int): 一度に読み書きするフレーム数
         
     Returns:
-        bool: 起動に成功した場合はTrue、失敗した場合はFalse
+        dict: チャプター情報（<出力名>.chapters.json に書き出した内容）
     """
-    global voicevox_process
+    slides = [slide for slide in manifest["slides"] if slide["file"]]
+    if not slides:
+        # 形式を決められないWAVは閉じるときにエラーになるので、出力ファイルを作る前に確認する
+        raise ValueError("書き出せる音声がありません")
     
-    if is_voicevox_engine_running():
-        log_message("VOICEVOXエンジンはすでに実行中です", level="INFO", prefix="VOICEVOX")
-        return True
-    
-    # パスを検索（ユーザー指定のパスがある場合はそれを優先）
-    voicevox_path = find_voicevox_path(user_specified_path)
-    if not voicevox_path:
-        log_message("VOICEVOXのインストールパスが見つかりません", level="ERROR", prefix="VOICEVOX")
-        return False
+    chapters = []
+    params = None
+    total_frames = 0
     
-    try:
-        # macOS
-        if platform.system() == 'Darwin':
-            # VOICEVOX.app内のengineを起動
-            engine_path = os.path.join(voicevox_path, 'Contents', 'Resources', 'vv-engine', 'run')
-            if os.path.exists(engine_path):
-                log_message(f"VOICEVOXエンジンを起動しています: {engine_path}", level="INFO", prefix="VOICEVOX")
-                voicevox_process = subprocess.Popen([engine_path, '--host=localhost', '--port=50021'], 
-                                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                # プロセスが終了しないよう、atexitで登録
-                atexit.register(stop_voicevox_engine)
+    with wave.open(dest_path, 'wb') as out:
+        for slide in slides:
+            with wave.open(os.path.join(out_dir, slide["file"]), 'rb') as src:
+                if params is None:
+                    params = src.getparams()[:3]
+                    out.setnchannels(params[0])
+                    out.setsampwidth(params[1])
+                    out.setframerate(params[2])
+                    silence = b'\x00' * (int(params[2] * gap_sec) * params[0] * params[1])
+                elif src.getparams()[:3] != params:
+                    raise ValueError(f"{slide['file']} の音声形式が他のスライドと一致しません")
+                elif silence:
+                    out.writeframes(silence)
+                    total_frames += len(silence) // (params[0] * params[1])
                 
-                # 起動を待機
-                max_retries = 10
-                for i in range(max_retries):
-                    time.sleep(1)  # 1秒待機
-                    if is_voicevox_engine_running():
-                        log_message("VOICEVOXエンジンが起動しました", level="SUCCESS", prefix="VOICEVOX")
-                        return True
-                    log_message(f"VOICEVOXエンジン起動待機中... ({i+1}/{max_retries})", level="INFO", prefix="VOICEVOX")
-                
-                log_message("VOICEVOXエンジンの起動がタイムアウトしました", level="ERROR", prefix="VOICEVOX")
-                return False
-            else:
-                log_message(f"VOICEVOXエンジン実行ファイルが見つかりません: {engine_path}", level="ERROR", prefix="VOICEVOX")
-                return False
-        
-        # Windows（将来的に対応）
-        elif platform.system() == 'Windows':
-            # Windowsでの起動方法（将来実装）
-            log_message("Windows環境でのVOICEVOX自動起動は現在サポートされていません", level="WARN", prefix="VOICEVOX")
-            return False
-        
-        else:
-            log_message(f"サポートされていないOS: {platform.system()}", level="ERROR", prefix="VOICEVOX")
-            return False
-        
-    except Exception as e:
-        log_message(f"VOICEVOXエンジン起動エラー: {e}", level="ERROR", prefix="VOICEVOX")
-        import traceback
-        traceback.print_exc()
-        return False
-
-def stop_voicevox_engine():
-    """VOICEVOXエンジンを停止する"""
-    global voicevox_process
-    if voicevox_process:
-        try:
-            print("VOICEVOXエンジンを停止します")
-            voicevox_process.terminate()
-            voicevox_process.wait(timeout=5)
-            voicevox_process = None
-        except Exception as e:
-            print(f"VOICEVOXエンジン停止エラー: {e}")
-            try:
-                voicevox_process.kill()
-            except:
-                pass
+                start_frames = total_frames
+                while True:
+                    frames = src.readframes(block_frames)
+                    if not frames:
+                        break
+                    out.writeframes(frames)
+                    total_frames += len(frames) // (params[0] * params[1])
+            
+            chapters.append({
+                "index": slide["index"],
+                "heading": slide["heading"] or f"スライド{slide['index']+1}",
+                "start_sec": round(start_frames / float(params[2]), 3),
+                "duration_sec": round((total_frames - start_frames) / float(params[2]), 3),
+            })
+    
+    info = {
+        "file": os.path.basename(dest_path),
+        "script": manifest["script"],
+        "gap_sec": gap_sec,
+        "duration_sec": round(total_frames / float(params[2]), 3),
+        "chapters": chapters,
+    }
+    base_path = os.path.splitext(dest_path)[0]
+    with open(base_path + ".chapters.json", 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    
+    title = os.path.splitext(os.path.basename(manifest["script"]))[0]
+    with open(base_path + ".cue", 'w', encoding='utf-8') as f:
+        f.write(f'TITLE "{title}"\n')
+        f.write(f'FILE "{info["file"]}" WAVE\n')
+        for number, chapter in enumerate(chapters, 1):
+            f.write(f'  TRACK {number:02d} AUDIO\n')
+            f.write(f'    TITLE "{chapter["heading"].replace(chr(34), chr(39))}"\n')
+            f.write(f'    INDEX 01 {format_cue_time(chapter["start_sec"])}\n')
+    
+    log_message(f"{len(chapters)}枚のスライドを1本にまとめました: {dest_path} ({info['duration_sec']:.1f}秒)", 
+              level="SUCCESS", prefix="書き出し")
+    return info
 
 class SimpleScriptReader:
-    def __init__(self, root):
+    def __init__(self, root, script_path=None, playback="auto", prefetch_all=False, 
+                 memory_cache_bytes=MEMORY_AUDIO_CACHE_MAX_BYTES, warm_speakers=None):
         self.root = root
         self.root.title("シンプル台本リーダー")
         self.root.geometry("800x720")  # 高さを少し大きくしてVOICEVOX設定用のスペースを確保
@@ -301,33 +3645,88 @@ class SimpleScriptReader:
         self.accent_red = "#ff5252"  # アクセントレッド
         self.accent_blue = "#2196f3"  # アクセントブルー
         
+        # 前回終了時の設定（初回起動時は空で、以下の既定値を使う）
+        self.config = load_config()
+        
         # 読み上げ設定
-        self.speech_rate = 220  # 高速に設定 (sayコマンド用レート)
-        self.pause_time = 0.08  # 改行間のポーズ時間をより短く
         self.min_rate = 100     # 最小読み上げ速度
         self.max_rate = 660     # 最大読み上げ速度（VOICEVOXで3倍速まで対応）
+        self.speech_rate = min(max(int(self.config.get("speech_rate", 220)), self.min_rate), self.max_rate)  # 高速に設定 (sayコマンド用レート)
         
         # 音声合成エンジンの設定
         self.use_gtts = False   # Google TTS
         self.use_voicevox = True  # デフォルトでVOICEVOXを使用
-        self.voicevox_speaker = 1  # デフォルト話者ID
+        self.voicevox_speaker = int(self.config.get("voicevox_speaker", 1))  # デフォルト話者ID
+        self.prosody = dict(DEFAULT_PROSODY, **self.config.get("prosody", {}))  # 速度以外の抑揚パラメータ
         self.voicevox_url = VOICEVOX_URL  # VOICEVOXエンジンのURL
         
-        # VOICEVOX関連設定
-        self.voicevox_path = StringVar(value=find_voicevox_path() or "")  # VOICEVOXのパス
-        self.auto_start_voicevox = IntVar(value=1)  # 自動起動設定（デフォルトで有効）
+        # VOICEVOX関連設定（パスの検索はエンジンを起動するときに監視スレッドで行い、見つけたら設定に保存する）
+        self.voicevox_path = StringVar(value=self.config.get("voicevox_path") or "")  # VOICEVOXのパス
+        self.auto_start_voicevox = IntVar(value=1 if self.config.get("auto_start", True) else 0)  # 自動起動設定（デフォルトで有効）
+        # 速度変更時にエンジンで合成し直すか（無効なら合成済みの音声を手元で伸縮する。NumPyがなければ常に合成し直す）
+        self.resynthesize_on_speed_change = IntVar(
+            value=1 if self.config.get("resynthesize_on_speed_change", False) or not NUMPY_AVAILABLE else 0)
+        
+        # エンジンの起動と死活監視（状態変化は _on_engine_state で受け取る）
+        self.engine_supervisor = EngineSupervisor(self.voicevox_url)
+        self.engine_supervisor.add_listener(self._on_engine_state)
+        
+        # 話者モデルの事前読み込み（選択中の話者に加えて warm_speakers の話者も読み込んでおく）
+        self.speaker_warmer = SpeakerWarmer()
+        if warm_speakers is None:
+            warm_speakers = self.config.get("warm_speakers", [])
+        self.warm_speakers = list(warm_speakers)
+        
+        # 話者一覧（前回保存したものをすぐに使い、エンジンの準備ができたら取得し直す）
+        self.speaker_catalog = SpeakerCatalog()
+        if self.speaker_catalog.load_latest():
+            self.speakers = OrderedDict(self.speaker_catalog.styles)
+        else:
+            self.speakers = OrderedDict(VOICEVOX_SPEAKERS)
+        
+        # 音声再生バックエンド（WAV以外のファイルは afplay で再生）
+        self.player = create_playback_backend(playback)
+        self.file_player = self.player if isinstance(self.player, SubprocessPlayer) else SubprocessPlayer(["afplay"])
+        log_message(f"再生バックエンド: {self.player.name}", level="INFO", prefix="音声再生")
+        
+        # セッションをまたいで使う永続音声キャッシュ
+        self.persistent_cache = AudioCache()
+        # VOICEVOXの合成結果はメモリ上に置き、上限を超えた分だけ永続キャッシュへ書き出す
+        self.memory_cache = MemoryAudioCache(self.persistent_cache, memory_cache_bytes)
         
         # 音声キャッシュ用の辞書
-        self.audio_cache = {}  # キー: スライドインデックス, 値: 一時ファイルパス
+        self.audio_cache = {}  # キー: スライドインデックス, 値: 音声ソース（ファイルパス、またはメモリ上のWAVデータのタプル）
         self.is_loading = {}   # キー: スライドインデックス, 値: True/False（読み込み中か）
         self.is_loaded = {}    # キー: スライドインデックス, 値: True/False（ロード済みか）
         
+        # 先読み設定（現在のスライドの後ろ何枚分を先に合成しておくか）
+        self.prefetch_depth = 2
+        self.prefetch_enabled = False  # 一度音声を読み込んだら以降のスライドも先読みする
+        self.prefetch_all = prefetch_all  # 先読み範囲外のスライドも最低の優先度で合成する
+        self.prefetcher = AudioPrefetcher(self.root, self._render_slide_audio)
+        self.streaming_synthesis = None  # 合成しながら再生中の ChunkedSynthesis
+        # エンジンで合成した音声の速度（速度以外の条件が同じ音声を伸縮の元にする）
+        self.base_renderings = {}  # キー: _base_rendering_key, 値: 合成したときの読み上げ速度（WPM）
+        self.speed_reload_timer = None  # 速度変更後の音声の作り直しを遅らせるタイマー
+        self.speed_reload_slides = []   # 速度変更後に作り直すスライド
+        
+        # 音声合成クエリから求めた読み上げ時間（「所要時間」ボタンを押すと以後は台本や話者の変更時に求め直す）
+        self.deck_analysis_enabled = False
+        self.deck_durations = {}  # キー: (content_hash, 話者ID), 値: speedScale=1.0 での秒数
+        self.deck_analysis_running = False
+        
         # ルートウィンドウの背景色設定
         self.root.configure(bg=self.bg_color)
         
         # 現在のファイルパス
-        self.script_path = DEFAULT_SCRIPT_PATH if os.path.exists(DEFAULT_SCRIPT_PATH) else None
-        self.slides = []
+        if script_path:
+            self.script_path = script_path
+        else:
+            self.script_path = DEFAULT_SCRIPT_PATH if os.path.exists(DEFAULT_SCRIPT_PATH) else None
+        self.slides = SlideIndex.from_texts([])
+        self.precompute_stop = threading.Event()  # 台本の前処理を止めるイベント
+        self.file_watcher = None  # 台本ファイルの変更監視
+        self.script_reloads = 0  # 台本を読み込み・読み直した回数（古い読み直し結果を捨てるのに使う）
         self.current_slide = 0
         
         # UI作成
@@ -337,15 +3736,28 @@ class SimpleScriptReader:
         if self.script_path:
             self.load_file(self.script_path)
         else:
-            self.slides = ["ファイルを開いていません。「ファイルを開く」ボタンをクリックしてください。"]
+            self.slides = SlideIndex.from_texts(["ファイルを開いていません。「ファイルを開く」ボタンをクリックしてください。"])
             self.show_slide()
         
         # アプリケーション終了時の処理
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # VOICEVOXエンジンを自動起動
+        # VOICEVOXエンジンを自動起動（ウィンドウと最初のスライドを描画してから始める）
         if self.auto_start_voicevox.get() == 1:
-            self.start_voicevox_if_needed()
+            self.root.after_idle(self.start_voicevox_if_needed)
+    
+    def _save_config(self):
+        """現在の設定を設定ファイルに保存する（次回起動時に読み込む）"""
+        self.config.update({
+            "voicevox_path": self.voicevox_path.get(),
+            "voicevox_speaker": self.voicevox_speaker,
+            "speech_rate": self.speech_rate,
+            "prosody": dict(self.prosody),
+            "auto_start": self.auto_start_voicevox.get() == 1,
+            "warm_speakers": list(self.warm_speakers),
+            "resynthesize_on_speed_change": self.resynthesize_on_speed_change.get() == 1,
+        })
+        save_config(self.config)
     
     def browse_voicevox_path(self):
         """VOICEVOXアプリを選択するダイアログを表示"""
@@ -384,26 +3796,71 @@ class SimpleScriptReader:
         if validate_voicevox_path(path):
             self.status_label.config(text=f"VOICEVOXパスの検証に成功しました: {path}")
             log_message(f"有効なVOICEVOXパスを設定: {path}", level="SUCCESS", prefix="VOICEVOX")
-            # インスタンス変数に保存
+            # インスタンス変数と設定ファイルに保存
             self.voicevox_path.set(path)
+            self._save_config()
         else:
             self.status_label.config(text=f"無効なVOICEVOXパス: {path}")
             log_message(f"VOICEVOXパスの検証に失敗: {path}", level="ERROR", prefix="VOICEVOX")
     
     def start_voicevox_if_needed(self):
-        """VOICEVOXエンジンが起動していなければ自動起動"""
-        if not is_voicevox_engine_running():
-            # 指定されたパスがあれば使用
-            user_path = self.voicevox_path.get() if self.voicevox_path.get() else None
-            
-            if start_voicevox_engine(user_path):
-                self.status_label.config(text="VOICEVOXエンジンを自動起動しました")
-                # 起動に成功したらVOICEVOXエンジンを選択
-                self.root.after(2000, lambda: self.change_engine("voicevox"))
-            else:
-                self.status_label.config(text="VOICEVOXエンジンの自動起動に失敗しました")
-        else:
+        """VOICEVOXエンジンの起動と監視をバックグラウンドで開始する
+        
+        Returns:
+            bool: エンジンが既に ready ならTrue（起動中の場合は状態変化で通知される）
+        """
+        # 指定されたパスがあれば使用（なければ起動するときに監視スレッドで検索する）
+        user_path = self.voicevox_path.get() if self.voicevox_path.get() else None
+        self.engine_supervisor.start(lambda: self._launch_voicevox_engine(user_path))
+        
+        if self.engine_supervisor.is_ready():
             self.status_label.config(text="VOICEVOXエンジンは既に起動しています")
+            return True
+        return False
+    
+    def _launch_voicevox_engine(self, user_path):
+        """VOICEVOXのパスを確認・検索してエンジンを起動する（監視スレッドで実行）
+        
+        検索で見つかったパスは設定ファイルに保存し、次回起動時は検索を省く。
+        """
+        voicevox_path = find_voicevox_path(user_path)
+        if voicevox_path and voicevox_path != user_path:
+            try:
+                self.root.after(0, self._remember_voicevox_path, voicevox_path)
+            except Exception:
+                pass
+        return launch_voicevox_engine(voicevox_path)
+    
+    def _remember_voicevox_path(self, path):
+        """検索で見つかったVOICEVOXのパスを画面と設定ファイルに反映する（メインスレッドで実行）"""
+        self.voicevox_path.set(path)
+        self._save_config()
+    
+    def _on_engine_state(self, state, message):
+        """エンジン状態の変化を受け取る（監視スレッドから呼ばれるのでメインスレッドに渡す）"""
+        try:
+            self.root.after(0, self._apply_engine_state, state, message)
+        except Exception:
+            pass
+    
+    def _apply_engine_state(self, state, message):
+        """エンジン状態の変化をUIに反映する（メインスレッドで実行）"""
+        self.status_label.config(text=message)
+        if state == EngineSupervisor.READY:
+            self.progress_var.set("")
+            # キャッシュキーに使うバージョンは起動・再起動のたびに取り直す（入れ替えられている場合がある）
+            refresh_voicevox_version(self.voicevox_url)
+            # 起動に成功したらVOICEVOXエンジンを選択
+            if not self.use_voicevox:
+                self.change_engine("voicevox")
+            self._warm_up_speakers()
+            self._refresh_speaker_catalog()
+        elif state in (EngineSupervisor.STARTING, EngineSupervisor.RESTARTING):
+            self.progress_var.set("⏳")
+            # 再起動したエンジンはモデルを読み込み直す必要がある
+            self.speaker_warmer.forget(self.voicevox_url)
+        elif state == EngineSupervisor.FAILED:
+            self.progress_var.set("❌")
     
     def load_file(self, file_path):
         """指定されたファイルを読み込む"""
@@ -412,39 +3869,114 @@ class SimpleScriptReader:
         self.current_slide = 0
         self.show_slide()
         
+        # 全スライドの読み上げテキストをバックグラウンドで前処理しておく
+        self.script_reloads += 1
+        self.precompute_stop.set()
+        self.precompute_stop = threading.Event()
+        threading.Thread(target=self.slides.precompute, args=(self.precompute_stop,), daemon=True).start()
+        
+        # 台本の変更を監視する（編集しながらのリハーサル用）
+        if self.file_watcher:
+            self.file_watcher.stop()
+        self.file_watcher = None
+        if self.slides.file_path:
+            self.file_watcher = FileWatcher(file_path, self._on_script_changed)
+            self.file_watcher.start()
+        
         # ウィンドウタイトルにファイル名を表示
         filename = os.path.basename(file_path)
         self.root.title(f"シンプル台本リーダー - {filename}")
+        
+        if self.deck_analysis_enabled:
+            self._start_deck_analysis()
     
     def parse_slides(self, file_path):
         """マークダウンファイルからスライドを読み込む"""
-        if not os.path.exists(file_path):
-            return ["ファイルが見つかりません: " + file_path]
-            
+        return parse_slides(file_path)
+    
+    def _on_script_changed(self):
+        """台本ファイルが変更されたときの処理（監視スレッドで実行）"""
+        # self.slides などはメインスレッドでしか触らないので、読み直しの開始からメインスレッドに任せる
+        self.root.after(0, self._reload_script)
+    
+    def _reload_script(self):
+        """変更された台本の読み直しを始める（メインスレッドで実行）"""
+        base = self.slides
+        if not base.file_path:
+            return
+        self.script_reloads += 1
+        # 読み直しと変更部分の前処理は別スレッドで行い、反映だけメインスレッドで行う
+        threading.Thread(target=self._refresh_slides, args=(base, self.precompute_stop, self.script_reloads), 
+                         daemon=True).start()
+    
+    def _refresh_slides(self, base, stop_event, reload_id):
+        """台本を読み直して変更部分を前処理する（読み直し用のスレッドで実行）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # スライドの区切り（## で始まる行）で分割
-            slides = []
-            current_slide = ""
-            
-            for line in content.split('\n'):
-                if line.startswith('## '):
-                    if current_slide:
-                        slides.append(current_slide)
-                    current_slide = line
-                else:
-                    current_slide += '\n' + line
-                    
-            # 最後のスライドを追加
-            if current_slide:
-                slides.append(current_slide)
-                
-            return slides
+            slides = base.refreshed()
+            if not slides.precompute(stop_event):
+                # 別のファイルが開かれたか終了した（前処理していないスライドの残る結果は反映しない）
+                return
+            self.root.after(0, self._apply_script_change, base, slides, reload_id)
         except Exception as e:
-            print(f"ファイル読み込みエラー: {e}")
-            return ["ファイルの読み込みに失敗しました\n{str(e)}"]
+            log_message(f"台本の読み直しに失敗しました: {e}", level="ERROR", prefix="ファイル監視")
+            import traceback
+            traceback.print_exc()
+    
+    def _apply_script_change(self, base, slides, reload_id):
+        """読み直した台本を反映する（メインスレッドで実行）
+        
+        読み上げテキストが変わっていないスライドの音声はそのまま使い、
+        変わったスライドの音声と先読みジョブだけを破棄する。
+        """
+        if reload_id != self.script_reloads or base is not self.slides:
+            # 反映する前に別のファイルが開かれたか、より新しい読み直しが始まった
+            return
+        
+        old_hashes = slides.previous_hashes(base)
+        new_hashes = slides.content_hashes
+        if old_hashes == new_hashes:
+            self.slides = slides
+            log_message("台本が保存されましたが、読み上げ内容に変更はありません", level="INFO", prefix="ファイル監視")
+            return
+        
+        # 同じ内容のスライドを探して表示中のスライドを保つ（なければ同じ位置）
+        current_hash = old_hashes[self.current_slide] if self.current_slide < len(old_hashes) else None
+        candidates = [idx for idx, content_hash in enumerate(new_hashes)
+                      if content_hash is not None and content_hash == current_hash]
+        if candidates:
+            new_current = min(candidates, key=lambda idx: abs(idx - self.current_slide))
+        else:
+            new_current = min(self.current_slide, len(slides) - 1)
+        
+        # 読み込み済みの音声は内容のハッシュで新しいスライド番号に対応づけ直す
+        audio_by_hash = {old_hashes[idx]: path for idx, path in self.audio_cache.items()
+                         if idx < len(old_hashes) and old_hashes[idx] is not None}
+        self.audio_cache = {idx: audio_by_hash[content_hash] for idx, content_hash in enumerate(new_hashes)
+                            if content_hash in audio_by_hash}
+        self.is_loaded = {idx: True for idx in self.audio_cache}
+        
+        # 内容が変わったスライドの先読みジョブは取り消す
+        for idx in list(self.prefetcher.jobs.keys()):
+            if idx >= len(new_hashes) or idx >= len(old_hashes) or new_hashes[idx] != old_hashes[idx]:
+                self.prefetcher.cancel(idx)
+                self.is_loading.pop(idx, None)
+        
+        old_set = set(old_hashes)
+        changed = sum(1 for content_hash in new_hashes if content_hash is not None and content_hash not in old_set)
+        self.slides = slides
+        self.current_slide = new_current
+        if self.is_speaking:
+            # 再生中はボタンの状態を変えずに表示だけ更新する
+            self._render_slide_text()
+            self._clean_other_caches()
+            self._schedule_lookahead()
+        else:
+            self.show_slide()
+        self.status_label.config(text=f"台本の変更を反映しました（{changed}枚を更新）")
+        log_message(f"台本の変更を反映しました: {len(slides)}枚中{changed}枚を更新", level="INFO", prefix="ファイル監視")
+        if self.deck_analysis_enabled:
+            # 変わったスライドの読み上げ時間を求め直す（変わっていないスライドはクエリキャッシュから求まる）
+            self._start_deck_analysis()
         
     def create_ui(self):
         """UIコンポーネントを作成"""
@@ -518,6 +4050,16 @@ class SimpleScriptReader:
                                      bg=self.bg_color, fg=self.text_fg_color)
         self.speed_value_label.pack(side=tk.LEFT, padx=5)
         
+        # 所要時間の計算ボタン（音声は合成せず、音声合成クエリだけを取得する）
+        self.analyze_btn = Button(speed_frame, text="所要時間", command=self.analyze_deck, 
+                                font=("Helvetica", 12), bg=self.btn_bg, fg="black")
+        self.analyze_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 所要時間の表示ラベル（速度を変えるとその場で更新する）
+        self.duration_label = Label(speed_frame, text="", font=("Helvetica", 12),
+                                  bg=self.bg_color, fg=self.text_fg_color)
+        self.duration_label.pack(side=tk.LEFT, padx=5)
+        
         # 音声エンジン選択用のフレーム
         engine_frame = Frame(self.root, bg=self.bg_color)
         engine_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -549,8 +4091,7 @@ class SimpleScriptReader:
                                 command=lambda: self.change_engine("voicevox"),
                                 font=("Helvetica", 12), 
                                 bg=self.accent_blue if self.use_voicevox else self.btn_bg, 
-                                fg="black",
-                                state=tk.NORMAL if REQUESTS_AVAILABLE else tk.DISABLED)
+                                fg="black")
         self.voicevox_btn.pack(side=tk.LEFT, padx=5)
         
         # VOICEVOX話者選択フレーム
@@ -564,9 +4105,10 @@ class SimpleScriptReader:
         
         # VOICEVOX話者選択ドロップダウン
         self.speaker_var = StringVar(self.root)
-        self.speaker_var.set(list(VOICEVOX_SPEAKERS.keys())[0])  # デフォルト値を設定
+        self.speaker_var.set(self._speaker_name(self.voicevox_speaker))  # デフォルト値を設定
+        self.voicevox_speaker = self.speakers[self.speaker_var.get()]
         
-        self.speaker_dropdown = OptionMenu(voice_frame, self.speaker_var, *VOICEVOX_SPEAKERS.keys())
+        self.speaker_dropdown = OptionMenu(voice_frame, self.speaker_var, *self.speakers.keys())
         self.speaker_dropdown.config(font=("Helvetica", 12), bg=self.btn_bg, fg="black")
         self.speaker_dropdown.pack(side=tk.LEFT, padx=5)
         
@@ -627,6 +4169,16 @@ class SimpleScriptReader:
                                      bg=self.accent_green, fg="black")
         self.start_voicevox_btn.pack(side=tk.LEFT, padx=5)
         
+        # 速度変更時の高音質モード（エンジンで合成し直す）チェックボックス
+        self.resynthesize_checkbox = Checkbutton(auto_frame, text="速度変更時に再合成する（高音質）", 
+                                             variable=self.resynthesize_on_speed_change,
+                                             font=("Helvetica", 12),
+                                             bg=self.bg_color, fg=self.text_fg_color,
+                                             selectcolor=self.bg_color,
+                                             activebackground=self.bg_color,
+                                             state=tk.NORMAL if NUMPY_AVAILABLE else tk.DISABLED)
+        self.resynthesize_checkbox.pack(side=tk.LEFT, padx=5)
+        
         # ステータスフレーム
         status_frame = Frame(self.root, bg=self.bg_color)
         status_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -649,7 +4201,6 @@ class SimpleScriptReader:
         
         # 音声再生のステータス
         self.is_speaking = False
-        self.speak_process = None
         
         # キーボードショートカット
         self.root.bind('<Left>', lambda event: self.prev_slide())
@@ -672,27 +4223,73 @@ class SimpleScriptReader:
         else:
             self.status_label.config(text="VOICEVOXの自動起動が無効になりました")
     
+    def _warm_up_speakers(self):
+        """選択中の話者と warm_speakers の話者のモデルをバックグラウンドで読み込む"""
+        speakers = [self.voicevox_speaker] + [s for s in self.warm_speakers if s != self.voicevox_speaker]
+        self.speaker_warmer.warm(speakers, self.voicevox_url)
+    
+    def _speaker_name(self, speaker_id):
+        """スタイルIDに対応する表示名を返す（一覧になければ先頭の話者）"""
+        for name, style_id in self.speakers.items():
+            if style_id == speaker_id:
+                return name
+        return next(iter(self.speakers))
+    
+    def _refresh_speaker_catalog(self):
+        """エンジンから話者一覧を取得し直す（結果は _apply_speaker_catalog で反映）"""
+        def on_done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                log_message(f"話者一覧を取得できませんでした: {error}", level="WARN", prefix="話者一覧")
+                return
+            try:
+                self.root.after(0, self._apply_speaker_catalog, OrderedDict(self.speaker_catalog.styles))
+            except Exception:
+                pass
+        
+        get_voicevox_loop().submit(self.speaker_catalog.refresh_async(self.voicevox_url)).add_done_callback(on_done)
+    
+    def _apply_speaker_catalog(self, styles):
+        """取得した話者一覧でドロップダウンを作り直す（メインスレッドで実行）"""
+        if not styles or styles == self.speakers:
+            return
+        self.speakers = styles
+        menu = self.speaker_dropdown["menu"]
+        menu.delete(0, "end")
+        for name in styles:
+            menu.add_command(label=name, command=tk._setit(self.speaker_var, name))
+        
+        # 選択中のスタイルIDは保つ（なくなっていれば先頭の話者に切り替わる）
+        name = self._speaker_name(self.voicevox_speaker)
+        if name != self.speaker_var.get():
+            self.speaker_var.set(name)
+    
     def change_speaker(self, *args):
         """VOICEVOXの話者を変更する"""
         selected_speaker = self.speaker_var.get()
-        self.voicevox_speaker = VOICEVOX_SPEAKERS[selected_speaker]
-        self.speaker_info_label.config(text=f"ID: {self.voicevox_speaker}")
+        speaker_id = self.speakers[selected_speaker]
+        self.speaker_info_label.config(text=f"ID: {speaker_id}")
+        if speaker_id == self.voicevox_speaker:
+            # 一覧の更新で表示名だけが変わった場合など
+            return
+        self.voicevox_speaker = speaker_id
         log_message(f"VOICEVOX話者を {selected_speaker} (ID: {self.voicevox_speaker}) に変更しました", 
                   level="INFO", prefix="VOICEVOX")
         
-        # 話者を変更した場合、現在のスライドの音声キャッシュをクリア
-        if self.current_slide in self.audio_cache:
-            try:
-                if os.path.exists(self.audio_cache[self.current_slide]):
-                    os.unlink(self.audio_cache[self.current_slide])
-                    log_message(f"話者変更により音声キャッシュを削除: {self.audio_cache[self.current_slide]}", 
-                             level="INFO", prefix="キャッシュ")
-            except Exception as e:
-                log_message(f"キャッシュ削除エラー: {e}", level="ERROR", prefix="キャッシュ")
-            
-            # キャッシュ情報をリセット
-            self.audio_cache.pop(self.current_slide, None)
-            self.is_loaded.pop(self.current_slide, None)
+        # 最初の読み込みまでにモデルを用意しておく
+        self.speaker_warmer.warm([self.voicevox_speaker], self.voicevox_url)
+        
+        # 読み上げ時間は話者によって変わるので求め直す
+        self._update_duration_label()
+        if self.deck_analysis_enabled:
+            self._start_deck_analysis()
+        
+        # 話者を変更した場合、先読み分を含めて音声キャッシュをクリア
+        if self.audio_cache or self.prefetcher.jobs:
+            self._invalidate_all_audio()
+            log_message("話者変更により音声キャッシュを削除しました", level="INFO", prefix="キャッシュ")
             
             # 音声の読み込みが必要であることを表示
             self.status_label.config(text="話者を変更しました。音声の再読み込みが必要です")
@@ -703,22 +4300,12 @@ class SimpleScriptReader:
         """現在のスライドを表示"""
         if not self.slides:
             return
-            
-        # テキストエリアを更新
-        self.text_area.config(state=tk.NORMAL)
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, self.slides[self.current_slide])
-        self.text_area.config(state=tk.DISABLED)
-        
-        # スライド番号を更新
-        self.slide_label.config(text=f"スライド: {self.current_slide + 1}/{len(self.slides)}")
         
-        # ボタンの有効/無効状態を更新
-        self.prev_btn.config(state=tk.NORMAL if self.current_slide > 0 else tk.DISABLED)
-        self.next_btn.config(state=tk.NORMAL if self.current_slide < len(self.slides) - 1 else tk.DISABLED)
+        self._render_slide_text()
         
-        # 古いキャッシュを整理
+        # 古いキャッシュを整理し、以降のスライドを先読み
         self._clean_other_caches()
+        self._schedule_lookahead()
         
         # 現在のスライドインデックス
         current_idx = self.current_slide
@@ -729,12 +4316,105 @@ class SimpleScriptReader:
             self.status_label.config(text="音声は読み込み済みです")
             log_message(f"スライド {current_idx+1}/{len(self.slides)} は既に読み込み済みです", 
                       level="INFO", prefix="音声読み込み")
+        elif self.prefetcher.is_pending(current_idx):
+            # 先読み中の場合は完了を待つ（完了時に _on_audio_ready がボタンを有効化する）
+            self.speak_btn.config(bg="#cccccc", fg="black", text="読み込み中...", state=tk.DISABLED)
+            self.status_label.config(text="音声を先読み中です...")
         else:
             # 音声が読み込まれていない場合は再生ボタンをグレーアウト
             self.speak_btn.config(bg="#cccccc", fg="black", text="音声未読込", state=tk.DISABLED)
             self.status_label.config(text="「音声読み込み」ボタンを押して音声を準備してください")
             log_message(f"スライド {current_idx+1}/{len(self.slides)} の音声は未読み込みです", 
                       level="INFO", prefix="音声読み込み")
+    
+    def _render_slide_text(self):
+        """現在のスライドのテキストとナビゲーションを表示する"""
+        # テキストエリアを更新
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(tk.END, self.slides[self.current_slide])
+        self.text_area.config(state=tk.DISABLED)
+        
+        # スライド番号を更新
+        self.slide_label.config(text=f"スライド: {self.current_slide + 1}/{len(self.slides)}")
+        
+        # ボタンの有効/無効状態を更新
+        self.prev_btn.config(state=tk.NORMAL if self.current_slide > 0 else tk.DISABLED)
+        self.next_btn.config(state=tk.NORMAL if self.current_slide < len(self.slides) - 1 else tk.DISABLED)
+        self._update_duration_label()
+    
+    def analyze_deck(self):
+        """台本全体の読み上げ時間を音声合成クエリから求める（「所要時間」ボタン）"""
+        if not self.use_voicevox:
+            self.status_label.config(text="所要時間の計算にはVOICEVOXを使用します")
+            return
+        self.deck_analysis_enabled = True
+        self._start_deck_analysis()
+    
+    def _start_deck_analysis(self):
+        """まだ求めていないスライドのクエリをバックグラウンドで取得する（結果は _apply_deck_analysis で反映）"""
+        if self.deck_analysis_running or not self.slides.file_path:
+            return
+        self.deck_analysis_running = True
+        self.status_label.config(text="所要時間を計算しています...")
+        slides = self.slides
+        speaker = self.voicevox_speaker
+        analyzer = DeckAnalyzer(speaker, voicevox_url=self.voicevox_url)
+        
+        def on_done(future):
+            results = None
+            if not future.cancelled():
+                error = future.exception()
+                if error is not None:
+                    log_message(f"所要時間を計算できませんでした: {error}", level="WARN", prefix="所要時間")
+                else:
+                    results = future.result()
+            try:
+                self.root.after(0, self._apply_deck_analysis, slides, speaker, results)
+            except Exception:
+                pass
+        
+        get_voicevox_loop().submit(analyzer.analyze_async(slides)).add_done_callback(on_done)
+    
+    def _apply_deck_analysis(self, slides, speaker, results):
+        """求めた読み上げ時間を反映する（メインスレッドで実行）"""
+        self.deck_analysis_running = False
+        if results is None:
+            self.status_label.config(text="所要時間を計算できませんでした")
+            return
+        for result in results:
+            if not result["error"]:
+                self.deck_durations[(result["content_hash"], speaker)] = result["base_sec"]
+        failed = sum(1 for result in results if result["error"])
+        self.status_label.config(text="所要時間を計算しました" + (f"（{failed}枚は取得失敗）" if failed else ""))
+        self._update_duration_label()
+        
+        # 計算中に台本や話者が変わっていれば、変わった分を求め直す
+        if slides is not self.slides or speaker != self.voicevox_speaker:
+            self._start_deck_analysis()
+    
+    def _update_duration_label(self):
+        """現在の読み上げ速度での所要時間を表示する（速度・スライドの変更時に呼ぶ）"""
+        if not self.deck_analysis_enabled or not self.slides.file_path:
+            self.duration_label.config(text="")
+            return
+        speed_scale = speech_rate_to_speed_scale(self.speech_rate)
+        durations = [self.deck_durations.get((content_hash, self.voicevox_speaker)) 
+                     for content_hash in self.slides.content_hashes]
+        known = [duration for duration in durations if duration is not None]
+        if not known:
+            self.duration_label.config(text="所要時間: 計算中...")
+            return
+        
+        total = format_duration(sum(known) / speed_scale)
+        if len(known) < len(durations):
+            total += f"（{len(known)}/{len(durations)}枚）"
+        current = durations[self.current_slide] if self.current_slide < len(durations) else None
+        elapsed = sum(duration for duration in durations[:self.current_slide] if duration is not None)
+        text = f"全体 {total}"
+        if current is not None:
+            text += f" / このスライド {format_duration(current / speed_scale)}（{format_duration(elapsed / speed_scale)}から）"
+        self.duration_label.config(text=text)
         
     def next_slide(self):
         """次のスライドへ移動"""
@@ -768,31 +4448,50 @@ class SimpleScriptReader:
             
         current_idx = self.current_slide
         
+        # 読み込み済みでなければ、キャッシュになければVOICEVOXで文単位に合成しながら再生する
+        if not self.is_loaded.get(current_idx) and self.use_voicevox and self.check_voicevox_available():
+            record = self.slides.record(current_idx)
+            settings = self._synthesis_settings()
+            cache_key = self._audio_cache_key(record, "voicevox", settings)
+            # エンジンのバージョンがまだ分からなければキャッシュは探さない（キーは再生スレッドで作る）
+            cached = self.memory_cache.get(cache_key) if cache_key else None
+            if not cached:
+                self._start_streaming_playback(current_idx, record, settings, cache_key)
+                return
+            # 再起動後やメモリから追い出された後でも、合成済みの音声はエンジンに問い合わせずに再生する
+            log_message("キャッシュの音声を使用します", level="SUCCESS", prefix=f"スライド{current_idx+1}")
+            self.prefetcher.cancel(current_idx)
+            self.is_loading[current_idx] = False
+            self.audio_cache[current_idx] = cached
+            self.is_loaded[current_idx] = True
+        
         # 読み込み中なら待つように促す
         if current_idx in self.is_loading and self.is_loading[current_idx]:
             self.status_label.config(text="音声読み込み中です。完了するまでお待ちください")
             return
             
         # キャッシュされた音声がある場合のみ再生
-        if current_idx in self.audio_cache and os.path.exists(self.audio_cache[current_idx]):
+        if current_idx in self.audio_cache and audio_source_exists(self.audio_cache[current_idx]):
             self.is_speaking = True
             self.speak_btn.config(text="⏸ 再生中...", state=tk.DISABLED)
             
-            # 音声ファイルを再生
+            # 音声ファイルを再生（終了は _on_cached_playback_done で受け取る）
             audio_file = self.audio_cache[current_idx]
             self.status_label.config(text="音声再生中...")
-            
-            # スレッドで再生
-            self.speak_thread = threading.Thread(target=self._play_cached_audio, args=(audio_file,))
-            self.speak_thread.daemon = True
-            self.speak_thread.start()
+            self._play_cached_audio(audio_file)
         else:
             # 読み込まれていない場合は読み込みを促す
             self.status_label.config(text="音声が読み込まれていません。「音声読み込み」ボタンを押してください")
             return
     
+    def _player_for(self, audio_file):
+        """ファイル形式に合った再生バックエンドを返す（メモリ上の音声はWAV）"""
+        if not isinstance(audio_file, str) or audio_file.lower().endswith('.wav'):
+            return self.player
+        return self.file_player
+    
     def _play_cached_audio(self, audio_file):
-        """キャッシュされた音声ファイルを再生する"""
+        """キャッシュされた音声（ファイルまたはメモリ上のWAVデータ）の再生を開始する"""
         try:
             # 現在のスライド情報を取得
             current_idx = self.current_slide
@@ -801,33 +4500,130 @@ class SimpleScriptReader:
             log_message(f"キャッシュ音声の再生を開始します ({slide_info})", 
                       level="INFO", prefix="音声再生")
             
-            # 再生プロセスを開始
-            self.speak_process = subprocess.Popen(['afplay', audio_file])
-            
-            # プロセスが終了するまで待機
-            while self.is_speaking and self.speak_process.poll() is None:
-                time.sleep(0.01)
+            sources = [audio_file] if isinstance(audio_file, str) else list(audio_file)
+            with tracer.span("playback_start", slide=current_idx, streaming=False):
+                self._player_for(audio_file).play(
+                    sources, 
+                    lambda completed, error: self.root.after(0, self._on_cached_playback_done, slide_info, completed, error))
+        except Exception as e:
+            log_message(f"キャッシュ音声再生エラー: {e}", level="ERROR", prefix="音声再生")
+            import traceback
+            traceback.print_exc()
+            self.is_speaking = False
+            self._reset_speak_button()
+    
+    def _on_cached_playback_done(self, slide_info, completed, error):
+        """キャッシュ音声の再生終了を受け取る（メインスレッドで実行）"""
+        if completed and self.is_speaking:
+            # 正常終了の場合（停止ボタンが押されなかった場合）
+            log_message(f"キャッシュ音声の再生が完了しました ({slide_info})", 
+                      level="SUCCESS", prefix="音声再生")
+            # 再生が終了したのでフラグをリセット
+            self.is_speaking = False
+            self.status_label.config(text=f"音声再生が完了しました ({slide_info})")
+        elif error:
+            log_message(f"キャッシュ音声再生エラー: {error}", level="ERROR", prefix="音声再生")
+            self.is_speaking = False
+            self.status_label.config(text=f"エラー: {error}")
+        else:
+            # 停止ボタンが押された場合
+            log_message(f"キャッシュ音声の再生が停止されました ({slide_info})", 
+                      level="INFO", prefix="音声再生")
+        self._reset_speak_button()
+    
+    def _start_streaming_playback(self, slide_idx, record, settings, cache_key):
+        """文単位の合成を始め、最初の文ができた時点で再生を開始する
+        
+        Args:
+            slide_idx (int): スライドインデックス
+            record (SlideRecord): スライドの前処理結果
+            settings (dict): _synthesis_settings で作成した合成設定
+            cache_key (str or None): 合成し終えた音声を登録するキャッシュのキー（Noneなら再生スレッドで作る）
+        """
+        chunks = split_sentences(record.lines)
+        if not chunks:
+            self.status_label.config(text="テキストが空です")
+            return
+        
+        # 同じスライドの先読みは不要になるので取り消す（結果は永続キャッシュに入る）
+        self.prefetcher.cancel(slide_idx)
+        self.is_loading[slide_idx] = True
+        self.prefetch_enabled = True
+        
+        self.is_speaking = True
+        self.speak_btn.config(text="⏸ 再生中...", state=tk.DISABLED)
+        self.status_label.config(text=f"音声を合成しながら再生中... ({len(chunks)}文)")
+        
+        self.speak_thread = threading.Thread(target=self._stream_slide_audio, 
+                                             args=(slide_idx, record, chunks, settings, cache_key, 
+                                                   self.prefetcher.generation))
+        self.speak_thread.daemon = True
+        self.speak_thread.start()
+    
+    def _stream_slide_audio(self, slide_idx, record, chunks, settings, cache_key, generation):
+        """文単位に合成しながら先頭の文から順に再生する（再生スレッドで実行）"""
+        content_hash = record.content_hash
+        slide_info = f"スライド {slide_idx+1}/{len(self.slides)}"
+        synthesis = ChunkedSynthesis(chunks, settings["speaker"], settings["speech_rate"], self.voicevox_url, 
+                                     settings["prosody"], slide_idx=slide_idx)
+        self.streaming_synthesis = synthesis
+        started = time.time()
+        trace_started = time.perf_counter()
+        audio_chunks = []
+        source = None
+        
+        def collect_audio():
+            # 合成できた文から順に再生バックエンドへ渡し、連結用にも保持する
+            for i, audio in enumerate(synthesis.iter_audio()):
+                if i == 0:
+                    tracer.record("playback_start", trace_started, time.perf_counter(), slide=slide_idx, streaming=True)
+                    log_message(f"最初の文の合成が完了しました ({time.time() - started:.2f}秒)", 
+                              level="INFO", prefix="音声再生")
+                audio_chunks.append(audio)
+                yield audio
+        
+        try:
+            completed = self.player.play_and_wait(collect_audio())
             
-            if self.is_speaking:
-                # 正常終了の場合（停止ボタンが押されなかった場合）
-                log_message(f"キャッシュ音声の再生が完了しました ({slide_info})", 
-                          level="SUCCESS", prefix="音声再生")
-                # 再生が終了したのでフラグをリセット
-                self.is_speaking = False
-                # ステータスラベルを更新
-                self.root.after(0, lambda: self.status_label.config(text=f"音声再生が完了しました ({slide_info})"))
+            if completed and len(audio_chunks) == len(chunks):
+                if cache_key is None:
+                    # 再生開始時にバージョンが未取得だった場合は、ここで取得してからキーを作る（再生スレッドなので待ってよい）
+                    get_voicevox_version(self.voicevox_url)
+                    cache_key = self._audio_cache_key(record, "voicevox", settings)
+                if cache_key:
+                    # 全文そろったら文ごとのWAVデータのままメモリ上のキャッシュに登録
+                    source = self.memory_cache.put(cache_key, audio_chunks)
+                    self.base_renderings[self._base_rendering_key(content_hash, settings)] = settings["speech_rate"]
+                else:
+                    source = tuple(audio_chunks)
+                log_message(f"合成しながらの再生が完了しました ({slide_info})", level="SUCCESS", prefix="音声再生")
+                if self.is_speaking:
+                    self.is_speaking = False
+                    self.root.after(0, lambda: self.status_label.config(text=f"音声再生が完了しました ({slide_info})"))
             else:
-                # 停止ボタンが押された場合
-                log_message(f"キャッシュ音声の再生が停止されました ({slide_info})", 
-                          level="INFO", prefix="音声再生")
-                
+                synthesis.cancel()
+                log_message(f"合成しながらの再生が停止されました ({slide_info})", level="INFO", prefix="音声再生")
         except Exception as e:
-            log_message(f"キャッシュ音声再生エラー: {e}", level="ERROR", prefix="音声再生")
+            synthesis.cancel()
+            log_message(f"合成しながらの再生でエラー: {e}", level="ERROR", prefix="音声再生")
             import traceback
             traceback.print_exc()
+            self.is_speaking = False
+            # except を抜けると e は削除されるので、メッセージは先に作っておく
+            error_message = f"エラー: {e}"
+            self.root.after(0, lambda: self.status_label.config(text=error_message))
         finally:
-            # UI更新
-            self.root.after(0, self._reset_speak_button)
+            self.root.after(0, self._on_streamed_audio, slide_idx, source, generation, content_hash)
+    
+    def _on_streamed_audio(self, slide_idx, source, generation, content_hash):
+        """合成しながらの再生が終わったときの処理（メインスレッドで実行）"""
+        self.is_loading[slide_idx] = False
+        # 再生中に台本が編集されてスライドの内容が変わっていれば対応づけない
+        same_slide = slide_idx < len(self.slides) and self.slides.content_hashes[slide_idx] == content_hash
+        if source and generation == self.prefetcher.generation and same_slide:
+            self.audio_cache[slide_idx] = source
+            self.is_loaded[slide_idx] = True
+        self._reset_speak_button()
     
     def start_audio_preload(self):
         """現在のスライドの音声読み込みを開始"""
@@ -874,191 +4670,256 @@ class SimpleScriptReader:
         log_message(f"使用エンジン: {engine_type}, 速度: {self.speech_rate}WPM", 
                   level="DEBUG", prefix="音声読み込み")
         
-        # UI更新を反映するために一度処理を譲る
-        self.root.update()
+        # 以降のスライド移動では先読みを行う
+        self.prefetch_enabled = True
+        
+        # ワーカーに合成を依頼（結果は _on_audio_ready で受け取る）
+        self.prefetcher.submit(current_idx, self.slides.record(current_idx), self._synthesis_settings(), 
+                               self._on_audio_ready, AudioPrefetcher.PRIORITY_CURRENT)
+        self._schedule_lookahead()
+    
+    def _synthesis_settings(self):
+        """ワーカースレッドに渡す合成設定のスナップショットを作成する（メインスレッドで呼ぶ）"""
+        return {
+            "engine": "voicevox" if self.use_voicevox else "gtts" if self.use_gtts else "say",
+            "speaker": self.voicevox_speaker,
+            "speech_rate": self.speech_rate,
+            "prosody": dict(self.prosody),
+            "auto_start": self.auto_start_voicevox.get() == 1,
+            "voicevox_path": self.voicevox_path.get() or None,
+            "resynthesize": self.resynthesize_on_speed_change.get() == 1,
+        }
+    
+    def _schedule_lookahead(self):
+        """現在のスライドから prefetch_depth 枚先までの合成をワーカーに依頼する"""
+        if not self.prefetch_enabled or not self.slides:
+            return
+        
+        settings = self._synthesis_settings()
+        last_idx = min(self.current_slide + self.prefetch_depth, len(self.slides) - 1)
+        for idx in range(self.current_slide, last_idx + 1):
+            if self.is_loaded.get(idx):
+                continue
+            # 登録済みのジョブは再利用され、表示中のスライドは優先度が引き上げられる
+            priority = AudioPrefetcher.PRIORITY_CURRENT if idx == self.current_slide else AudioPrefetcher.PRIORITY_LOOKAHEAD
+            if not self.prefetcher.is_pending(idx):
+                log_message(f"スライド {idx+1}/{len(self.slides)} の先読みを開始します", 
+                          level="DEBUG", prefix="先読み")
+            self.is_loading[idx] = True
+            self.prefetcher.submit(idx, self.slides.record(idx), settings, self._on_audio_ready, priority)
+        
+        if self.prefetch_all:
+            self._schedule_background()
+    
+    def _schedule_background(self):
+        """先読み範囲外のスライドも最低の優先度で合成しておく（結果は永続キャッシュに入る）"""
+        settings = self._synthesis_settings()
+        for idx in range(len(self.slides)):
+            if self.is_loaded.get(idx) or self.prefetcher.is_pending(idx):
+                continue
+            self.prefetcher.submit(idx, self.slides.record(idx), settings, self._on_audio_ready, 
+                                   AudioPrefetcher.PRIORITY_BACKGROUND)
+    
+    def _on_audio_ready(self, slide_idx, temp_file, error):
+        """ワーカーから合成結果を受け取る（メインスレッドで実行）"""
+        self.is_loading[slide_idx] = False
+        
+        # バックグラウンド合成の結果は永続キャッシュに入っているので、先読み範囲外なら対応づけない
+        in_window = self.current_slide - 1 <= slide_idx <= self.current_slide + self.prefetch_depth
+        if temp_file and in_window:
+            # 既存のキャッシュがあれば削除
+            self._drop_slide_audio(slide_idx)
+            
+            # キャッシュに保存
+            self.audio_cache[slide_idx] = temp_file
+            self.is_loaded[slide_idx] = True
+        
+        # 現在のスライドの結果だけをUIに反映する
+        if slide_idx == self.current_slide:
+            if temp_file:
+                self._update_load_status(True)
+            else:
+                self._update_load_status(False, error)
+    
+    def _audio_cache_key(self, record, engine, settings):
+        """永続キャッシュのキーを作成する
+        
+        メインスレッドからも呼ぶので、エンジンのバージョンは問い合わせずに
+        エンジンの準備ができたときに取得しておいた値を使う。
+        
+        Args:
+            record (SlideRecord): スライドの前処理結果（content_hash をキーに使う）
+            engine (str): 実際に使う音声エンジン (voicevox, gtts, say)
+            settings (dict): _synthesis_settings で作成した合成設定
+            
+        Returns:
+            str or None: キー（VOICEVOXのバージョンをまだ取得できていなければNone。そのときはキャッシュを使わない）
+        """
+        if engine == "voicevox":
+            version = cached_voicevox_version(self.voicevox_url)
+            if version is None:
+                return None
+            return AudioCache.make_key(record.content_hash, "voicevox", settings["speaker"],
+                                       speech_rate_to_speed_scale(settings["speech_rate"]),
+                                       version, settings["prosody"])
+        if engine == "gtts":
+            return AudioCache.make_key(record.content_hash, "gtts")
+        return AudioCache.make_key(record.content_hash, "say", speed_scale=settings["speech_rate"],
+                                   engine_version=platform.mac_ver()[0])
+    
+    def _base_rendering_key(self, content_hash, settings):
+        """速度だけが違うVOICEVOXの音声に共通のキー（伸縮の元にする音声を探すのに使う。バージョンが未取得ならNone）"""
+        version = cached_voicevox_version(self.voicevox_url)
+        if version is None:
+            return None
+        return AudioCache.make_key(content_hash, "voicevox", settings["speaker"], None, version, settings["prosody"])
+    
+    def _stretch_base_rendering(self, slide_idx, record, settings, cache_key):
+        """エンジンで合成済みの別の速度の音声を伸縮して、指定の速度の音声を作る（ワーカースレッドで実行）
+        
+        伸縮の元には同じセッションで最後にエンジンで合成した音声を使い、なければ標準速度（220WPM）の
+        永続キャッシュを探す。伸縮した音声は、エンジンで合成した音声とは別のキーでキャッシュする。
+        
+        Returns:
+            tuple or str or None: 音声ソース（元の音声がない・伸縮できない場合はNone）
+        """
+        slide_prefix = f"スライド{slide_idx+1}"
+        base_rate = self.base_renderings.get(self._base_rendering_key(record.content_hash, settings), 220)
+        base_scale = speech_rate_to_speed_scale(base_rate)
+        rate = speech_rate_to_speed_scale(settings["speech_rate"]) / base_scale
+        if abs(rate - 1.0) < 1e-4:
+            return None
+        
+        stretched_key = AudioCache.make_key(cache_key, "stretch", speed_scale=base_scale)
+        cached = self.memory_cache.get(stretched_key)
+        if cached:
+            log_message("キャッシュの伸縮済み音声を使用します", level="SUCCESS", prefix=slide_prefix)
+            return cached
+        base = self.memory_cache.get(self._audio_cache_key(record, "voicevox", dict(settings, speech_rate=base_rate)))
+        if not base:
+            return None
         
+        started = time.time()
         try:
-            # 音声読み込み処理をメインスレッドで実行 (UIブロックするが、スレッド競合を防ぐ)
-            self._load_audio_synchronous(current_idx)
+            with tracer.span("stretch", slide=slide_idx, rate=round(rate, 4)):
+                chunks = stretch_audio_source(base, rate)
         except Exception as e:
-            log_message(f"音声読み込みエラー: {e}", level="ERROR", prefix="音声読み込み")
-            import traceback
-            traceback.print_exc()
-            self.is_loading[current_idx] = False
-            self._update_load_status(False, f"エラー: {str(e)}")
+            log_message(f"音声の伸縮に失敗しました（エンジンで合成し直します）: {e}", level="WARN", prefix=slide_prefix)
+            return None
+        if not chunks:
+            return None
+        source = self.memory_cache.put(stretched_key, chunks)
+        log_message(f"{base_rate}WPMの音声を{rate:.2f}倍に伸縮しました ({time.time() - started:.2f}秒)", 
+                  level="SUCCESS", prefix=slide_prefix)
+        return source
     
-    def _load_audio_synchronous(self, slide_idx):
-        """同期的に音声を読み込む（スレッドを使わずにメインスレッドで実行）"""
-        # スライドのテキストを取得
-        text = self.slides[slide_idx]
+    def _render_slide_audio(self, slide_idx, record, settings, cancel_event):
+        """スライドの音声を生成する（ワーカースレッドで実行、Tkには触れない）
         
-        # テキスト処理
-        lines = self._process_text_for_speech(text)
-        combined_text = " ".join([l for l in lines if l.strip()])
+        Args:
+            slide_idx (int): スライドインデックス
+            record (SlideRecord): スライドの前処理結果
+            settings (dict): _synthesis_settings で作成した合成設定
+            cancel_event (threading.Event): 取り消し時にセットされるイベント
+            
+        Returns:
+            tuple: (音声ソース or None, エラーメッセージ or None)
+                音声ソースはファイルパス、またはメモリ上のWAVデータのタプル
+        """
+        # 前処理済みのテキスト
+        lines = record.lines
+        combined_text = record.speech_text
         
         # スライドIDのプレフィックス
-        slide_prefix = f"スライド{slide_idx+1}/{len(self.slides)}"
+        slide_prefix = f"スライド{slide_idx+1}"
         
         log_message(f"処理テキスト: {len(combined_text)}文字, {len(lines)}行", 
                   level="DEBUG", prefix=slide_prefix)
         
         if not combined_text:
             # テキストが空の場合は何もしない
-            self.is_loading[slide_idx] = False
             log_message("テキストが空のため読み込みをスキップします", level="WARN", prefix=slide_prefix)
-            self._update_load_status(False, "テキストが空です")
-            return
-            
-        # 選択した音声エンジンに応じて処理
-        # VOICEVOXの場合、必要に応じて起動
-        if self.use_voicevox:
-            if self.auto_start_voicevox.get() == 1 and not is_voicevox_engine_running():
-                log_message("VOICEVOXエンジンの自動起動を試みます", level="INFO", prefix=slide_prefix)
-                self.status_label.config(text="VOICEVOXエンジンを起動中...")
-                self.root.update()  # UI更新を反映
-                
-                if not start_voicevox_engine():
-                    self.is_loading[slide_idx] = False
-                    log_message("VOICEVOXエンジンの起動に失敗しました", level="ERROR", prefix=slide_prefix)
-                    self._update_load_status(False, "VOICEVOXエンジンを起動できません")
-                    return
-                else:
-                    log_message("VOICEVOXエンジンの起動に成功しました", level="SUCCESS", prefix=slide_prefix)
+            return None, "テキストが空です"
         
-        # 音声ファイル生成
-        temp_file = None
+        # VOICEVOXの場合、必要に応じて起動を待つ（起動自体は監視スレッドが行う）
+        use_voicevox = settings["engine"] == "voicevox"
+        if use_voicevox and settings["auto_start"] and not is_voicevox_engine_running(self.voicevox_url):
+            log_message("VOICEVOXエンジンの起動を待ちます", level="INFO", prefix=slide_prefix)
+            user_path = settings["voicevox_path"]
+            self.engine_supervisor.start(lambda: launch_voicevox_engine(user_path))
+            if not self.engine_supervisor.wait_until_ready(self.engine_supervisor.startup_timeout):
+                log_message("VOICEVOXエンジンの起動に失敗しました", level="ERROR", prefix=slide_prefix)
+                return None, "VOICEVOXエンジンを起動できません"
+            log_message("VOICEVOXエンジンの起動に成功しました", level="SUCCESS", prefix=slide_prefix)
+        
+        if cancel_event.is_set():
+            return None, None
+        
+        use_voicevox = use_voicevox and is_voicevox_engine_running()
+        if use_voicevox:
+            # キャッシュキーに使うバージョンをまだ取得できていなければここで取得しておく（ワーカースレッドなので待ってよい）
+            get_voicevox_version(self.voicevox_url)
+        use_gtts = settings["engine"] == "gtts" and GTTS_AVAILABLE
+        engine_type = "VOICEVOX" if use_voicevox else "Google TTS" if use_gtts else "macOS say"
+        
+        # 永続キャッシュを確認
+        cache_key = self._audio_cache_key(record, "voicevox" if use_voicevox else "gtts" if use_gtts else "say", settings)
+        # バージョンを取得できなかった場合（キーがNone）はキャッシュを使わずに合成する
+        cached = self.memory_cache.get(cache_key) if cache_key else None
+        if cached:
+            where = cached if isinstance(cached, str) else "メモリ"
+            log_message(f"キャッシュの音声を使用します: {where}", level="SUCCESS", prefix=slide_prefix)
+            return cached, None
         
         # ファイル生成開始ログ
-        engine_type = "VOICEVOX" if self.use_voicevox and is_voicevox_engine_running() else "Google TTS" if self.use_gtts and GTTS_AVAILABLE else "macOS say"
         log_message(f"{engine_type}で音声ファイル生成を開始します", level="INFO", prefix=slide_prefix)
         
-        # 状態更新
-        self.status_label.config(text=f"{engine_type}で音声を生成中...")
-        self.root.update()  # UI更新を反映
+        if use_voicevox and cache_key and not settings["resynthesize"]:
+            # 速度だけが違う音声があれば、エンジンに問い合わせずに伸縮して使う
+            source = self._stretch_base_rendering(slide_idx, record, settings, cache_key)
+            if source:
+                return source, None
         
-        if self.use_voicevox and is_voicevox_engine_running():
-            # VOICEVOXで音声ファイル生成
-            temp_file = self._generate_voicevox_audio(combined_text)
-        elif self.use_gtts and GTTS_AVAILABLE:
+        if use_voicevox:
+            # VOICEVOXで文単位に並列合成し、一時ファイルを作らずメモリ上に保持する
+            chunks = synthesize_voicevox_chunked(lines, settings["speaker"], settings["speech_rate"], 
+                                                 self.voicevox_url, settings["prosody"], cancel_event, slide_idx)
+            if cancel_event.is_set():
+                return None, None
+            if not chunks:
+                log_message("音声合成に失敗しました", level="ERROR", prefix=slide_prefix)
+                return None, "音声合成に失敗しました"
+            if cache_key:
+                source = self.memory_cache.put(cache_key, chunks)
+                self.base_renderings[self._base_rendering_key(record.content_hash, settings)] = settings["speech_rate"]
+            else:
+                source = tuple(chunks)
+            log_message(f"音声生成完了: {len(chunks)}文 ({audio_source_size(source) / 1024:.1f}KB)", 
+                      level="SUCCESS", prefix=slide_prefix)
+            return source, None
+        elif use_gtts:
             # Google TTSで音声ファイル生成
             temp_file = self._generate_gtts_audio(combined_text)
         else:
             # macOSのsayコマンドで音声ファイル生成
-            temp_file = self._generate_say_audio(combined_text)
+            temp_file = self._generate_say_audio(combined_text, settings["speech_rate"])
         
-        if temp_file:
-            # 既存のキャッシュがあれば削除
-            if slide_idx in self.audio_cache and os.path.exists(self.audio_cache[slide_idx]):
-                try:
-                    os.unlink(self.audio_cache[slide_idx])
-                    log_message(f"既存のキャッシュファイルを削除しました: {self.audio_cache[slide_idx]}", 
-                              level="DEBUG", prefix=slide_prefix)
-                except Exception as e:
-                    log_message(f"キャッシュファイル削除エラー: {e}", level="WARN", prefix=slide_prefix)
-            
-            # キャッシュに保存
-            self.audio_cache[slide_idx] = temp_file
-            self.is_loaded[slide_idx] = True
-            self.is_loading[slide_idx] = False
-            
-            file_size = os.path.getsize(temp_file) / 1024  # KB単位
-            log_message(f"音声ファイル生成完了: {temp_file} ({file_size:.1f}KB)", 
-                      level="SUCCESS", prefix=slide_prefix)
-            
-            # 成功ステータスを更新
-            self._update_load_status(True)
-        else:
-            self.is_loading[slide_idx] = False
+        if cancel_event.is_set():
+            # 取り消された場合は結果を捨てる（スライド移動で不要になった合成など）
+            if temp_file and os.path.exists(temp_file):
+                os.unlink(temp_file)
+            return None, None
+        
+        if not temp_file:
             log_message("音声ファイル生成に失敗しました", level="ERROR", prefix=slide_prefix)
-            self._update_load_status(False, "音声合成に失敗しました")
-
-    def _load_audio_thread(self, slide_idx, is_current=True):
-        """バックグラウンドで音声を読み込む（互換性のために残す）"""
-        try:
-            # スライドのテキストを取得
-            text = self.slides[slide_idx]
-            
-            # テキスト処理
-            lines = self._process_text_for_speech(text)
-            combined_text = " ".join([l for l in lines if l.strip()])
-            
-            # スライドIDのプレフィックス
-            slide_prefix = f"スライド{slide_idx+1}/{len(self.slides)}"
-            
-            log_message(f"処理テキスト: {len(combined_text)}文字, {len(lines)}行", 
-                      level="DEBUG", prefix=slide_prefix)
-            
-            if not combined_text:
-                # テキストが空の場合は何もしない
-                self.is_loading[slide_idx] = False
-                log_message("テキストが空のため読み込みをスキップします", level="WARN", prefix=slide_prefix)
-                if is_current:
-                    self.root.after(0, lambda: self._update_load_status(False, "テキストが空です"))
-                return
-                
-            # 選択した音声エンジンに応じて処理
-            # VOICEVOXの場合、必要に応じて起動
-            if self.use_voicevox:
-                if self.auto_start_voicevox.get() == 1 and not is_voicevox_engine_running():
-                    log_message("VOICEVOXエンジンの自動起動を試みます", level="INFO", prefix=slide_prefix)
-                    if not start_voicevox_engine():
-                        self.is_loading[slide_idx] = False
-                        log_message("VOICEVOXエンジンの起動に失敗しました", level="ERROR", prefix=slide_prefix)
-                        if is_current:
-                            self.root.after(0, lambda: self._update_load_status(False, "VOICEVOXエンジンを起動できません"))
-                        return
-                    else:
-                        log_message("VOICEVOXエンジンの起動に成功しました", level="SUCCESS", prefix=slide_prefix)
-            
-            # 音声ファイル生成
-            temp_file = None
-            
-            # ファイル生成開始ログ
-            engine_type = "VOICEVOX" if self.use_voicevox and is_voicevox_engine_running() else "Google TTS" if self.use_gtts and GTTS_AVAILABLE else "macOS say"
-            log_message(f"{engine_type}で音声ファイル生成を開始します", level="INFO", prefix=slide_prefix)
-            
-            if self.use_voicevox and is_voicevox_engine_running():
-                # VOICEVOXで音声ファイル生成
-                temp_file = self._generate_voicevox_audio(combined_text)
-            elif self.use_gtts and GTTS_AVAILABLE:
-                # Google TTSで音声ファイル生成
-                temp_file = self._generate_gtts_audio(combined_text)
-            else:
-                # macOSのsayコマンドで音声ファイル生成
-                temp_file = self._generate_say_audio(combined_text)
-            
-            if temp_file:
-                # キャッシュに保存
-                if slide_idx in self.audio_cache and os.path.exists(self.audio_cache[slide_idx]):
-                    try:
-                        os.unlink(self.audio_cache[slide_idx])
-                        log_message(f"既存のキャッシュファイルを削除しました: {self.audio_cache[slide_idx]}", 
-                                  level="DEBUG", prefix=slide_prefix)
-                    except Exception as e:
-                        log_message(f"キャッシュファイル削除エラー: {e}", level="WARN", prefix=slide_prefix)
-                
-                self.audio_cache[slide_idx] = temp_file
-                self.is_loaded[slide_idx] = True
-                self.is_loading[slide_idx] = False
-                
-                file_size = os.path.getsize(temp_file) / 1024  # KB単位
-                log_message(f"音声ファイル生成完了: {temp_file} ({file_size:.1f}KB)", 
-                          level="SUCCESS", prefix=slide_prefix)
-                
-                if is_current:
-                    self.root.after(0, lambda: self._update_load_status(True))
-            else:
-                self.is_loading[slide_idx] = False
-                log_message("音声ファイル生成に失敗しました", level="ERROR", prefix=slide_prefix)
-                if is_current:
-                    self.root.after(0, lambda: self._update_load_status(False, "音声合成に失敗しました"))
-        except Exception as e:
-            log_message(f"音声読み込みエラー: {e}", level="ERROR", prefix=f"スライド{slide_idx+1}")
-            import traceback
-            traceback.print_exc()  # スタックトレースを出力
-            self.is_loading[slide_idx] = False
-            if is_current:
-                self.root.after(0, lambda: self._update_load_status(False, f"エラー: {str(e)}"))
+            return None, "音声合成に失敗しました"
+        
+        # 永続キャッシュに登録
+        temp_file = self.persistent_cache.put(cache_key, temp_file)
+        file_size = os.path.getsize(temp_file) / 1024  # KB単位
+        log_message(f"音声ファイル生成完了: {temp_file} ({file_size:.1f}KB)", 
+                  level="SUCCESS", prefix=slide_prefix)
+        return temp_file, None
     
     def _update_load_status(self, success, message=None):
         """読み込み状態とステータスを更新する（同期的に実行）"""
@@ -1072,9 +4933,8 @@ class SimpleScriptReader:
                 
                 # 音声ファイルの情報を取得
                 file_info = ""
-                if current_idx in self.audio_cache and os.path.exists(self.audio_cache[current_idx]):
-                    file_path = self.audio_cache[current_idx]
-                    file_size = os.path.getsize(file_path) / 1024  # KB単位
+                if current_idx in self.audio_cache and audio_source_exists(self.audio_cache[current_idx]):
+                    file_size = audio_source_size(self.audio_cache[current_idx]) / 1024  # KB単位
                     file_info = f"({file_size:.1f}KB)"
                 
                 # ログメッセージを生成
@@ -1144,36 +5004,43 @@ class SimpleScriptReader:
     
     
     def _clean_other_caches(self):
-        """現在のスライド以外のキャッシュをすべて削除する"""
+        """先読み範囲（直前のスライドから prefetch_depth 枚先まで）以外のキャッシュ対応を解除する"""
         current_idx = self.current_slide
-        slides_to_clean = []
+        keep = set(range(current_idx - 1, current_idx + self.prefetch_depth + 1))
+        
+        # 範囲外の先読みジョブは取り消す
+        self.prefetcher.cancel_except(keep)
         
         # 削除対象のスライドを特定
-        for idx in list(self.audio_cache.keys()):
-            if idx != current_idx:
-                slides_to_clean.append(idx)
+        slides_to_clean = [idx for idx in list(self.audio_cache.keys()) if idx not in keep]
         
         # 削除処理
         for idx in slides_to_clean:
-            if idx in self.audio_cache and os.path.exists(self.audio_cache[idx]):
-                try:
-                    # ファイルを削除
-                    os.unlink(self.audio_cache[idx])
-                    log_message(f"スライド {idx+1} のキャッシュを削除しました", 
-                              level="INFO", prefix="キャッシュ整理")
-                except Exception as e:
-                    log_message(f"キャッシュ削除エラー: {e}", level="ERROR", prefix="キャッシュ整理")
-            
-            # キャッシュ情報をリセット
-            self.audio_cache.pop(idx, None)
-            self.is_loaded.pop(idx, None)
-            self.is_loading.pop(idx, None)
+            self._drop_slide_audio(idx)
+            log_message(f"スライド {idx+1} のキャッシュ対応を解除しました", 
+                      level="INFO", prefix="キャッシュ整理")
+        
+        for idx in list(self.is_loading.keys()):
+            if idx not in keep:
+                self.is_loading.pop(idx, None)
             
         # 削除したスライド数をログに出力
         if slides_to_clean:
             log_message(f"{len(slides_to_clean)}個のキャッシュを整理しました", 
                       level="INFO", prefix="キャッシュ整理")
     
+    def _drop_slide_audio(self, slide_idx):
+        """スライドと音声ファイルの対応を解除する（ファイル自体は永続キャッシュに残す）"""
+        self.audio_cache.pop(slide_idx, None)
+        self.is_loaded.pop(slide_idx, None)
+    
+    def _invalidate_all_audio(self):
+        """合成設定の変更時に、先読みジョブとスライドの音声対応をすべて破棄する"""
+        self.prefetcher.invalidate()
+        for idx in list(self.audio_cache.keys()):
+            self._drop_slide_audio(idx)
+        self.is_loading = {}
+    
     def _clear_progress_var_safe(self):
         """進捗表示を安全にクリアする（タイマーコールバック用）"""
         try:
@@ -1190,64 +5057,6 @@ class SimpleScriptReader:
             import traceback
             traceback.print_exc()  # スタックトレースを出力
     
-    def _generate_voicevox_audio(self, text):
-        """VOICEVOXを使用してテキストから音声ファイルを生成する"""
-        temp_file = None
-        try:
-            # 音声合成クエリ作成
-            log_message(f"VOICEVOX音声合成クエリを作成中 (文字数: {len(text)})", level="DEBUG", prefix="VOICEVOX")
-            query_response = requests.post(
-                f"{self.voicevox_url}/audio_query",
-                params={'text': text, 'speaker': self.voicevox_speaker}
-            )
-            
-            if query_response.status_code != 200:
-                log_message(f"VOICEVOX音声合成クエリエラー: {query_response.status_code}", level="ERROR", prefix="VOICEVOX")
-                return None
-                
-            query = query_response.json()
-            
-            # 速度を設定（speech_rateから適切な比率に変換）
-            # 標準速度（220WPM）との比率を計算
-            speed_ratio = self.speech_rate / 220.0
-            # 範囲を拡大（0.5～3.0）してより速い再生をサポート
-            speed_scale = max(0.5, min(3.0, speed_ratio))
-            query['speedScale'] = speed_scale
-            
-            log_message(f"VOICEVOX合成パラメータ: speedScale={speed_scale:.2f}, speaker={self.voicevox_speaker}", 
-                      level="DEBUG", prefix="VOICEVOX")
-            
-            # 音声合成実行
-            log_message(f"VOICEVOX音声合成を実行中", level="DEBUG", prefix="VOICEVOX")
-            synthesis_response = requests.post(
-                f"{self.voicevox_url}/synthesis",
-                params={'speaker': self.voicevox_speaker},
-                data=json.dumps(query)
-            )
-            
-            if synthesis_response.status_code != 200:
-                log_message(f"VOICEVOX音声合成実行エラー: {synthesis_response.status_code}", level="ERROR", prefix="VOICEVOX")
-                return None
-            
-            # 一時ファイルに保存
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
-                temp_file = fp.name
-                fp.write(synthesis_response.content)
-                log_message(f"VOICEVOXの一時ファイルを作成しました: {temp_file}", level="INFO", prefix="VOICEVOX")
-            
-            return temp_file
-        except Exception as e:
-            log_message(f"VOICEVOX音声ファイル生成エラー: {e}", level="ERROR", prefix="VOICEVOX")
-            import traceback
-            traceback.print_exc()
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.unlink(temp_file)
-                    log_message(f"エラーにより一時ファイルを削除しました: {temp_file}", level="DEBUG", prefix="VOICEVOX")
-                except:
-                    pass
-            return None
-    
     def _generate_gtts_audio(self, text):
         """Google TTSを使用してテキストから音声ファイルを生成する"""
         temp_file = None
@@ -1276,19 +5085,20 @@ class SimpleScriptReader:
                     pass
             return None
     
-    def _generate_say_audio(self, text):
+    def _generate_say_audio(self, text, speech_rate=None):
         """macOSのsayコマンドを使用してテキストから音声ファイルを生成する"""
+        speech_rate = self.speech_rate if speech_rate is None else speech_rate
         temp_file = None
         try:
             # 一時ファイルを作成
             with tempfile.NamedTemporaryFile(delete=False, suffix='.aiff') as fp:
                 temp_file = fp.name
             
-            log_message(f"macOS say音声合成を開始 (文字数: {len(text)}, 速度: {self.speech_rate}WPM)", 
+            log_message(f"macOS say音声合成を開始 (文字数: {len(text)}, 速度: {speech_rate}WPM)", 
                       level="DEBUG", prefix="macOS say")
             
             # sayコマンドで音声ファイルを生成
-            result = subprocess.run(['say', '-r', str(self.speech_rate), '-o', temp_file, text], 
+            result = subprocess.run(['say', '-r', str(speech_rate), '-o', temp_file, text], 
                                   check=True, capture_output=True, text=True)
             
             if result.returncode == 0:
@@ -1312,116 +5122,11 @@ class SimpleScriptReader:
     
     def _process_text_for_speech(self, text):
         """読み上げ用にテキストを処理する"""
-        # 改行ごとに区切って配列に格納
-        lines = []
-        
-        for line in text.split('\n'):
-            # 空行や空白行をスキップ
-            if not line.strip():
-                continue
-                
-            # Markdown記法を除去して読みやすくする
-            # 見出し記法を除去 (# ##, ###, etc.) - すべてのレベルの見出しに対応
-            clean_line = re.sub(r'^#+\s*', '', line)  # #で始まる行の#をすべて削除
-            
-            # 強調記法を除去 (**bold**, *italic*)
-            clean_line = re.sub(r'\*\*(.+?)\*\*', r'\1', clean_line)  # **bold** -> bold
-            clean_line = re.sub(r'\*(.+?)\*', r'\1', clean_line)        # *italic* -> italic
-            
-            # リスト記法を除去 (-, *, 1. etc.)
-            clean_line = re.sub(r'^\s*[-*+]\s+', '', clean_line)      # - item -> item
-            clean_line = re.sub(r'^\s*\d+\.\s+', '', clean_line)      # 1. item -> item
-            
-            # リンク記法を除去 [text](url)
-            clean_line = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', clean_line)  # [text](url) -> text
-            
-            # コードブロック記法を除去 (`code`)
-            clean_line = re.sub(r'`(.+?)`', r'\1', clean_line)          # `code` -> code
-            
-            # 水平線をスキップ (---)
-            if re.match(r'^-{3,}$|^\*{3,}$|^_{3,}$', clean_line):
-                continue
-                
-            # コメントを除去 <!-- comment -->
-            clean_line = re.sub(r'<!--.*?-->', '', clean_line)
-            
-            if clean_line.strip():
-                lines.append(clean_line.strip())
-        
-        return lines
+        return process_text_for_speech(text)
     
     def check_voicevox_available(self):
         """VOICEVOXエンジンが利用可能かチェック"""
-        if not REQUESTS_AVAILABLE:
-            return False
-            
-        try:
-            response = requests.get(f"{self.voicevox_url}/version", timeout=1)
-            return response.status_code == 200
-        except:
-            return False
-    
-    def speak_with_voicevox(self, text):
-        """VOICEVOXを使用してテキストを音声合成"""
-        temp_file = None
-        try:
-            # 音声合成クエリ作成
-            query_response = requests.post(
-                f"{self.voicevox_url}/audio_query",
-                params={'text': text, 'speaker': self.voicevox_speaker}
-            )
-            query = query_response.json()
-            
-            # 速度を設定（speech_rateから適切な比率に変換）
-            # 標準速度（220WPM）との比率を計算
-            speed_ratio = self.speech_rate / 220.0
-            # 範囲を拡大（0.5～3.0）してより速い再生をサポート
-            speed_scale = max(0.5, min(3.0, speed_ratio))
-            query['speedScale'] = speed_scale
-            print(f"VOICEVOX読み上げ速度: {self.speech_rate}WPM (speedScale: {speed_scale:.2f})")
-            
-            # 音声合成実行
-            synthesis_response = requests.post(
-                f"{self.voicevox_url}/synthesis",
-                params={'speaker': self.voicevox_speaker},
-                data=json.dumps(query)
-            )
-            
-            # 音声合成が停止された場合は処理を中断
-            if not self.is_speaking:
-                return False
-            
-            # 一時ファイルに保存して再生
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
-                temp_file = fp.name
-                fp.write(synthesis_response.content)
-                print(f"VOICEVOXの一時ファイルを作成しました: {temp_file}")
-            
-            # 再生プロセスを開始（wait()しない）
-            self.speak_process = subprocess.Popen(['afplay', temp_file])
-            
-            # プロセスが終了するまで定期的にチェック（より短い間隔でチェック）
-            while self.is_speaking and self.speak_process.poll() is None:
-                time.sleep(0.01)  # 10ミリ秒ごとにチェック（より高速に応答）
-            
-            # 再生が正常に完了したらファイルを削除
-            if temp_file and os.path.exists(temp_file) and self.is_speaking:
-                try:
-                    os.unlink(temp_file)
-                    print(f"VOICEVOXの一時ファイルを削除しました: {temp_file}")
-                except Exception as e:
-                    print(f"一時ファイル削除エラー: {e}")
-            
-            return True
-        except Exception as e:
-            print(f"VOICEVOX連携エラー: {e}")
-            # エラー時にも一時ファイルがあれば削除を試みる
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-            return False
+        return get_voicevox_client(self.voicevox_url).is_running()
     
     def change_engine(self, engine_type):
         """音声合成エンジンを切り替える"""
@@ -1465,140 +5170,59 @@ class SimpleScriptReader:
         self.status_label.config(text=f"音声エンジンを {engine_name} に切り替えました")
         log_message(f"音声エンジンを {engine_name} に切り替えました", level="INFO", prefix="エンジン変更")
         
-        # エンジンを変更した場合、現在のスライドの音声キャッシュをクリア
-        if self.current_slide in self.audio_cache:
-            try:
-                if os.path.exists(self.audio_cache[self.current_slide]):
-                    os.unlink(self.audio_cache[self.current_slide])
-                    log_message(f"エンジン変更により音声キャッシュを削除: {self.audio_cache[self.current_slide]}", 
-                              level="INFO", prefix="キャッシュ")
-            except Exception as e:
-                log_message(f"キャッシュ削除エラー: {e}", level="ERROR", prefix="キャッシュ")
-            
-            # キャッシュ情報をリセット
-            self.audio_cache.pop(self.current_slide, None)
-            self.is_loaded.pop(self.current_slide, None)
+        # エンジンを変更した場合、先読み分を含めて音声キャッシュをクリア
+        if self.audio_cache or self.prefetcher.jobs:
+            self._invalidate_all_audio()
+            log_message("エンジン変更により音声キャッシュを削除しました", level="INFO", prefix="キャッシュ")
             
             # 音声の読み込みが必要であることを表示
             self.status_label.config(text=f"音声エンジンを {engine_name} に切り替えました。音声の再読み込みが必要です")
             # 再生ボタンをグレーアウト
             self.speak_btn.config(bg="#cccccc", fg="black", text="音声未読込", state=tk.DISABLED)
         
-    def _speak_text(self, text):
-        """テキストを音声で読み上げるバックグラウンド処理"""
-        try:
-            # 読み上げ用にテキストを処理
-            lines = self._process_text_for_speech(text)
-            
-            if self.use_voicevox:
-                # VOICEVOXで読み上げ - 複数行をまとめて処理
-                selected_speaker = self.speaker_var.get()
-                print(f"VOICEVOXで音声再生を開始します（話者: {selected_speaker}）")
-                
-                # 複数行を結合（空行は除外）
-                combined_text = " ".join([l for l in lines if l.strip()])
-                
-                if combined_text and self.is_speaking:
-                    # まとめたテキストを一度に合成・再生
-                    success = self.speak_with_voicevox(combined_text)
-                    if not success:
-                        print("VOICEVOX処理に失敗しました")
-                
-                print("音声再生が完了しました（VOICEVOX）")
-            elif self.use_gtts and GTTS_AVAILABLE:
-                # Google TTSで読み上げ
-                print("Google TTSで音声再生を開始します")
-                for i, line in enumerate(lines):
-                    if not line:  # 空行はスキップ
-                        continue
-                        
-                    # Google TTSで音声合成
-                    tts = gTTS(text=line, lang='ja', slow=False)
-                    
-                    # 一時ファイルに保存
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                        temp_file = fp.name
-                    
-                    print(f"音声ファイルを生成中: {temp_file} (行 {i+1}/{len(lines)})")
-                    tts.save(temp_file)
-                    
-                    # 再生が停止されたか確認
-                    if not self.is_speaking:
-                        os.unlink(temp_file)
-                        break
-                    
-                    # macOSのafplayコマンドで再生（速度調整を適用）
-                    # afplayは直接速度を調整できないため、比率を計算して調整
-                    # 標準速度（220WPM）との比率を計算
-                    speed_ratio = self.speech_rate / 220.0
-                    if speed_ratio != 1.0:
-                        # macOSの場合、afplayに-rオプションで速度調整できる（0.5〜2.0の範囲）
-                        speed_arg = max(0.5, min(2.0, speed_ratio))  # 0.5〜2.0の範囲に制限
-                        self.speak_process = subprocess.Popen(['afplay', '-r', str(speed_arg), temp_file])
-                    else:
-                        self.speak_process = subprocess.Popen(['afplay', temp_file])
-                    self.speak_process.wait()
-                    
-                    # 一時ファイルを削除
-                    os.unlink(temp_file)
-                    
-                    # 改行ごとに間を挟む
-                    if i < len(lines) - 1 and self.is_speaking:
-                        # 読み上げが速いほど短いポーズに調整
-                        adjusted_pause = self.pause_time * (220 / self.speech_rate)
-                        time.sleep(adjusted_pause)
-            
-                print("音声再生が完了しました（Google TTS）")
-            else:
-                # macOSのsayコマンドを使用
-                print("macOSのsayコマンドで音声再生を開始します")
-                for i, line in enumerate(lines):
-                    if not line:  # 空行はスキップ
-                        continue
-                        
-                    # 再生が停止されたか確認
-                    if not self.is_speaking:
-                        break
-                    
-                    # テキストを読み上げ、速度を設定値に合わせる
-                    self.speak_process = subprocess.Popen(['say', '-r', str(self.speech_rate), line])
-                    self.speak_process.wait()
-                    
-                    # 改行ごとに間を挟む
-                    if i < len(lines) - 1 and self.is_speaking:
-                        # 読み上げが速いほど短いポーズに調整
-                        adjusted_pause = self.pause_time * (220 / self.speech_rate)
-                        time.sleep(adjusted_pause)
-        except Exception as e:
-            print(f"音声再生エラー: {e}")
-        finally:
-            # UI更新はメインスレッドで行う
-            self.root.after(0, self._reset_speak_button)
-    
     def update_speech_rate(self, value):
         """スライダーの値から読み上げ速度を更新する"""
         self.speech_rate = int(float(value))
         self.speed_value_label.config(text=f"{self.speech_rate} WPM")
+        self._update_duration_label()
         
-        # 読み上げ速度を変更した場合、現在のスライドの音声キャッシュをクリア
-        if self.current_slide in self.audio_cache:
-            try:
-                if os.path.exists(self.audio_cache[self.current_slide]):
-                    os.unlink(self.audio_cache[self.current_slide])
-                    log_message(f"速度変更により音声キャッシュを削除: {self.audio_cache[self.current_slide]}", 
-                              level="INFO", prefix="キャッシュ")
-            except Exception as e:
-                log_message(f"キャッシュ削除エラー: {e}", level="ERROR", prefix="キャッシュ")
+        # 読み上げ速度を変更した場合、先読み分を含めて音声キャッシュをクリア
+        if self.audio_cache or self.prefetcher.jobs:
+            # 読み込み済み・読み込み中だったスライド
+            loaded = [idx for idx in self.audio_cache if self.is_loaded.get(idx)]
+            loaded += [idx for idx, loading in self.is_loading.items() if loading]
+            self._invalidate_all_audio()
             
-            # キャッシュ情報をリセット
-            self.audio_cache.pop(self.current_slide, None)
-            self.is_loaded.pop(self.current_slide, None)
+            if self.use_voicevox and self.resynthesize_on_speed_change.get() == 0:
+                # 読み込み済みだったスライドは合成済みの音声を伸縮して作り直す（スライダー操作中はまとめて1回）
+                self.speed_reload_slides = sorted(set(loaded) | set(self.speed_reload_slides))
+                if self.speed_reload_timer:
+                    self.root.after_cancel(self.speed_reload_timer)
+                self.speed_reload_timer = self.root.after(150, self._reload_after_speed_change)
+                self.status_label.config(text=f"速度を {self.speech_rate} WPM に変更しました。音声を調整しています...")
+                self.speak_btn.config(bg="#cccccc", fg="black", text="音声調整中", state=tk.DISABLED)
+                return
+            
+            log_message("速度変更により音声を再合成します（音声合成クエリはキャッシュを再利用）", level="INFO", prefix="キャッシュ")
             
             # 音声の読み込みが必要であることを表示
             self.status_label.config(text=f"速度を {self.speech_rate} WPM に変更しました。音声の再読み込みが必要です")
             # 再生ボタンをグレーアウト
             self.speak_btn.config(bg="#cccccc", fg="black", text="音声未読込", state=tk.DISABLED)
     
+    def _reload_after_speed_change(self):
+        """速度変更前に読み込み済みだったスライドの音声を新しい速度で作り直す"""
+        self.speed_reload_timer = None
+        slides, self.speed_reload_slides = self.speed_reload_slides, []
+        settings = self._synthesis_settings()
+        log_message(f"{len(slides)}枚の音声を {self.speech_rate} WPM に調整します", level="INFO", prefix="キャッシュ")
+        for idx in slides:
+            if idx >= len(self.slides):
+                continue
+            priority = AudioPrefetcher.PRIORITY_CURRENT if idx == self.current_slide else AudioPrefetcher.PRIORITY_LOOKAHEAD
+            self.is_loading[idx] = True
+            self.prefetcher.submit(idx, self.slides.record(idx), settings, self._on_audio_ready, priority)
+    
     def increase_speed(self):
         """読み上げ速度を上げる（上矢印キー用）"""
         new_value = min(self.speech_rate + 10, self.max_rate)
@@ -1629,20 +5253,17 @@ class SimpleScriptReader:
                 # 先にフラグを停止に設定
                 self.is_speaking = False
                 
-                # プロセスが存在する場合は強制終了
-                if self.speak_process:
-                    self.speak_process.terminate()
-                    # プロセス参照をクリア
-                    self.speak_process = None
+                # 再生バックエンドを停止
+                self.player.stop()
+                self.file_player.stop()
                 
                 # UIを更新
                 self.root.after(0, self._reset_speak_button)
                 self.status_label.config(text="再生を停止しました")
                 
-                # 読み込み中のスレッドがあれば停止
-                for idx in list(self.is_loading.keys()):
-                    if self.is_loading[idx]:
-                        self.is_loading[idx] = False
+                # 合成しながら再生していた場合は残りの文の合成も取り消す
+                if self.streaming_synthesis:
+                    self.streaming_synthesis.cancel()
                 
             except Exception as e:
                 print(f"音声停止エラー: {e}")
@@ -1659,14 +5280,8 @@ class SimpleScriptReader:
             # 現在再生中なら停止
             self.stop_speaking()
             
-            # キャッシュをクリア
-            for cache_file in self.audio_cache.values():
-                if os.path.exists(cache_file):
-                    try:
-                        os.unlink(cache_file)
-                    except:
-                        pass
-            
+            # 先読みジョブを無効化してスライドとの対応をクリア（音声は永続キャッシュに残す）
+            self.prefetcher.invalidate()
             self.audio_cache = {}
             self.is_loaded = {}
             self.is_loading = {}
@@ -1674,38 +5289,123 @@ class SimpleScriptReader:
             # 新しいファイルを読み込み
             self.load_file(file_path)
 
-    def get_voicevox_speakers(self):
-        """VOICEVOXから利用可能な話者リストを取得する"""
-        try:
-            if self.check_voicevox_available():
-                response = requests.get(f"{self.voicevox_url}/speakers")
-                if response.status_code == 200:
-                    return response.json()
-            return []
-        except:
-            return []
-    
     def on_closing(self):
         """アプリケーション終了時の処理"""
-        # 音声再生を停止
+        # 音声再生と先読みを停止
         self.stop_speaking()
+        self.player.stop()
+        self.precompute_stop.set()
+        if self.file_watcher:
+            self.file_watcher.stop()
+        self.prefetcher.shutdown()
         
-        # 音声キャッシュの削除
-        for cache_file in self.audio_cache.values():
-            if os.path.exists(cache_file):
-                try:
-                    os.unlink(cache_file)
-                except Exception:
-                    pass
+        # メモリ上の音声を永続キャッシュへ移し、インデックスを保存（ファイルは次回起動時に再利用）
+        self.memory_cache.flush()
+        self.persistent_cache.save()
+        get_query_cache().save()
+        self._save_config()
         
         # VOICEVOXエンジンを終了（自動起動した場合のみ）
+        self.engine_supervisor.stop()
         if voicevox_process:
             stop_voicevox_engine()
         
         # アプリケーションを終了
         self.root.destroy()
 
-if __name__ == "__main__":
+def main(argv=None):
+    """コマンドラインの入口（引数なしならGUIを起動）"""
+    parser = argparse.ArgumentParser(description="マークダウン台本をVOICEVOXで読み上げる")
+    parser.add_argument("script", nargs="?", help="台本ファイル（マークダウン）")
+    parser.add_argument("--render", metavar="OUT_DIR", help="GUIを使わず全スライドの音声をOUT_DIRに書き出す")
+    parser.add_argument("--export", metavar="FILE.wav", 
+                        help="全スライドを1本のWAVにまとめ、チャプター情報（.chapters.json / .cue）も書き出す")
+    parser.add_argument("--analyze", action="store_true", 
+                        help="音声を合成せずに、スライドごとと全体の読み上げ時間を --rate の速度で表示する")
+    parser.add_argument("--gap", type=float, default=1.0, help="--export でスライド間に入れる無音の秒数（既定: 1.0）")
+    parser.add_argument("--workers", type=int, default=4, help="並列に合成するスライド数（既定: 4）")
+    parser.add_argument("--speaker", type=int, default=1, help="VOICEVOX話者ID（既定: 1）")
+    parser.add_argument("--rate", type=int, default=220, help="読み上げ速度WPM（既定: 220）")
+    parser.add_argument("--voicevox-url", default=VOICEVOX_URL, 
+                        help=f"VOICEVOXエンジンのURL。カンマ区切りで複数指定すると振り分けて合成（既定: {VOICEVOX_URL}）")
+    parser.add_argument("--engines", type=int, default=1, 
+                        help="--render 時に起動して使うVOICEVOXエンジンの数（--voicevox-url のポートから順に使用）")
+    parser.add_argument("--cpu-threads", type=int, default=None, 
+                        help="起動する各エンジンの --cpu_num_threads（既定: CPUコア数 / エンジン数）")
+    parser.add_argument("--no-cache", action="store_true", help="永続音声キャッシュを使わない")
+    parser.add_argument("--pitch", type=float, default=DEFAULT_PROSODY["pitchScale"], help="音高（pitchScale、既定: 0.0）")
+    parser.add_argument("--intonation", type=float, default=DEFAULT_PROSODY["intonationScale"], 
+                        help="抑揚（intonationScale、既定: 1.0）")
+    parser.add_argument("--batch-size", type=int, default=1, 
+                        help="2以上ならこの枚数ごとに /multi_synthesis でまとめて合成する（既定: 1）")
+    parser.add_argument("--prefetch-all", action="store_true", 
+                        help="先読み範囲外のスライドも空き時間に合成しておく")
+    parser.add_argument("--playback", default="auto", 
+                        help="再生バックエンド: auto, sounddevice, afplay, null, file:<パス>（既定: auto）")
+    parser.add_argument("--warm-speakers", default="", 
+                        help="起動時にモデルを読み込んでおく話者IDのカンマ区切り（選択中の話者は常に読み込む）")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARN", "ERROR"], 
+                        help="表示するログの最低レベル（既定: INFO）")
+    parser.add_argument("--trace", metavar="FILE", 
+                        help="処理段階ごとの所要時間を終了時に書き出す（.jsonl なら JSON Lines、それ以外は Chrome のトレース形式）")
+    parser.add_argument("--memory-cache-mb", type=int, default=MEMORY_AUDIO_CACHE_MAX_BYTES // (1024 * 1024), 
+                        help="合成済み音声をメモリ上に保持する上限MB。超えた分だけ永続キャッシュへ書き出す"
+                             f"（0なら常にファイル、既定: {MEMORY_AUDIO_CACHE_MAX_BYTES // (1024 * 1024)}）")
+    args = parser.parse_args(argv)
+    
+    set_log_level(args.log_level)
+    if args.trace:
+        tracer.enable()
+        atexit.register(tracer.save, args.trace)
+    
+    if args.render or args.export or args.analyze:
+        if not args.script:
+            parser.error("--render / --export / --analyze には台本ファイルの指定が必要です")
+        urls = [url for url in args.voicevox_url.split(',') if url]
+        engine = urls[0]
+        if args.engines > 1 and not args.analyze:
+            # --voicevox-url のポートから順に使う
+            port = urls[0].rstrip('/').rsplit(':', 1)[-1]
+            base_port = int(port) if port.isdigit() else 50021
+            engine = EnginePool.launch(args.engines, base_port, args.cpu_threads)
+        elif len(urls) > 1:
+            engine = EnginePool(urls)
+        if engine is None or not is_voicevox_engine_running(engine):
+            log_message(f"VOICEVOXエンジンに接続できません: {args.voicevox_url}", level="ERROR", prefix="バッチ")
+            return 1
+        
+        if args.analyze:
+            # クエリの取得だけなので、書き出しより多めに並行させる
+            results = DeckAnalyzer(args.speaker, args.workers * 2, engine).analyze(parse_slides(args.script))
+            print_deck_analysis(results, args.rate)
+            return 1 if any(result["error"] for result in results) else 0
+        
+        cache = None if args.no_cache else AudioCache()
+        prosody = {"pitchScale": args.pitch, "intonationScale": args.intonation}
+        renderer = BatchRenderer(args.speaker, args.rate, args.workers, engine, cache, args.batch_size, prosody)
+        # --export だけの場合はスライドごとのWAVを一時ディレクトリに書き出す
+        out_dir = args.render or tempfile.mkdtemp(prefix="script_reader_")
+        try:
+            manifest = renderer.render(args.script, out_dir)
+            if args.export:
+                export_presentation(manifest, out_dir, args.export, args.gap)
+        finally:
+            if not args.render:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        return 1 if any(slide["error"] for slide in manifest["slides"]) else 0
+    
+    if not TK_AVAILABLE:
+        log_message("tkinterが見つからないためGUIを起動できません（--render を使用してください）", 
+                  level="ERROR", prefix="起動")
+        return 1
+    
     root = tk.Tk()
-    app = SimpleScriptReader(root)
-    root.mainloop()
\ No newline at end of file
+    # --warm-speakers を指定しなければ前回保存した設定を使う
+    warm_speakers = [int(speaker) for speaker in args.warm_speakers.split(',') if speaker.strip()] or None
+    app = SimpleScriptReader(root, args.script, args.playback, args.prefetch_all, args.memory_cache_mb * 1024 * 1024, 
+                             warm_speakers)
+    root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# script_reader.py と benchmark.py はリポジトリ直下のモジュールなのでパスに追加する
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+import os
+
+from script_reader import AudioCache
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    cache.put_bytes("a", b"a" * 100, ".wav")
+    cache.put_bytes("b", b"b" * 100, ".wav")
+    # a を使ったので、上限を超えたときに消えるのは b
+    assert cache.get("a")
+    cache.put_bytes("c", b"c" * 100, ".wav")
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert not os.path.exists(tmp_path / "b.wav")
+    assert cache.total_bytes == 200
+
+
+def test_entry_larger_than_limit_is_kept(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=150)
+    cache.put_bytes("a", b"a" * 100, ".wav")
+    cache.put_bytes("big", b"x" * 200, ".wav")
+
+    assert list(cache.entries) == ["big"]
+    assert cache.get("big") == str(tmp_path / "big.wav")
+
+
+def test_index_survives_reopen_and_is_evicted_to_new_limit(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    for key in ("a", "b", "c"):
+        cache.put_bytes(key, key.encode() * 100, ".wav")
+    cache.get("a")
+    cache.save()
+
+    reopened = AudioCache(str(tmp_path), max_bytes=250)
+    assert list(reopened.entries) == ["c", "a"]
+    assert reopened.total_bytes == 200
+
+
+def test_missing_file_is_dropped(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    cache.put_bytes("a", b"a" * 100, ".wav")
+    os.unlink(tmp_path / "a.wav")
+
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.total_bytes == 0
+
+
+def test_index_is_written_in_batches(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path), max_bytes=10 ** 6)
+    writes = []
+    save_index = cache._save_index_locked
+    monkeypatch.setattr(cache, "_save_index_locked", lambda: (writes.append(1), save_index()))
+
+    for i in range(100):
+        cache.put_bytes(f"key{i}", b"x" * 10, ".json")
+    assert len(writes) == 100 // AudioCache.INDEX_SAVE_EVERY
+
+    cache.save()
+    assert len(writes) == 100 // AudioCache.INDEX_SAVE_EVERY + 1
+    assert len(AudioCache(str(tmp_path)).entries) == 100
+
+
+def test_files_missing_from_index_are_adopted(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    cache.put_bytes("a", b"a" * 100, ".wav")
+    cache.put_bytes("b", b"b" * 100, ".wav")
+    # save() せずに終了した場合
+    os.utime(tmp_path / "a.wav", (1, 1))
+
+    reopened = AudioCache(str(tmp_path), max_bytes=150)
+    assert list(reopened.entries) == ["b"]
+    assert not os.path.exists(tmp_path / "a.wav")
@@ -0,0 +1,91 @@
+import pytest
+
+import benchmark
+from script_reader import DeckAnalyzer, audio_query_duration, format_duration
+
+
+def mora(consonant_length, vowel_length):
+    return {"text": "ア", "consonant_length": consonant_length, "vowel_length": vowel_length}
+
+
+def pause(length):
+    return {"text": "、", "consonant": None, "consonant_length": None, "vowel": "pau", "vowel_length": length}
+
+
+def make_query(**overrides):
+    query = {
+        "accent_phrases": [
+            {"moras": [mora(0.05, 0.1), mora(None, 0.15)], "pause_mora": pause(0.3)},
+            {"moras": [mora(0.04, 0.11)], "pause_mora": None},
+        ],
+        "speedScale": 1.0,
+        "prePhonemeLength": 0.1,
+        "postPhonemeLength": 0.2,
+    }
+    query.update(overrides)
+    return query
+
+
+# 子音・母音の長さ 0.45秒 + 句読点の無音 0.3秒 + 前後の無音 0.3秒
+BASE_SEC = 0.45 + 0.3 + 0.3
+
+
+def test_total_of_moras_pauses_and_silence():
+    assert audio_query_duration(make_query()) == pytest.approx(BASE_SEC)
+
+
+@pytest.mark.parametrize("speed_scale", [0.5, 1.0, 1.25, 2.0, 3.0])
+def test_speed_scale_divides_every_length(speed_scale):
+    assert audio_query_duration(make_query(), speed_scale) == pytest.approx(BASE_SEC / speed_scale)
+    # 省略時はクエリの speedScale を使う
+    assert audio_query_duration(make_query(speedScale=speed_scale)) == pytest.approx(BASE_SEC / speed_scale)
+
+
+def test_argument_overrides_query_speed_scale():
+    assert audio_query_duration(make_query(speedScale=2.0), 1.0) == pytest.approx(BASE_SEC)
+
+
+def test_pause_length_scale():
+    assert audio_query_duration(make_query(pauseLengthScale=2.0)) == pytest.approx(BASE_SEC + 0.3)
+    assert audio_query_duration(make_query(pauseLengthScale=0.0)) == pytest.approx(BASE_SEC - 0.3)
+
+
+def test_pause_length_replaces_pause_moras():
+    query = make_query(pauseLength=0.5)
+    query["accent_phrases"][1]["pause_mora"] = pause(0.2)
+
+    # 無音の長さを指定すると、句読点ごとの無音はすべてその長さになり、倍率はその後にかかる
+    assert audio_query_duration(query) == pytest.approx(BASE_SEC - 0.3 + 0.5 * 2)
+    assert audio_query_duration(dict(query, pauseLengthScale=0.5)) == pytest.approx(BASE_SEC - 0.3 + 0.5)
+    assert audio_query_duration(dict(query, pauseLengthScale=0.5), 2.0) == pytest.approx((BASE_SEC - 0.3 + 0.5) / 2)
+
+
+def test_query_without_optional_fields():
+    # 無音の長さの指定がない古いエンジンのクエリ
+    query = {"accent_phrases": [{"moras": [mora(None, 0.2)]}], "prePhonemeLength": 0.1, "postPhonemeLength": 0.1}
+
+    assert audio_query_duration(query) == pytest.approx(0.4)
+    assert audio_query_duration({}) == 0.0
+
+
+def test_fake_engine_query():
+    query = benchmark.fake_audio_query("あいう")
+
+    assert audio_query_duration(query) == pytest.approx(0.2 + 3 * 0.12)
+
+
+def test_durations_at_speech_rate():
+    results = [{"base_sec": 10.0}, {"base_sec": 4.4}]
+
+    assert DeckAnalyzer.durations_at(results, 220) == pytest.approx([10.0, 4.4])
+    assert DeckAnalyzer.durations_at(results, 440) == pytest.approx([5.0, 2.2])
+    # speedScale は 0.5〜3.0 に制限される
+    assert DeckAnalyzer.durations_at(results, 50) == pytest.approx([20.0, 8.8])
+    assert DeckAnalyzer.durations_at(results, 1000) == pytest.approx([10.0 / 3, 4.4 / 3])
+
+
+def test_format_duration():
+    assert format_duration(0) == "0:00"
+    assert format_duration(59.6) == "1:00"
+    assert format_duration(754) == "12:34"
+    assert format_duration(3600 + 61) == "1:01:01"
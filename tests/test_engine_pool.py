@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import benchmark
+import script_reader
+from script_reader import AsyncVoicevoxClient, EnginePool, run_voicevox_async
+
+
+@pytest.fixture
+def servers():
+    with benchmark.FakeVoicevoxServer(latency=0.0, payload_kb=4) as first:
+        with benchmark.FakeVoicevoxServer(latency=0.0, payload_kb=4) as second:
+            yield first, second
+
+
+def dead_url():
+    """接続を受け付けないURL（一度起動して止めたサーバーのポート）"""
+    with benchmark.FakeVoicevoxServer() as fake:
+        return fake.url
+
+
+async def audio_query(text, url):
+    # 再試行の待ち時間でテストが遅くならないよう、再試行なしのクライアントを使う
+    client = AsyncVoicevoxClient(url, retries=0)
+    try:
+        return await client.audio_query(text, 1)
+    finally:
+        await client.close()
+
+
+def test_requests_are_spread_across_engines(servers):
+    first, second = servers
+    pool = EnginePool([first.url, second.url], per_engine_concurrency=1)
+
+    async def run_all():
+        return await asyncio.gather(*(pool.run_async(audio_query, f"文{i}") for i in range(8)))
+
+    results = run_voicevox_async(run_all())
+    assert [query["kana"] for query in results] == [f"文{i}" for i in range(8)]
+    assert first.take_stats()["audio_query"] > 0
+    assert second.take_stats()["audio_query"] > 0
+    assert pool.in_flight == {first.url: 0, second.url: 0}
+
+
+def test_failed_engine_is_skipped(servers):
+    first, _ = servers
+    down = dead_url()
+    pool = EnginePool([down, first.url], per_engine_concurrency=1, retry_after=60)
+
+    async def run_all():
+        return [await pool.run_async(audio_query, f"文{i}") for i in range(3)]
+
+    assert len(run_voicevox_async(run_all())) == 3
+    assert first.take_stats() == {"audio_query": 3}
+    assert pool.unhealthy_until[down] > 0
+    assert pool.in_flight == {down: 0, first.url: 0}
+
+
+def test_all_engines_unhealthy_are_probed_again(servers):
+    first, _ = servers
+    pool = EnginePool([first.url], retry_after=60)
+    pool.unhealthy_until[first.url] = float("inf")
+
+    assert run_voicevox_async(pool.run_async(audio_query, "復帰"))["kana"] == "復帰"
+    assert pool.unhealthy_until[first.url] == 0.0
+
+
+def test_no_engine_responds():
+    pool = EnginePool([dead_url()], retry_after=60)
+
+    with pytest.raises(script_reader.VoicevoxConnectionError):
+        run_voicevox_async(pool.run_async(audio_query, "失敗"))
+    with pytest.raises(ConnectionError):
+        run_voicevox_async(pool.run_async(audio_query, "失敗"))
+
+
+def test_cancelled_tasks_release_their_slots(servers):
+    first, _ = servers
+    first.latency = 0.3
+    pool = EnginePool([first.url], per_engine_concurrency=1)
+
+    async def cancel_running_and_waiting():
+        running = asyncio.ensure_future(pool.run_async(audio_query, "実行中"))
+        waiting = asyncio.ensure_future(pool.run_async(audio_query, "待機中"))
+        await asyncio.sleep(0.05)
+        assert pool.in_flight[first.url] == 1
+        waiting.cancel()
+        running.cancel()
+        await asyncio.gather(running, waiting, return_exceptions=True)
+        slots = dict(pool.in_flight)
+        # 取り消した後も枠が残っていて、次のリクエストを実行できる
+        first.latency = 0.0
+        query = await asyncio.wait_for(pool.run_async(audio_query, "次"), 2.0)
+        return slots, query
+
+    slots, query = run_voicevox_async(cancel_running_and_waiting())
+    assert slots == {first.url: 0}
+    assert query["kana"] == "次"
+    assert pool.in_flight == {first.url: 0}
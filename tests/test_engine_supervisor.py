@@ -0,0 +1,174 @@
+import threading
+import time
+
+import pytest
+
+import benchmark
+import script_reader
+from script_reader import EngineSupervisor
+
+
+class FakeEngineProcess:
+    """起動したエンジンのプロセスの代わり（poll() が None の間だけ偽のサーバーが応答する）"""
+    def __init__(self, port, start_delay=0.0):
+        self.port = port
+        self.returncode = None
+        self.server = None
+        self.timer = threading.Timer(start_delay, self._start)
+        self.timer.start()
+
+    def _start(self):
+        if self.returncode is None:
+            self.server = benchmark.FakeVoicevoxServer(port=self.port).__enter__()
+
+    def poll(self):
+        return self.returncode
+
+    def crash(self, returncode=1):
+        # 実際のプロセスと同じく、終了コードが見えるのはポートが閉じた後
+        self.timer.cancel()
+        if self.server:
+            self.server.__exit__(None, None, None)
+        self.returncode = returncode
+
+
+class FakeLauncher:
+    """EngineSupervisor に渡す起動関数（起動したプロセスを記録する）"""
+    def __init__(self, port, start_delay=0.0):
+        self.port = port
+        self.start_delay = start_delay
+        self.processes = []
+
+    def __call__(self):
+        process = FakeEngineProcess(self.port, self.start_delay)
+        self.processes.append(process)
+        return process
+
+    def crash_all(self):
+        for process in self.processes:
+            process.crash()
+
+
+@pytest.fixture
+def port():
+    with benchmark.FakeVoicevoxServer() as fake:
+        return fake.server_address[1]
+
+
+@pytest.fixture
+def supervise(port):
+    supervisors = []
+    launchers = []
+
+    def make(start_delay=0.0, **kwargs):
+        launcher = FakeLauncher(port, start_delay)
+        kwargs.setdefault("startup_timeout", 5.0)
+        kwargs.setdefault("check_interval", 0.1)
+        supervisor = EngineSupervisor(f"http://127.0.0.1:{port}", launcher, **kwargs)
+        states = []
+        supervisor.add_listener(lambda state, message: states.append(state))
+        supervisors.append(supervisor)
+        launchers.append(launcher)
+        return supervisor, launcher, states
+
+    yield make
+    for supervisor in supervisors:
+        supervisor.stop()
+    for launcher in launchers:
+        launcher.crash_all()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "タイムアウトしました"
+        time.sleep(0.02)
+
+
+def test_start_launches_engine_and_becomes_ready(supervise):
+    supervisor, launcher, states = supervise(start_delay=0.2)
+    supervisor.start()
+
+    assert supervisor.wait_until_ready(5.0)
+    assert states == [EngineSupervisor.STARTING, EngineSupervisor.READY]
+    assert len(launcher.processes) == 1
+
+
+def test_running_engine_is_not_launched_again(supervise, port):
+    supervisor, launcher, states = supervise()
+    with benchmark.FakeVoicevoxServer(port=port):
+        supervisor.start()
+        assert supervisor.wait_until_ready(5.0)
+        supervisor.stop()
+    assert launcher.processes == []
+
+
+def test_engine_is_restarted_after_process_dies(supervise):
+    supervisor, launcher, states = supervise()
+    supervisor.start()
+    assert supervisor.wait_until_ready(5.0)
+
+    launcher.processes[0].crash()
+    wait_for(lambda: len(launcher.processes) == 2 and supervisor.is_ready())
+
+    assert states == [EngineSupervisor.STARTING, EngineSupervisor.READY,
+                      EngineSupervisor.RESTARTING, EngineSupervisor.READY]
+    assert supervisor.restarts == 1
+
+
+def test_gives_up_after_max_restarts(supervise):
+    supervisor, launcher, states = supervise(max_restarts=1)
+    supervisor.start()
+    assert supervisor.wait_until_ready(5.0)
+
+    launcher.processes[0].crash()
+    wait_for(lambda: len(launcher.processes) == 2 and supervisor.is_ready())
+    launcher.processes[1].crash()
+    wait_for(lambda: supervisor.state == EngineSupervisor.FAILED)
+
+    assert states[-2:] == [EngineSupervisor.READY, EngineSupervisor.FAILED]
+    assert len(launcher.processes) == 2
+
+
+def test_launcher_failure_is_reported(port):
+    supervisor = EngineSupervisor(f"http://127.0.0.1:{port}", lambda: None, startup_timeout=5.0)
+    supervisor.start()
+
+    assert not supervisor.wait_until_ready(5.0)
+    assert supervisor.state == EngineSupervisor.FAILED
+
+
+def test_process_exiting_during_startup_fails_fast(supervise):
+    supervisor, launcher, states = supervise(start_delay=10.0, startup_timeout=10.0)
+    started = time.time()
+    supervisor.start()
+    wait_for(lambda: launcher.processes)
+    launcher.processes[0].crash()
+
+    assert not supervisor.wait_until_ready(5.0)
+    assert time.time() - started < 3.0
+    assert states == [EngineSupervisor.STARTING, EngineSupervisor.FAILED]
+
+
+def test_readiness_polling_backs_off(port, monkeypatch):
+    probes = []
+    is_running = script_reader.is_voicevox_engine_running
+
+    def record_probe(url):
+        probes.append(time.perf_counter())
+        return is_running(url)
+
+    monkeypatch.setattr(script_reader, "is_voicevox_engine_running", record_probe)
+    process = FakeEngineProcess(port, start_delay=1.2)
+    try:
+        assert script_reader.wait_for_voicevox_engine(f"http://127.0.0.1:{port}", timeout=5.0, process=process,
+                                                      initial_delay=0.1, max_delay=0.4)
+    finally:
+        process.crash()
+
+    gaps = [later - earlier for earlier, later in zip(probes, probes[1:])]
+    assert gaps[0] == pytest.approx(0.1, abs=0.08)
+    assert gaps[1] == pytest.approx(0.2, abs=0.08)
+    # 間隔は倍々に広がり、上限で頭打ちになる
+    assert all(gap == pytest.approx(0.4, abs=0.08) for gap in gaps[2:])
+    assert len(probes) < 8
@@ -0,0 +1,114 @@
+import json
+import os
+import wave
+
+import pytest
+
+from script_reader import export_presentation, format_cue_time
+
+FRAMERATE = 24000
+
+
+def write_wav(path, frame_count, value, framerate=FRAMERATE):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(framerate)
+        f.writeframes(value.to_bytes(2, "little", signed=True) * frame_count)
+
+
+def read_frames(path):
+    with wave.open(str(path), 'rb') as f:
+        return f.getparams(), f.readframes(f.getnframes())
+
+
+def cue_time_to_sec(value):
+    minutes, seconds, frames = (int(part) for part in value.split(":"))
+    return minutes * 60 + seconds + frames / 75
+
+
+@pytest.fixture
+def rendered(tmp_path):
+    """BatchRenderer.render の結果と同じ形のマニフェストとスライドごとのWAV"""
+    lengths = [12000, 0, 30000, 7000]
+    slides = []
+    for idx, frame_count in enumerate(lengths):
+        name = f"slide_{idx + 1:03d}.wav"
+        if frame_count:
+            write_wav(tmp_path / name, frame_count, idx + 1)
+        slides.append({"index": idx, "heading": f"見出し{idx + 1}", "file": name if frame_count else None})
+    slides[2]["heading"] = '"引用"のある見出し'
+    slides[3]["heading"] = ""
+    return {"script": "/path/to/台本.md", "slides": slides}, tmp_path
+
+
+def test_slides_are_joined_with_gaps(rendered):
+    manifest, out_dir = rendered
+    dest = out_dir / "発表.wav"
+    export_presentation(manifest, str(out_dir), str(dest), gap_sec=0.5, block_frames=1000)
+
+    params, data = read_frames(dest)
+    assert (params.nchannels, params.sampwidth, params.framerate) == (1, 2, FRAMERATE)
+    gap = b"\x00\x00" * (FRAMERATE // 2)
+    sample = lambda value: value.to_bytes(2, "little", signed=True)
+    # 音声のないスライドは飛ばし、無音はスライドの間にだけ入れる
+    assert data == sample(1) * 12000 + gap + sample(3) * 30000 + gap + sample(4) * 7000
+
+
+def test_chapters_json(rendered):
+    manifest, out_dir = rendered
+    dest = out_dir / "発表.wav"
+    info = export_presentation(manifest, str(out_dir), str(dest), gap_sec=0.5)
+
+    with open(out_dir / "発表.chapters.json", encoding="utf-8") as f:
+        assert json.load(f) == info
+    assert info["file"] == "発表.wav"
+    assert info["gap_sec"] == 0.5
+    assert info["duration_sec"] == pytest.approx((12000 + 30000 + 7000) / FRAMERATE + 1.0, abs=1e-3)
+    assert info["chapters"] == [
+        {"index": 0, "heading": "見出し1", "start_sec": 0.0, "duration_sec": 0.5},
+        {"index": 2, "heading": '"引用"のある見出し', "start_sec": 1.0, "duration_sec": 1.25},
+        {"index": 3, "heading": "スライド4", "start_sec": 2.75, "duration_sec": 0.292},
+    ]
+
+
+def test_cue_sheet_matches_chapter_offsets(rendered):
+    manifest, out_dir = rendered
+    dest = out_dir / "発表.wav"
+    info = export_presentation(manifest, str(out_dir), str(dest), gap_sec=0.33)
+
+    lines = (out_dir / "発表.cue").read_text(encoding="utf-8").splitlines()
+    assert lines[:2] == ['TITLE "台本"', 'FILE "発表.wav" WAVE']
+    tracks = [lines[i:i + 3] for i in range(2, len(lines), 3)]
+    assert len(tracks) == len(info["chapters"])
+    for number, (track, chapter) in enumerate(zip(tracks, info["chapters"]), 1):
+        assert track[0] == f"  TRACK {number:02d} AUDIO"
+        assert track[1] == f'    TITLE "{chapter["heading"].replace(chr(34), chr(39))}"'
+        index_time = track[2].split()[-1]
+        assert track[2] == f"    INDEX 01 {index_time}"
+        # CUEの1フレーム（1/75秒）の精度でチャプターの開始位置と一致する
+        assert cue_time_to_sec(index_time) == pytest.approx(chapter["start_sec"], abs=0.5 / 75)
+
+
+def test_format_cue_time():
+    assert format_cue_time(0) == "00:00:00"
+    assert format_cue_time(1.5) == "00:01:37"
+    assert format_cue_time(61.0) == "01:01:00"
+    assert format_cue_time(3600 + 59.99) == "60:59:74"
+
+
+def test_mismatched_format_is_rejected(rendered):
+    manifest, out_dir = rendered
+    write_wav(out_dir / "slide_003.wav", 100, 3, framerate=48000)
+
+    with pytest.raises(ValueError):
+        export_presentation(manifest, str(out_dir), str(out_dir / "発表.wav"))
+
+
+def test_nothing_to_export(tmp_path):
+    manifest = {"script": "台本.md", "slides": [{"index": 0, "heading": "表紙", "file": None}]}
+    dest = tmp_path / "発表.wav"
+
+    with pytest.raises(ValueError):
+        export_presentation(manifest, str(tmp_path), str(dest))
+    assert not os.path.exists(dest)
@@ -0,0 +1,98 @@
+import json
+import threading
+
+import pytest
+
+import script_reader
+from script_reader import Tracer, log_message, trace_slide
+
+
+@pytest.fixture
+def threshold():
+    saved = script_reader.log_threshold
+    yield script_reader.set_log_level
+    script_reader.log_threshold = saved
+
+
+def test_level_is_case_insensitive(capsys, threshold):
+    threshold("WARN")
+    log_message("表示しない", level="info")
+    log_message("表示する", level="warn", prefix="テスト")
+    log_message("エラー", level="Error")
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("⚠️ [テスト] 表示する")
+    assert lines[1].endswith("❌ エラー")
+
+
+def test_unknown_level_is_logged_as_info(capsys, threshold):
+    threshold("info")
+    log_message("詳細", level="debug")
+    log_message("不明", level="TRACE")
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith("  不明")
+
+
+def record_spans(tracer):
+    with tracer.span("parse", file="deck.md"):
+        pass
+    token = trace_slide.set(2)
+    try:
+        with tracer.span("synthesis", chunks=3):
+            pass
+    finally:
+        trace_slide.reset(token)
+    with pytest.raises(ValueError):
+        with tracer.span("write", slide=0):
+            raise ValueError("失敗")
+
+    worker = threading.Thread(target=lambda: tracer.record("audio_query", tracer.origin + 0.5, tracer.origin + 0.75,
+                                                           slide=1), name="worker")
+    worker.start()
+    worker.join()
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    record_spans(tracer)
+    assert tracer.events == []
+
+
+def test_jsonl_output(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    record_spans(tracer)
+    path = tmp_path / "trace.jsonl"
+    tracer.save(str(path))
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["name"] for line in lines] == ["parse", "synthesis", "write", "audio_query"]
+    assert lines[0]["file"] == "deck.md" and "slide" not in lines[0]
+    # slide を省略した区間は trace_slide の値を使う
+    assert lines[1]["slide"] == 2 and lines[1]["chunks"] == 3
+    assert lines[2]["slide"] == 0 and lines[2]["error"] == "ValueError"
+    assert lines[3] == {"name": "audio_query", "start_sec": 0.5, "duration_sec": 0.25, "thread": "worker", "slide": 1}
+    assert all(line["duration_sec"] >= 0 and line["start_sec"] >= 0 for line in lines)
+
+
+def test_chrome_trace_output(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    record_spans(tracer)
+    path = tmp_path / "trace.json"
+    tracer.save(str(path))
+
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert trace["displayTimeUnit"] == "ms"
+    metadata = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert sorted(event["args"]["name"] for event in metadata) == sorted([threading.current_thread().name, "worker"])
+    assert [event["name"] for event in spans] == ["parse", "synthesis", "write", "audio_query"]
+    assert spans[1]["args"] == {"chunks": 3, "slide": 2}
+    # 時刻はマイクロ秒で、スレッドごとに分かれる
+    assert spans[3]["ts"] == 500000.0 and spans[3]["dur"] == 250000.0
+    assert spans[3]["tid"] != spans[0]["tid"]
+    assert {event["tid"] for event in metadata} == {event["tid"] for event in spans}
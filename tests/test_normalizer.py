@@ -0,0 +1,37 @@
+import random
+import re
+
+import pytest
+
+import benchmark
+import script_reader
+
+# 以前の実装と意図的に出力が異なる入力（複数行のコメント、*** の水平線）
+MULTILINE_COMMENT_RE = re.compile(r'<!--[\s\S]*?-->')
+ASTERISK_RULE_RE = re.compile(r'^#*[^\S\n]*\*{3,}$', re.MULTILINE)
+FUZZ_TOKENS = ['#', '##', '-', '*', '+', '_', '1.', '10.', ' ', '\t', '\n', '**', '`',
+               '[', ']', '(', ')', 'a', 'あ', '---', '<!--', '-->', 'x', '2', '.', '\r']
+
+
+@pytest.mark.parametrize("text, expected", benchmark.NORMALIZER_GOLDEN)
+def test_golden_output(text, expected):
+    assert script_reader.process_text_for_speech(text) == expected
+
+
+def test_matches_legacy_implementation():
+    rng = random.Random(0)
+    mismatches = []
+    for _ in range(20000):
+        text = ''.join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 12)))
+        if any('\n' in comment for comment in MULTILINE_COMMENT_RE.findall(text)):
+            continue
+        if ASTERISK_RULE_RE.search(text):
+            continue
+        if script_reader.process_text_for_speech(text) != benchmark.legacy_process_text_for_speech(text):
+            mismatches.append(text)
+    assert mismatches == []
+
+
+def test_sample_slide_matches_legacy():
+    slide = benchmark.SAMPLE_SLIDE.replace("<!-- 発表者メモ:\nここは読み上げない -->\n", "")
+    assert script_reader.process_text_for_speech(slide) == benchmark.legacy_process_text_for_speech(slide)
@@ -0,0 +1,98 @@
+import queue
+import threading
+
+import pytest
+
+from script_reader import AudioPrefetcher, build_slide_record
+
+
+class FakeRoot:
+    """root.after で渡されたコールバックをテスト側のスレッドで実行するための代わり"""
+    def __init__(self):
+        self.calls = queue.Queue()
+
+    def after(self, delay, func, *args):
+        self.calls.put((func, args))
+
+    def run_next(self, timeout=2.0):
+        func, args = self.calls.get(timeout=timeout)
+        func(*args)
+
+
+class BlockingRenderer:
+    """release されるまで合成を終えない render_func"""
+    def __init__(self):
+        self.started = queue.Queue()
+        self.release = threading.Event()
+
+    def __call__(self, slide_idx, record, settings, cancel_event):
+        self.started.put(slide_idx)
+        self.release.wait(2.0)
+        return f"slide{slide_idx}.wav", None
+
+
+@pytest.fixture
+def prefetcher():
+    root = FakeRoot()
+    renderer = BlockingRenderer()
+    prefetcher = AudioPrefetcher(root, renderer, max_workers=1)
+    yield prefetcher, root, renderer
+    renderer.release.set()
+    prefetcher.shutdown()
+
+
+def test_result_is_delivered(prefetcher):
+    prefetcher, root, renderer = prefetcher
+    results = []
+    prefetcher.submit(0, build_slide_record("本文"), {"speed": 1.0}, lambda *args: results.append(args))
+    renderer.release.set()
+    root.run_next()
+
+    assert results == [(0, "slide0.wav", None)]
+    assert not prefetcher.is_pending(0)
+
+
+def test_result_of_previous_generation_is_dropped(prefetcher):
+    prefetcher, root, renderer = prefetcher
+    results = []
+    on_done = lambda *args: results.append(args)
+    prefetcher.submit(0, build_slide_record("本文"), {"speed": 1.0}, on_done)
+    assert renderer.started.get(timeout=2.0) == 0
+
+    # 合成中に設定が変わった
+    prefetcher.invalidate()
+    prefetcher.submit(1, build_slide_record("次の本文"), {"speed": 1.5}, on_done)
+    renderer.release.set()
+    root.run_next()
+    root.run_next()
+
+    assert results == [(1, "slide1.wav", None)]
+
+
+def test_resubmitted_job_replaces_running_one(prefetcher):
+    prefetcher, root, renderer = prefetcher
+    results = []
+    on_done = lambda *args: results.append(args)
+    first = prefetcher.submit(0, build_slide_record("本文"), {"speed": 1.0}, on_done)
+    assert renderer.started.get(timeout=2.0) == 0
+
+    second = prefetcher.submit(0, build_slide_record("書き換えた本文"), {"speed": 1.0}, on_done)
+    assert first.cancelled.is_set()
+    renderer.release.set()
+    root.run_next()
+    root.run_next()
+
+    assert results == [(0, "slide0.wav", None)]
+    assert second.state == "done"
+
+
+def test_same_job_is_reused(prefetcher):
+    prefetcher, root, renderer = prefetcher
+    record = build_slide_record("本文")
+    first = prefetcher.submit(0, record, {"speed": 1.0}, lambda *args: None,
+                              priority=AudioPrefetcher.PRIORITY_BACKGROUND)
+    second = prefetcher.submit(0, record, {"speed": 1.0}, lambda *args: None,
+                               priority=AudioPrefetcher.PRIORITY_CURRENT)
+
+    assert first is second
+    assert second.priority == AudioPrefetcher.PRIORITY_CURRENT
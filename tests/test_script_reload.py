@@ -0,0 +1,164 @@
+import queue
+from types import SimpleNamespace
+
+from script_reader import SimpleScriptReader, SlideIndex
+
+DECK = ["## 表紙\n発表を始めます。\n", "## 背景\n背景を説明します。\n", "## まとめ\nまとめです。\n"]
+
+
+def write_deck(path, slides):
+    path.write_text("\n".join(slides), encoding="utf-8")
+
+
+class FakeRoot:
+    """root.after で渡されたコールバックをテスト側のスレッドで実行するための代わり"""
+    def __init__(self):
+        self.calls = queue.Queue()
+
+    def after(self, delay, func, *args):
+        self.calls.put((func, args))
+
+    def run_next(self, timeout=5.0):
+        func, args = self.calls.get(timeout=timeout)
+        func(*args)
+        return func.__name__
+
+
+class FakePrefetcher:
+    def __init__(self, jobs):
+        self.jobs = dict.fromkeys(jobs)
+        self.cancelled = []
+
+    def cancel(self, idx):
+        self.cancelled.append(idx)
+        self.jobs.pop(idx, None)
+
+
+class FakeReader:
+    """台本の読み直しに使う属性だけを持つ SimpleScriptReader の代わり"""
+    _on_script_changed = SimpleScriptReader._on_script_changed
+    _reload_script = SimpleScriptReader._reload_script
+    _refresh_slides = SimpleScriptReader._refresh_slides
+    _apply_script_change = SimpleScriptReader._apply_script_change
+
+    def __init__(self, slides, audio_cache=None, jobs=()):
+        self.root = FakeRoot()
+        self.slides = slides
+        self.precompute_stop = SimpleNamespace(is_set=lambda: False)
+        self.script_reloads = 1
+        self.current_slide = 0
+        self.audio_cache = dict(audio_cache or {})
+        self.is_loaded = {idx: True for idx in self.audio_cache}
+        self.is_loading = {idx: True for idx in jobs}
+        self.is_speaking = False
+        self.deck_analysis_enabled = False
+        self.prefetcher = FakePrefetcher(jobs)
+        self.status = []
+        self.status_label = SimpleNamespace(config=lambda text: self.status.append(text))
+
+    def show_slide(self):
+        pass
+
+
+def test_refreshed_keeps_records_of_unchanged_slides(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    records = [base.record(idx) for idx in range(len(base))]
+
+    write_deck(path, [DECK[0], "## 背景\n背景を書き直しました。\n", DECK[2]])
+    slides = base.refreshed()
+
+    assert slides.records[0] is records[0]
+    assert slides.records[2] is records[2]
+    assert 1 not in slides.records
+    assert slides.content_hashes[1] is None
+    assert slides.precompute()
+    assert slides.content_hashes[1] not in (None, records[1].content_hash)
+    assert slides[1] == "## 背景\n背景を書き直しました。\n"
+
+
+def test_previous_hashes_fill_slides_not_precomputed(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    first = base.record(0)
+
+    write_deck(path, [DECK[0], DECK[1], "## まとめ\n書き直したまとめです。\n"])
+    slides = base.refreshed()
+    slides.precompute()
+
+    # 前処理前だった2枚目は生テキストが同じなので読み直した値で補い、書き換えた3枚目は分からない
+    assert slides.previous_hashes(base) == [first.content_hash, slides.content_hashes[1], None]
+
+
+def test_edited_slide_is_invalidated_and_others_keep_audio(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    base.precompute()
+    reader = FakeReader(base, {0: "a.wav", 1: "b.wav", 2: "c.wav"}, jobs=[1, 2])
+
+    write_deck(path, [DECK[0], "## 背景\n背景を書き直しました。\n", DECK[2]])
+    reader._on_script_changed()
+    # 監視スレッドからは読み直しをメインスレッドに任せるだけ
+    assert reader.root.run_next() == "_reload_script"
+    assert reader.root.run_next() == "_apply_script_change"
+
+    assert reader.slides is not base
+    assert reader.audio_cache == {0: "a.wav", 2: "c.wav"}
+    assert reader.is_loaded == {0: True, 2: True}
+    assert reader.prefetcher.cancelled == [1]
+    assert reader.is_loading == {2: True}
+    assert reader.status == ["台本の変更を反映しました（1枚を更新）"]
+
+
+def test_inserted_slide_moves_audio_to_new_positions(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    base.precompute()
+    reader = FakeReader(base, {0: "a.wav", 2: "c.wav"})
+    reader.current_slide = 2
+
+    write_deck(path, [DECK[0], "## 追加\n追加したスライドです。\n"] + DECK[1:])
+    reader._reload_script()
+    reader.root.run_next()
+
+    assert reader.audio_cache == {0: "a.wav", 3: "c.wav"}
+    assert reader.current_slide == 3
+    assert reader.status == ["台本の変更を反映しました（1枚を更新）"]
+
+
+def test_slides_not_precomputed_are_not_counted_as_changed(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    base.record(0)
+    reader = FakeReader(base, {0: "a.wav"})
+    reader.current_slide = 1
+
+    write_deck(path, [DECK[0], DECK[1], "## まとめ\n書き直したまとめです。\n"])
+    reader._reload_script()
+    reader.root.run_next()
+
+    assert reader.audio_cache == {0: "a.wav"}
+    assert reader.current_slide == 1
+    assert reader.status == ["台本の変更を反映しました（1枚を更新）"]
+
+
+def test_stale_reload_is_dropped(tmp_path):
+    path = tmp_path / "deck.md"
+    write_deck(path, DECK)
+    base = SlideIndex(str(path))
+    base.precompute()
+    reader = FakeReader(base, {1: "b.wav"})
+
+    write_deck(path, [DECK[0], "## 背景\n背景を書き直しました。\n", DECK[2]])
+    reader._reload_script()
+    # 反映する前にもう一度保存された（または別のファイルが開かれた）
+    reader.script_reloads += 1
+    reader.root.run_next()
+
+    assert reader.slides is base
+    assert reader.audio_cache == {1: "b.wav"}
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from script_reader import SlideIndex, parse_slides
+
+DECKS = {
+    "見出しから始まる": "## 表紙\n発表を始めます。\n\n## 背景\n背景を説明します。\n",
+    "見出しの前に本文": "前置き\n\n## 1枚目\n本文\n## 2枚目\n本文2",
+    "見出しなし": "見出しのない台本です。\n2行目",
+    "末尾に改行なし": "## 最後\n改行なしで終わる",
+    "空行だけのスライド": "## A\n\n\n## B\n\n",
+    "見出しではない行": "## 本物\n##見出しではない\n### 小見出し\n ## 字下げ\n",
+    "CRLF": "前置き\r\n## 表紙\r\n発表を始めます。\r\n\r\n## 背景\r\n背景\r\n",
+    "CRだけ": "## 表紙\r本文\r## 次\r本文2\r",
+    "空のファイル": "",
+}
+
+
+def legacy_parse_slides(path):
+    """以前の parse_slides（ファイル全体を読み込んで1行ずつ連結する）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    slides = []
+    current_slide = ""
+    for line in content.split('\n'):
+        if line.startswith('## '):
+            if current_slide:
+                slides.append(current_slide)
+            current_slide = line
+        else:
+            current_slide += '\n' + line
+    if current_slide:
+        slides.append(current_slide)
+    return slides
+
+
+def write_deck(tmp_path, content):
+    path = tmp_path / "deck.md"
+    path.write_bytes(content.encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("name", DECKS)
+def test_slides_match_legacy_parser(tmp_path, name):
+    path = write_deck(tmp_path, DECKS[name])
+    index = parse_slides(path)
+
+    assert list(index) == legacy_parse_slides(path)
+    assert len(index) == len(legacy_parse_slides(path))
+
+
+def test_random_decks_match_legacy_parser(tmp_path):
+    rng = random.Random(0)
+    lines = ["## 見出し", "##", "本文です。", "", " ## 字下げ", "- 箇条書き", "## "]
+    for _ in range(200):
+        content = "".join(rng.choice(lines) + rng.choice(["\n", "\r\n", "\r"]) for _ in range(rng.randrange(8)))
+        if rng.random() < 0.5:
+            content += rng.choice(lines)
+        path = write_deck(tmp_path, content)
+        assert list(SlideIndex(path)) == legacy_parse_slides(path), repr(content)
+
+
+def test_offsets_point_at_headings(tmp_path):
+    content = "前置き\n## 日本語の見出し\n本文です。\n## 二枚目\n🎤 絵文字\n"
+    path = write_deck(tmp_path, content)
+    data = content.encode("utf-8")
+    index = SlideIndex(path)
+
+    assert index.offsets[0] == (0, data.index(b"## "), True)
+    # 区切りは隙間なく並び、最後はファイルの末尾で終わる（位置は文字数ではなくバイト数）
+    for (_, end, _), (start, _, preamble) in zip(index.offsets, index.offsets[1:]):
+        assert end == start and not preamble
+        assert data[start:start + 3] == b"## "
+    assert index.offsets[-1][1] == len(data) == index.size
+    assert index.offsets[2][0] == data.index("## 二枚目".encode("utf-8"))
+
+
+def test_crlf_is_normalized(tmp_path):
+    path = write_deck(tmp_path, DECKS["CRLF"])
+    index = SlideIndex(path)
+
+    assert list(index) == ["\n前置き", "## 表紙\n発表を始めます。\n", "## 背景\n背景\n"]
+    assert all("\r" not in text for text in index)
+
+
+def test_slides_are_loaded_lazily(tmp_path, monkeypatch):
+    path = write_deck(tmp_path, "".join(f"## スライド{i}\n本文{i}\n" for i in range(50)))
+    index = SlideIndex(path, cache_entries=4)
+    reads = []
+    read = index._read
+    monkeypatch.setattr(index, "_read", lambda idx: (reads.append(idx), read(idx))[1])
+
+    # 開いた時点では本文を読み込まない
+    assert len(index) == 50
+    assert not index.cache
+
+    assert index[10] == "## スライド10\n本文10"
+    assert index[10] == "## スライド10\n本文10"
+    assert index[-1] == "## スライド49\n本文49\n"
+    assert reads == [10, 49]
+
+    # 保持するのは最近使ったスライドだけ
+    for i in range(20):
+        index[i]
+    assert list(index.cache) == [16, 17, 18, 19]
+
+
+def test_index_out_of_range(tmp_path):
+    index = SlideIndex(write_deck(tmp_path, DECKS["見出しから始まる"]))
+
+    with pytest.raises(IndexError):
+        index[2]
+    assert index[0:5] == list(index)
+
+
+def test_missing_file_gives_message_slide(tmp_path):
+    index = parse_slides(str(tmp_path / "ない.md"))
+
+    assert len(index) == 1
+    assert index[0].startswith("ファイルが見つかりません")
+    assert index.file_path is None
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+
+import pytest
+
+import script_reader
+from script_reader import SlideIndex, build_slide_record, estimate_speech_duration, process_text_for_speech
+
+
+@pytest.fixture
+def deck(tmp_path):
+    path = tmp_path / "deck.md"
+    path.write_text("".join(f"## スライド{i}\n**本文**{i}です。\n" for i in range(10)), encoding="utf-8")
+    return str(path)
+
+
+def test_record_fields():
+    raw = "## 見出し\n**太字**の本文です。\n- 箇条書き"
+    record = build_slide_record(raw)
+
+    assert record.raw == raw
+    assert record.lines == tuple(process_text_for_speech(raw))
+    assert record.speech_text == " ".join(record.lines)
+    assert record.char_count == len(record.speech_text)
+    assert record.estimated_duration == pytest.approx(record.char_count / script_reader.SPEECH_CHARS_PER_SECOND)
+    assert record.content_hash == hashlib.sha256(record.speech_text.encode("utf-8")).hexdigest()
+    with pytest.raises(AttributeError):
+        record.speech_text = "書き換え"
+
+
+def test_content_hash_ignores_markup():
+    # 読み上げる内容が同じなら、マークダウンの書き方が違っても同じキャッシュキーになる
+    assert build_slide_record("## 見出し\n**本文**").content_hash == build_slide_record("## 見出し\n本文").content_hash
+    assert build_slide_record("## 見出し\n本文").content_hash != build_slide_record("## 見出し\n別の本文").content_hash
+
+
+def test_estimated_duration_follows_speech_rate():
+    record = build_slide_record("あ" * 70)
+
+    assert estimate_speech_duration(record, 220) == pytest.approx(10.0)
+    assert estimate_speech_duration(record, 440) == pytest.approx(5.0)
+
+
+def test_record_is_built_once(deck, monkeypatch):
+    index = SlideIndex(deck)
+    built = []
+    monkeypatch.setattr(script_reader, "build_slide_record", lambda raw: built.append(raw) or build_slide_record(raw))
+
+    first = index.record(3)
+    assert index.record(3) is first
+    assert built == [index[3]]
+    assert index.content_hashes[3] == first.content_hash
+    assert index.estimated_durations[3] == first.estimated_duration
+
+
+def test_records_are_bounded_but_hashes_are_kept(deck, monkeypatch):
+    monkeypatch.setattr(script_reader, "SLIDE_RECORD_CACHE_ENTRIES", 3)
+    index = SlideIndex(deck)
+    records = [index.record(idx) for idx in range(len(index))]
+
+    assert list(index.records) == [7, 8, 9]
+    assert index.content_hashes == [record.content_hash for record in records]
+    # 追い出された後に作り直しても同じ内容になる
+    assert index.record(0) == records[0]
+
+
+def test_precompute_fills_all_slides(deck):
+    index = SlideIndex(deck)
+
+    assert index.precompute()
+    assert None not in index.content_hashes
+    assert len(set(index.content_hashes)) == len(index)
+    assert index.estimated_durations == [index.record(idx).estimated_duration for idx in range(len(index))]
+
+
+def test_precompute_stops(deck):
+    index = SlideIndex(deck)
+    stop_event = threading.Event()
+    stop_event.set()
+
+    assert not index.precompute(stop_event)
+    assert index.content_hashes == [None] * len(index)
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+import benchmark
+import script_reader
+from script_reader import SpeakerCatalog, run_voicevox_async
+
+SPEAKERS = [
+    {"name": "四国めたん", "styles": [{"name": "ノーマル", "id": 2}, {"name": "あまあま", "id": 0}]},
+    {"name": "ずんだもん", "styles": [{"name": "ノーマル", "id": 3}, {"name": "ささやき", "id": 22}]},
+]
+
+
+def write_catalog(cache_dir, version, speakers, mtime):
+    path = os.path.join(cache_dir, f"speakers_{version}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": version, "fetched": mtime, "speakers": speakers}, f, ensure_ascii=False)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_flatten_names_styles():
+    styles = SpeakerCatalog.flatten(SPEAKERS)
+
+    assert list(styles.items()) == [("四国めたん", 2), ("四国めたん（あまあま）", 0),
+                                    ("ずんだもん", 3), ("ずんだもん（ささやき）", 22)]
+
+
+def test_load_latest_without_cache(tmp_path):
+    catalog = SpeakerCatalog(str(tmp_path / "ない"))
+
+    assert not catalog.load_latest()
+    assert catalog.version is None and not catalog.styles
+
+
+def test_load_latest_picks_newest_version(tmp_path):
+    write_catalog(str(tmp_path), "0.14.0", SPEAKERS[:1], 1000)
+    write_catalog(str(tmp_path), "0.15.0", SPEAKERS, 2000)
+    catalog = SpeakerCatalog(str(tmp_path))
+
+    assert catalog.load_latest()
+    assert catalog.version == "0.15.0"
+    assert catalog.styles == SpeakerCatalog.flatten(SPEAKERS)
+
+
+def test_broken_file_falls_back_to_older_one(tmp_path):
+    write_catalog(str(tmp_path), "0.14.0", SPEAKERS[:1], 1000)
+    broken = write_catalog(str(tmp_path), "0.15.0", SPEAKERS, 2000)
+    with open(broken, 'w', encoding='utf-8') as f:
+        f.write("{壊れたJSON")
+    os.utime(broken, (2000, 2000))
+    catalog = SpeakerCatalog(str(tmp_path))
+
+    assert catalog.load_latest()
+    assert catalog.version == "0.14.0"
+    assert list(catalog.styles) == ["四国めたん", "四国めたん（あまあま）"]
+
+
+def test_refresh_saves_catalog_per_engine_version(tmp_path):
+    with benchmark.FakeVoicevoxServer(latency=0.0) as server:
+        catalog = SpeakerCatalog(str(tmp_path))
+        assert run_voicevox_async(catalog.refresh_async(server.url))
+        # 内容が変わらなければ False
+        assert not run_voicevox_async(catalog.refresh_async(server.url))
+
+    assert catalog.version == "0.0.0-fake"
+    assert catalog.styles == {"ベンチマーク": 1}
+    assert os.listdir(tmp_path) == ["speakers_0.0.0-fake.json"]
+
+    # 次回の起動ではエンジンに接続せずに同じ一覧を読み込める
+    restarted = SpeakerCatalog(str(tmp_path))
+    assert restarted.load_latest()
+    assert (restarted.version, restarted.styles) == (catalog.version, catalog.styles)
+
+
+def test_refresh_replaces_cached_catalog(tmp_path):
+    write_catalog(str(tmp_path), "0.14.0", SPEAKERS, 1000)
+    catalog = SpeakerCatalog(str(tmp_path))
+    catalog.load_latest()
+
+    with benchmark.FakeVoicevoxServer(latency=0.0) as server:
+        assert run_voicevox_async(catalog.refresh_async(server.url))
+
+    assert catalog.styles == {"ベンチマーク": 1}
+    assert sorted(os.listdir(tmp_path)) == ["speakers_0.0.0-fake.json", "speakers_0.14.0.json"]
+    assert SpeakerCatalog(str(tmp_path)).load_latest()
+
+
+def test_failed_refresh_keeps_loaded_catalog(tmp_path):
+    write_catalog(str(tmp_path), "0.14.0", SPEAKERS, 1000)
+    catalog = SpeakerCatalog(str(tmp_path))
+    catalog.load_latest()
+    with benchmark.FakeVoicevoxServer() as stopped:
+        url = stopped.url
+
+    with pytest.raises(script_reader.VoicevoxError):
+        run_voicevox_async(catalog.refresh_async(url))
+    assert catalog.version == "0.14.0"
+    assert catalog.styles == SpeakerCatalog.flatten(SPEAKERS)
+
+
+def test_version_is_sanitized_for_file_name(tmp_path):
+    catalog = SpeakerCatalog(str(tmp_path))
+
+    assert os.path.basename(catalog._path("1.0/dev build")) == "speakers_1.0_dev_build.json"
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import benchmark
+from script_reader import EnginePool, SpeakerWarmer
+
+
+@pytest.fixture
+def server():
+    with benchmark.FakeVoicevoxServer(latency=0.0) as fake:
+        yield fake
+
+
+def wait_until_idle(warmer, timeout=5.0):
+    deadline = time.time() + timeout
+    while warmer.pending:
+        assert time.time() < deadline, "タイムアウトしました"
+        time.sleep(0.01)
+
+
+def test_speakers_are_initialized(server):
+    warmer = SpeakerWarmer()
+    warmer.warm([1, 2], server.url)
+    wait_until_idle(warmer)
+
+    assert server.initialized == {1, 2}
+    assert warmer.warmed == {(server.url, 1), (server.url, 2)}
+    assert server.take_stats() == {"initialize_speaker": 2}
+
+
+def test_initialized_speaker_is_not_loaded_again(server):
+    server.initialized.add(3)
+    warmer = SpeakerWarmer()
+    warmer.warm([3], server.url)
+    wait_until_idle(warmer)
+
+    assert warmer.warmed == {(server.url, 3)}
+    assert server.take_stats() == {}
+
+
+def test_duplicate_requests_are_merged(server):
+    server.latency = 0.2
+    warmer = SpeakerWarmer()
+    warmer.warm([1], server.url)
+    first = warmer.pending[(server.url, 1)]
+    # 読み込み中に同じ話者をもう一度依頼しても、新しいリクエストは送らない
+    warmer.warm([1, 1], server.url)
+    assert warmer.pending[(server.url, 1)] is first
+    wait_until_idle(warmer)
+    warmer.warm([1], server.url)
+
+    assert not warmer.pending
+    assert server.take_stats() == {"initialize_speaker": 1}
+
+
+def test_forget_after_engine_restart(server):
+    warmer = SpeakerWarmer()
+    warmer.warm([1], server.url)
+    wait_until_idle(warmer)
+
+    # 再起動したエンジンはモデルを読み込み直す必要がある
+    server.initialized.clear()
+    warmer.forget(server.url)
+    warmer.warm([1], server.url)
+    wait_until_idle(warmer)
+
+    assert server.initialized == {1}
+    assert server.take_stats() == {"initialize_speaker": 2}
+
+
+def test_engine_not_running_is_retried_later():
+    with benchmark.FakeVoicevoxServer(latency=0.0) as stopped:
+        url = stopped.url
+        port = stopped.server_address[1]
+    warmer = SpeakerWarmer()
+    warmer.warm([1], url)
+    wait_until_idle(warmer, timeout=30.0)
+
+    # 起動していなかったエンジンは読み込み済みとして記録しないので、起動後にもう一度依頼できる
+    assert warmer.warmed == set()
+    with benchmark.FakeVoicevoxServer(latency=0.0, port=port) as started:
+        warmer.warm([1], url)
+        wait_until_idle(warmer)
+        assert started.initialized == {1}
+        assert warmer.warmed == {(url, 1)}
+
+
+def test_all_engines_in_pool_are_warmed():
+    with benchmark.FakeVoicevoxServer(latency=0.0) as first, benchmark.FakeVoicevoxServer(latency=0.0) as second:
+        pool = EnginePool([first.url, second.url])
+        warmer = SpeakerWarmer()
+        warmer.warm([5], pool)
+        wait_until_idle(warmer)
+
+        assert first.initialized == {5}
+        assert second.initialized == {5}
+        assert warmer.warmed == {(pool, 5)}
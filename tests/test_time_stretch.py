@@ -0,0 +1,90 @@
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from script_reader import (TIME_STRETCH_FRAME_SEC, TIME_STRETCH_TOLERANCE_SEC, stretch_audio_source, time_stretch,
+                           time_stretch_wav)
+
+FRAMERATE = 24000
+FRAME = 2 * (int(FRAMERATE * TIME_STRETCH_FRAME_SEC) // 2)
+TOLERANCE = int(FRAMERATE * TIME_STRETCH_TOLERANCE_SEC)
+
+
+def tone(frequency, seconds, amplitude=8000.0):
+    t = np.arange(int(FRAMERATE * seconds)) / FRAMERATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(samples):
+    # 前後の端を除いた部分のスペクトルの最大のピーク
+    margin = len(samples) // 10
+    segment = samples[margin:len(samples) - margin]
+    spectrum = np.abs(np.fft.rfft(segment * np.hanning(len(segment)), 1 << 18))
+    return np.fft.rfftfreq(1 << 18, 1.0 / FRAMERATE)[spectrum.argmax()]
+
+
+def rms(samples):
+    return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+
+def make_wav(samples, sampwidth=2, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sampwidth)
+        wav.setframerate(FRAMERATE)
+        wav.writeframes(np.repeat(samples.astype('<i2'), channels).tobytes() if sampwidth == 2 else
+                        bytes(len(samples) * sampwidth * channels))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("rate", [0.5, 0.77, 1.3, 2.0, 3.0])
+@pytest.mark.parametrize("length", [1003, 24000, 32881])
+def test_stretched_length(rate, length):
+    stretched = time_stretch(tone(220, length / FRAMERATE), rate, FRAME, TOLERANCE)
+
+    assert len(stretched) == round(length / rate)
+    assert stretched.dtype == np.float32
+
+
+@pytest.mark.parametrize("rate", [0.5, 0.8, 1.5, 2.0, 3.0])
+@pytest.mark.parametrize("frequency", [220.0, 440.0])
+def test_pitch_and_level_are_preserved(rate, frequency):
+    samples = tone(frequency, 1.5)
+    stretched = time_stretch(samples, rate, FRAME, TOLERANCE)
+
+    # 長さだけが変わり、音の高さと大きさは変わらない
+    assert dominant_frequency(stretched) == pytest.approx(frequency, rel=0.01)
+    margin = len(stretched) // 10
+    assert rms(stretched[margin:-margin]) == pytest.approx(rms(samples), rel=0.02)
+
+
+def test_wav_format_is_kept():
+    data = make_wav(tone(220, 1.0))
+    stretched = time_stretch_wav(data, 2.0)
+
+    with wave.open(io.BytesIO(stretched), 'rb') as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, FRAMERATE)
+        assert wav.getnframes() == FRAMERATE // 2
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2').astype(np.float32)
+    assert dominant_frequency(samples) == pytest.approx(220, rel=0.01)
+
+
+def test_unsupported_wav_is_not_stretched():
+    assert time_stretch_wav(make_wav(tone(220, 0.1), channels=2), 2.0) is None
+    assert time_stretch_wav(make_wav(tone(220, 0.1), sampwidth=1), 2.0) is None
+
+
+def test_stretch_audio_source(tmp_path):
+    chunks = (memoryview(make_wav(tone(220, 0.5))), memoryview(make_wav(tone(330, 0.25))))
+    stretched = stretch_audio_source(chunks, 0.5)
+    assert [len(chunk) - 44 for chunk in stretched] == [2 * FRAMERATE, FRAMERATE]
+
+    path = tmp_path / "slide.wav"
+    path.write_bytes(make_wav(tone(220, 0.5)))
+    assert len(stretch_audio_source(str(path), 2.0)) == 1
+    assert stretch_audio_source(str(tmp_path / "slide.mp3"), 2.0) is None
+    assert stretch_audio_source((make_wav(tone(220, 0.1), channels=2),), 2.0) is None
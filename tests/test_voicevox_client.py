@@ -0,0 +1,182 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import benchmark
+import script_reader
+from script_reader import AsyncVoicevoxClient, SimpleScriptReader, build_slide_record, run_voicevox_async
+
+
+@pytest.fixture
+def server():
+    with benchmark.FakeVoicevoxServer(latency=0.0, payload_kb=16) as fake:
+        yield fake
+
+
+@pytest.fixture(autouse=True)
+def query_cache(tmp_path, monkeypatch):
+    # ユーザーのクエリキャッシュを使わない（キャッシュに当たるとリクエスト数が変わる）
+    cache = script_reader.QueryCache(str(tmp_path / "queries"))
+    monkeypatch.setattr(script_reader, "query_cache", cache)
+    return cache
+
+
+def run(client, coro):
+    """クライアントのコルーチンを通信用のイベントループで実行し、終わったら接続を閉じる"""
+    async def run_and_close():
+        try:
+            return await coro
+        finally:
+            await client.close()
+    return run_voicevox_async(run_and_close())
+
+
+def test_keep_alive_connection_is_reused(server):
+    client = AsyncVoicevoxClient(server.url)
+
+    async def queries():
+        return [await client.audio_query(f"文{i}", 1) for i in range(5)]
+
+    results = run(client, queries())
+    assert [query["kana"] for query in results] == [f"文{i}" for i in range(5)]
+    assert server.connections == 1
+
+
+def test_chunked_response(server):
+    server.chunked = True
+    client = AsyncVoicevoxClient(server.url)
+
+    async def synthesize_twice():
+        query = await client.audio_query("チャンク", 1)
+        return [await client.synthesis(query, 1) for _ in range(2)]
+
+    results = run(client, synthesize_twice())
+    assert results == [server.wav, server.wav]
+    assert server.connections == 1
+
+
+def test_no_content_response_does_not_wait_for_eof(server):
+    client = AsyncVoicevoxClient(server.url)
+
+    async def initialize():
+        await client.initialize_speaker(1)
+        return await client.is_initialized_speaker(1)
+
+    started = time.perf_counter()
+    assert run(client, initialize()) is True
+    assert time.perf_counter() - started < 1.0
+    # 204 の後も同じ接続で次のリクエストを送れる
+    assert server.connections == 1
+
+
+def test_server_errors_are_retried(server):
+    server.failures = 2
+    client = AsyncVoicevoxClient(server.url, retries=2)
+
+    assert run(client, client.audio_query("再試行", 1))["kana"] == "再試行"
+    assert server.take_stats() == {"audio_query": 3}
+
+
+def test_server_errors_after_last_retry_are_raised(server):
+    server.failures = 5
+    client = AsyncVoicevoxClient(server.url, retries=1)
+
+    with pytest.raises(script_reader.VoicevoxError):
+        run(client, client.audio_query("失敗", 1))
+    assert server.take_stats() == {"audio_query": 2}
+
+
+def test_read_timeout(server):
+    server.latency = 0.5
+    client = AsyncVoicevoxClient(server.url, retries=0, timeouts={"audio_query": (1, 0.1)})
+
+    started = time.perf_counter()
+    with pytest.raises(script_reader.VoicevoxConnectionError):
+        run(client, client.audio_query("遅い", 1))
+    assert time.perf_counter() - started < 0.5
+
+
+def test_is_running_without_engine():
+    with benchmark.FakeVoicevoxServer() as fake:
+        url = fake.url
+    client = AsyncVoicevoxClient(url)
+    assert run(client, client.is_running()) is False
+
+
+def test_cancel_stops_queued_sentences(server):
+    server.latency = 0.1
+    chunks = [f"{i}番目の文です。" for i in range(12)]
+    cancel_event = threading.Event()
+    synthesis = script_reader.ChunkedSynthesis(chunks, 1, 220, server.url, cancel_event=cancel_event)
+
+    threading.Timer(0.15, cancel_event.set).start()
+    with pytest.raises(script_reader.SynthesisCancelled):
+        list(synthesis.iter_audio())
+
+    # 取り消した後は新しいリクエストを送らない
+    time.sleep(0.3)
+    sent = server.take_stats()
+    time.sleep(0.3)
+    assert server.take_stats() == {}
+    assert sent.get("synthesis", 0) < len(chunks)
+
+
+def test_abandoned_iteration_cancels_remaining_sentences(server):
+    server.latency = 0.05
+    chunks = [f"{i}番目の文です。" for i in range(8)]
+    synthesis = script_reader.ChunkedSynthesis(chunks, 1, 220, server.url)
+
+    audio = synthesis.iter_audio()
+    assert next(audio) == server.wav
+    audio.close()
+
+    assert synthesis.cancel_event.is_set()
+    time.sleep(0.2)
+    server.take_stats()
+    time.sleep(0.2)
+    assert server.take_stats() == {}
+
+
+def test_cached_version_does_not_contact_engine(server):
+    assert script_reader.cached_voicevox_version(server.url) is None
+
+    assert script_reader.refresh_voicevox_version(server.url).result(2.0) == "0.0.0-fake"
+    assert script_reader.cached_voicevox_version(server.url) == "0.0.0-fake"
+
+    # 取り直している間も古い値は捨てず、取得できた時点で上書きする
+    script_reader.voicevox_versions[server.url] = "old"
+    future = script_reader.refresh_voicevox_version(server.url)
+    assert script_reader.cached_voicevox_version(server.url) in ("old", "0.0.0-fake")
+    assert future.result(2.0) == "0.0.0-fake"
+    assert script_reader.cached_voicevox_version(server.url) == "0.0.0-fake"
+
+
+def test_failed_version_refresh_keeps_previous_value():
+    with benchmark.FakeVoicevoxServer() as fake:
+        url = fake.url
+    script_reader.voicevox_versions[url] = "old"
+    try:
+        assert script_reader.refresh_voicevox_version(url).result(30.0) is None
+        assert script_reader.cached_voicevox_version(url) == "old"
+    finally:
+        script_reader.voicevox_versions.pop(url, None)
+
+
+def test_cache_key_is_not_built_without_version():
+    url = "http://127.0.0.1:9"
+    reader = SimpleNamespace(voicevox_url=url)
+    record = build_slide_record("本文")
+    settings = {"speaker": 1, "speech_rate": 220, "prosody": {}}
+    # バージョンが分からない間はキーを作らない（バージョンなしのキーでキャッシュを引かない）
+    assert SimpleScriptReader._audio_cache_key(reader, record, "voicevox", settings) is None
+    assert SimpleScriptReader._base_rendering_key(reader, record.content_hash, settings) is None
+
+    script_reader.voicevox_versions[url] = "1.0.0"
+    try:
+        key = SimpleScriptReader._audio_cache_key(reader, record, "voicevox", settings)
+        assert key == SimpleScriptReader._audio_cache_key(reader, build_slide_record("本文"), "voicevox", settings)
+        assert key != SimpleScriptReader._audio_cache_key(reader, record, "voicevox", dict(settings, speech_rate=300))
+    finally:
+        script_reader.voicevox_versions.pop(url, None)
@@ -0,0 +1,210 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+import script_reader
+from script_reader import AsyncVoicevoxClient, run_voicevox_async
+
+RESET = "reset"
+
+
+def response(body, headers="", status="200 OK"):
+    return (f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n{headers}\r\n").encode("ascii") + body
+
+
+def chunked(*pieces, headers=""):
+    data = f"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n{headers}\r\n".encode("ascii")
+    for piece in pieces:
+        data += f"{len(piece):x}\r\n".encode("ascii") + piece + b"\r\n"
+    return data + b"0\r\n\r\n"
+
+
+class ScriptedServer:
+    """接続ごと・リクエストごとに決めたバイト列をそのまま返すサーバー
+
+    respond(接続番号, その接続でのリクエスト番号) が返す値:
+        bytes: そのまま送って次のリクエストを待つ
+        (bytes, "close"): 送ってから接続を閉じる
+        (bytes, RESET) または RESET: 送ってから（または何も送らずに）RSTで接続を切る
+    """
+    def __init__(self, respond):
+        self.respond = respond
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.connections = 0
+        self.requests = []  # (接続番号, リクエスト番号, リクエスト行)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+        self.sock.close()
+
+    def _serve(self):
+        while not self.stop_event.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            number = self.connections
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn, number), daemon=True).start()
+
+    def _handle(self, conn, number):
+        reader = conn.makefile('rb')
+        try:
+            for index in range(100):
+                request_line = reader.readline()
+                if not request_line:
+                    return
+                length = 0
+                while True:
+                    line = reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                reader.read(length)
+                self.requests.append((number, index, request_line.split()[1].decode("ascii")))
+
+                reply = self.respond(number, index)
+                data, action = reply if isinstance(reply, tuple) else (b"", reply) if reply == RESET else (reply, None)
+                if data:
+                    conn.sendall(data)
+                if action == RESET:
+                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    return
+                if action == "close":
+                    conn.shutdown(socket.SHUT_RDWR)
+                    return
+        except OSError:
+            pass
+        finally:
+            reader.close()
+            conn.close()
+
+
+def run_requests(url, count, retries=0):
+    """同じクライアントで順にリクエストを送り、(応答, プールしている接続数) のリストを返す"""
+    async def run():
+        client = AsyncVoicevoxClient(url, retries=retries)
+        results = []
+        try:
+            for i in range(count):
+                result = await client.request("GET", f"version?n={i}")
+                results.append((result.content, len(client.idle)))
+        finally:
+            await client.close()
+        return results
+    return run_voicevox_async(run())
+
+
+def test_connection_close_after_keep_alive_response():
+    def respond(connection, index):
+        if connection == 0:
+            return response(b'"1"') if index == 0 else (response(b'"2"', "Connection: close\r\n"), "close")
+        return response(b'"3"')
+
+    with ScriptedServer(respond) as server:
+        results = run_requests(server.url, 3)
+
+    # Connection: close の接続はプールに戻さず、次は新しい接続を使う
+    assert results == [(b'"1"', 1), (b'"2"', 0), (b'"3"', 1)]
+    assert server.connections == 2
+
+
+def test_pooled_connection_reset_before_response():
+    def respond(connection, index):
+        if connection == 0 and index == 1:
+            return RESET
+        return response(b'"ok"')
+
+    with ScriptedServer(respond) as server:
+        # 再試行なしでも、切れていたプールの接続は新しい接続でやり直す
+        results = run_requests(server.url, 2)
+
+    assert results == [(b'"ok"', 1), (b'"ok"', 1)]
+    assert [(connection, index) for connection, index, _ in server.requests] == [(0, 0), (0, 1), (1, 0)]
+
+
+def test_pooled_connection_reset_mid_response():
+    def respond(connection, index):
+        if connection == 0 and index == 1:
+            return response(b'"truncated"' + b" " * 20)[:-10], RESET
+        return response(f'"{connection}-{index}"'.encode("ascii"))
+
+    with ScriptedServer(respond) as server:
+        results = run_requests(server.url, 3)
+
+    assert results == [(b'"0-0"', 1), (b'"1-0"', 1), (b'"1-1"', 1)]
+    assert server.connections == 2
+
+
+def test_truncated_chunked_body():
+    def respond(connection, index):
+        if connection == 0:
+            return chunked(b"x" * 100)[:-40], "close"
+        return chunked(b'"ok"', b"")
+
+    with ScriptedServer(respond) as server:
+        with pytest.raises(script_reader.VoicevoxConnectionError):
+            run_requests(server.url, 1)
+        # 新しい接続での再試行は通常の再試行回数に従う
+        assert run_requests(server.url, 1, retries=1) == [(b'"ok"', 1)]
+
+
+def test_invalid_chunk_size():
+    with ScriptedServer(lambda connection, index: (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n",
+                                                   "close")) as server:
+        with pytest.raises(script_reader.VoicevoxConnectionError):
+            run_requests(server.url, 1)
+
+
+def test_body_shorter_than_content_length():
+    def respond(connection, index):
+        return b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n" + b"x" * 60, "close"
+
+    with ScriptedServer(respond) as server:
+        with pytest.raises(script_reader.VoicevoxConnectionError):
+            run_requests(server.url, 1)
+        assert server.connections == 1
+
+
+def test_body_longer_than_content_length():
+    def respond(connection, index):
+        if connection == 0 and index == 0:
+            # 宣言より長いボディの残りは、次の応答の先頭に混ざる
+            return b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\n\"1\"extra"
+        return response(f'"{connection}-{index}"'.encode("ascii"))
+
+    with ScriptedServer(respond) as server:
+        results = run_requests(server.url, 2)
+
+    # 余分なデータの残った接続は捨て、新しい接続で正しい応答を受け取る
+    assert results == [(b'"1"', 1), (b'"1-0"', 1)]
+    assert server.connections == 2
+
+
+def test_no_content_keeps_connection():
+    def respond(connection, index):
+        if index == 0:
+            return b"HTTP/1.1 204 No Content\r\n\r\n"
+        return response(b'"ok"')
+
+    with ScriptedServer(respond) as server:
+        results = run_requests(server.url, 2)
+
+    assert results == [(b"", 1), (b'"ok"', 1)]
+    assert server.connections == 1